@@ -24,7 +24,9 @@ config = context.config
 
 # Встановлюємо sqlalchemy.url з наших налаштувань
 # Це гарантує, що Alembic і додаток дивляться на одну і ту ж БД
-config.set_main_option('sqlalchemy.url', settings.DB_URL)
+# "%" екрануємо, бо значення .ini проходять через interpolation (паролі PostgreSQL можуть містити "%")
+# "%" is escaped because .ini values go through interpolation (PostgreSQL passwords may contain "%")
+config.set_main_option('sqlalchemy.url', settings.DB_URL.replace('%', '%%'))
 
 # Інтерпретуємо конфігураційний файл для логування Python.
 if config.config_file_name is not None:
@@ -65,7 +67,13 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # SQLite не вміє більшість ALTER TABLE - для нього Alembic перебудовує таблиці (batch mode)
+    # SQLite lacks most ALTER TABLE forms - Alembic rebuilds the tables for it (batch mode)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,27 @@
+"""Add (owner_id, id) index to cars
+
+Revision ID: 9b4e6a2d0f13
+Revises: 5e0f2b8c41d7
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e6a2d0f13'
+down_revision: Union[str, Sequence[str], None] = '5e0f2b8c41d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_cars_owner_id_id', 'cars', ['owner_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_cars_owner_id_id', table_name='cars')
@@ -0,0 +1,57 @@
+"""Add normalized license plate to Car
+
+Revision ID: c3a9d17e52b1
+Revises: 442637048b47
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from collections import defaultdict
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.car_qr_service.cars.plates import normalize_license_plate
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9d17e52b1'
+down_revision: Union[str, Sequence[str], None] = '442637048b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cars', sa.Column('license_plate_normalized', sa.String(length=20), nullable=True))
+
+    # Заповнюємо ключ для наявних авто (Backfill the key for existing cars)
+    connection = op.get_bind()
+    cars = sa.table('cars', sa.column('id', sa.Integer), sa.column('license_plate', sa.String),
+                    sa.column('license_plate_normalized', sa.String))
+    plates_by_key = defaultdict(list)
+    for car_id, license_plate in connection.execute(sa.select(cars.c.id, cars.c.license_plate)):
+        key = normalize_license_plate(license_plate)
+        plates_by_key[key].append(license_plate)
+        connection.execute(
+            cars.update().where(cars.c.id == car_id).values(license_plate_normalized=key)
+        )
+    duplicates = [plates for plates in plates_by_key.values() if len(plates) > 1]
+    if duplicates:
+        raise RuntimeError(
+            f"Ці номери збігаються після нормалізації, виправте їх вручну "
+            f"(These plates collide after normalization, fix them manually): {duplicates}"
+        )
+
+    with op.batch_alter_table('cars') as batch_op:
+        batch_op.alter_column('license_plate_normalized', existing_type=sa.String(length=20), nullable=False)
+        batch_op.drop_index('ix_cars_license_plate')
+        batch_op.create_index('ix_cars_license_plate_normalized', ['license_plate_normalized'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('cars') as batch_op:
+        batch_op.drop_index('ix_cars_license_plate_normalized')
+        batch_op.create_index('ix_cars_license_plate', ['license_plate'], unique=True)
+        batch_op.drop_column('license_plate_normalized')
@@ -0,0 +1,47 @@
+"""Add short QR code to Car
+
+Revision ID: d41f7c9e2a85
+Revises: 9b4e6a2d0f13
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.car_qr_service.cars.short_codes import generate_short_code
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f7c9e2a85'
+down_revision: Union[str, Sequence[str], None] = '9b4e6a2d0f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cars', sa.Column('short_code', sa.String(length=16), nullable=True))
+
+    # Кожному наявному авто - власний випадковий код (Every existing car gets its own random code)
+    connection = op.get_bind()
+    cars = sa.table('cars', sa.column('id', sa.Integer), sa.column('short_code', sa.String))
+    used = set()
+    for car_id in connection.execute(sa.select(cars.c.id)).scalars().all():
+        code = generate_short_code()
+        while code in used:
+            code = generate_short_code()
+        used.add(code)
+        connection.execute(cars.update().where(cars.c.id == car_id).values(short_code=code))
+
+    with op.batch_alter_table('cars') as batch_op:
+        batch_op.alter_column('short_code', existing_type=sa.String(length=16), nullable=False)
+        batch_op.create_index('ix_cars_short_code', ['short_code'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('cars') as batch_op:
+        batch_op.drop_index('ix_cars_short_code')
+        batch_op.drop_column('short_code')
@@ -0,0 +1,38 @@
+"""Add scan events
+
+Revision ID: f3c8b1e64a09
+Revises: e7a2c5d83b46
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8b1e64a09'
+down_revision: Union[str, Sequence[str], None] = 'e7a2c5d83b46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scan_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('car_id', sa.Integer(), nullable=False),
+    sa.Column('scanned_at', sa.DateTime(), nullable=False),
+    sa.Column('source', sa.String(length=8), nullable=False),
+    sa.Column('client_kind', sa.String(length=8), nullable=False),
+    sa.Column('ip_prefix', sa.String(length=48), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_scan_events_car_id_scanned_at', 'scan_events', ['car_id', 'scanned_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_scan_events_car_id_scanned_at', table_name='scan_events')
+    op.drop_table('scan_events')
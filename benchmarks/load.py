@@ -0,0 +1,292 @@
+"""
+Навантажувальний тест основних сценаріїв: застосунок викликається напряму через httpx (ASGI, без мережі)
+або через запущені воркери uvicorn. Дані (власник з N авто, користувачі для входу) створюються в окремій БД.
+
+Load test of the critical user journeys. The app is driven in process through httpx (ASGI, no network)
+or through local uvicorn workers. Data (an owner with N cars, users to log in) is seeded into a separate database.
+
+Scenarios:
+    scan     - QR-scan storm: GET /public/cars/{plate} over the whole fleet (a share of unknown plates)
+    login    - login storm: POST /auth/token (bcrypt verify per request)
+    refresh  - returning users renew sessions: POST /auth/refresh (token rotation, no bcrypt)
+    cabinet  - fleet owner opens GET /pages/cabinet
+
+Run from the project root:
+    python -m benchmarks.load                                  # all scenarios, in process
+    python -m benchmarks.load --scenario scan --requests 5000 --concurrency 64
+    python -m benchmarks.load --workers 4                      # through 4 local uvicorn workers
+    python -m benchmarks.load --output before.json             # machine-readable results
+    python -m benchmarks.load --compare before.json            # print the change against an earlier run
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+
+SCENARIOS = ("scan", "login", "refresh", "cabinet")
+PASSWORD = "benchmark-password"
+OWNER_EMAIL = "bench-owner@example.com"
+
+
+def _configure_environment(db_url: str) -> None:
+    """
+    Налаштування для бенчмарку задаються до імпорту застосунку (Settings читаються при імпорті).
+    Benchmark settings are set before the app is imported (Settings are read on import).
+    """
+    os.environ["DB_URL"] = db_url
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")  # one client IP would hit the limits at once
+    os.environ.setdefault("NOTIFY_WORKER_ENABLED", "false")
+
+
+async def seed(db_url: str, cars: int, login_users: int) -> list[str]:
+    """
+    Створює таблиці, власника з `cars` авто і `login_users` користувачів для входу. Повертає номери авто.
+    Creates the tables, an owner with `cars` cars and `login_users` users to log in. Returns the plates.
+    """
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from src.car_qr_service.auth.security import hash_password
+    from src.car_qr_service.cars.plates import normalize_license_plate
+    from src.car_qr_service.database.database import Base
+    from src.car_qr_service.database.models import Car, User
+
+    hashed = hash_password(PASSWORD)  # one bcrypt hash for everybody - verifying it costs the same
+    plates = [f"BN{number:06d}KA" for number in range(cars)]
+    engine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        owner_id = (await conn.execute(insert(User).values(
+            email=OWNER_EMAIL, phone_number="+380500000000", hashed_password=hashed,
+            first_name="Fleet", last_name="Owner", show_phone_number=True,
+        ))).inserted_primary_key[0]
+        if login_users:
+            await conn.execute(insert(User), [
+                {"email": f"bench-login-{number}@example.com", "phone_number": f"+38051{number:07d}",
+                 "hashed_password": hashed, "first_name": "Login", "last_name": str(number)}
+                for number in range(login_users)
+            ])
+        for start in range(0, cars, 1000):
+            await conn.execute(insert(Car), [
+                {"license_plate": plate, "license_plate_normalized": normalize_license_plate(plate),
+                 "brand": random.choice(("Toyota", "Skoda", "Renault", "Volkswagen")),
+                 "model": random.choice(("Camry", "Octavia", "Megane", "Passat")), "owner_id": owner_id}
+                for plate in plates[start:start + 1000]
+            ])
+    await engine.dispose()
+    return plates
+
+
+def _percentile(ordered: list[float], share: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(share * len(ordered)) - 1))]
+
+
+async def run_scenario(name: str, client: httpx.AsyncClient, request, requests: int, concurrency: int) -> dict:
+    """
+    Виконує `requests` запитів, не більше `concurrency` одночасно. Помилка - виняток або неочікуваний статус.
+    Runs `requests` requests with at most `concurrency` at once. An error is an exception or an unexpected status.
+    """
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                ok = await request(client)
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(requests / elapsed, 1),
+        "latency_ms": {
+            "p50": round(_percentile(ordered, 0.50) * 1000, 2),
+            "p95": round(_percentile(ordered, 0.95) * 1000, 2),
+            "p99": round(_percentile(ordered, 0.99) * 1000, 2),
+            "max": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        },
+    }
+
+
+def _scenario_requests(plates: list[str], login_users: int, miss_ratio: float, refresh_tokens: list[str]) -> dict:
+    async def scan(client: httpx.AsyncClient) -> bool:
+        if random.random() < miss_ratio:
+            response = await client.get(f"/public/cars/XX{random.randrange(10 ** 6):06d}ZZ")
+            return response.status_code == 404
+        response = await client.get(f"/public/cars/{random.choice(plates)}")
+        return response.status_code == 200
+
+    async def login(client: httpx.AsyncClient) -> bool:
+        email = f"bench-login-{random.randrange(login_users)}@example.com" if login_users else OWNER_EMAIL
+        response = await client.post("/auth/token", data={"username": email, "password": PASSWORD})
+        return response.status_code == 200
+
+    async def refresh(client: httpx.AsyncClient) -> bool:
+        # Every token is single-use: a request takes one from the pool and puts back its replacement
+        response = await client.post("/auth/refresh", data={"refresh_token": refresh_tokens.pop()})
+        if response.status_code != 200:
+            return False
+        refresh_tokens.append(response.json()["refresh_token"])
+        return True
+
+    async def cabinet(client: httpx.AsyncClient) -> bool:
+        response = await client.get("/pages/cabinet", follow_redirects=False)
+        return response.status_code == 200
+
+    return {"scan": scan, "login": login, "refresh": refresh, "cabinet": cabinet}
+
+
+@asynccontextmanager
+async def in_process_client():
+    """httpx client that calls the ASGI app directly (the app lifespan runs as in a server)."""
+    from src.car_qr_service.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            yield client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client(workers: int, concurrency: int):
+    """Starts `workers` local uvicorn processes on a free port and yields a client talking to them."""
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.car_qr_service.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+            for _ in range(100):
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+async def main(args: argparse.Namespace) -> dict:
+    plates = await seed(args.db_url, args.cars, args.login_users)
+    refresh_tokens: list[str] = []
+    requests = _scenario_requests(plates, args.login_users, args.miss_ratio, refresh_tokens)
+    client_factory = uvicorn_client(args.workers, args.concurrency) if args.workers else in_process_client()
+    results = []
+    async with client_factory as client:
+        for name in args.scenario:
+            if name == "cabinet":
+                response = await client.post("/auth/token", data={"username": OWNER_EMAIL, "password": PASSWORD})
+                client.cookies.set("access_token", f"Bearer {response.json()['access_token']}")
+            if name == "refresh":
+                # One session per concurrent worker, opened with a password login each
+                for _ in range(args.concurrency):
+                    response = await client.post("/auth/token", data={"username": OWNER_EMAIL, "password": PASSWORD})
+                    refresh_tokens.append(response.json()["refresh_token"])
+            count = args.requests if name != "login" else max(1, args.requests // 10)  # bcrypt is ~100x slower
+            await run_scenario(name, client, requests[name], min(count, args.concurrency), args.concurrency)  # warm-up
+            results.append(await run_scenario(name, client, requests[name], count, args.concurrency))
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "mode": f"uvicorn x{args.workers}" if args.workers else "in-process",
+            "database": args.db_url.split("://")[0],
+            "cars": args.cars,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: dict, previous: dict | None = None) -> None:
+    before = {result["scenario"]: result for result in (previous or {}).get("results", [])}
+    print(f"{report['meta']['mode']}, {report['meta']['cars']} cars, concurrency {report['meta']['concurrency']}")
+    print(f"{'scenario':10} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for result in report["results"]:
+        latency = result["latency_ms"]
+        print(f"{result['scenario']:10} {result['requests']:9} {result['errors']:7} {result['rps']:9.1f} "
+              f"{latency['p50']:8.2f} {latency['p95']:8.2f} {latency['p99']:8.2f}")
+        old = before.get(result["scenario"])
+        if old is not None:
+            print(f"{'  vs old':10} {'':9} {'':7} {_change(old['rps'], result['rps']):>9} "
+                  f"{_change(old['latency_ms']['p50'], latency['p50']):>8} "
+                  f"{_change(old['latency_ms']['p95'], latency['p95']):>8} "
+                  f"{_change(old['latency_ms']['p99'], latency['p99']):>8}")
+
+
+def _change(old: float, new: float) -> str:
+    return f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="scenario to run (repeatable)")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario (login runs 1/10)")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight at once")
+    parser.add_argument("--cars", type=int, default=1000, help="cars of the fleet owner")
+    parser.add_argument("--login-users", type=int, default=50, help="users for the login storm")
+    parser.add_argument("--miss-ratio", type=float, default=0.05, help="share of scans of unknown plates")
+    parser.add_argument("--workers", type=int, default=0, help="run through N local uvicorn workers")
+    parser.add_argument("--db-url", help="database to seed and use (default: a temporary SQLite file)")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="JSON results of an earlier run to compare with")
+    arguments = parser.parse_args()
+    arguments.scenario = arguments.scenario or list(SCENARIOS)
+    arguments.db_url = arguments.db_url or f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'benchmark.db'}"
+    _configure_environment(arguments.db_url)
+
+    report = asyncio.run(main(arguments))
+    print_report(report, json.loads(arguments.compare.read_text()) if arguments.compare else None)
+    if arguments.output:
+        arguments.output.write_text(json.dumps(report, indent=2))
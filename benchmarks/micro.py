@@ -0,0 +1,197 @@
+"""
+Мікробенчмарки гарячих функцій (CRUD, JWT, bcrypt, QR, Jinja2) з базовими значеннями в JSON.
+`--check` порівнює з базою і завершується з кодом 1, якщо якась функція стала повільнішою за допуск.
+
+Microbenchmarks of the hot functions (CRUD, JWT, bcrypt, QR, Jinja2) with JSON baselines.
+`--check` compares against the baselines and exits with code 1 if a function got slower than its tolerance.
+
+Run from the project root:
+    python -m benchmarks.micro                      # measure and print
+    python -m benchmarks.micro --check              # flag regressions against benchmarks/baselines/micro.json
+    python -m benchmarks.micro --save               # store the current timings as the new baselines
+    python -m benchmarks.micro --only auth.         # only benchmarks whose name starts with "auth."
+
+Baselines depend on the machine: record them (--save) on the same hardware that runs --check.
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")  # Settings require it on import
+
+from jose import jwt  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from src.car_qr_service.auth.security import hash_password  # noqa: E402
+from src.car_qr_service.auth.utils import create_access_token  # noqa: E402
+from src.car_qr_service.cars import crud as cars_crud  # noqa: E402
+from src.car_qr_service.cars.plates import normalize_license_plate  # noqa: E402
+from src.car_qr_service.cars.records import CarRecord  # noqa: E402
+from src.car_qr_service.config import settings  # noqa: E402
+from src.car_qr_service.database.database import Base  # noqa: E402
+from src.car_qr_service.database.models import Car, User  # noqa: E402
+from src.car_qr_service.qr.render import render_qr_png  # noqa: E402
+from src.car_qr_service.templating import templates  # noqa: E402
+from src.car_qr_service.users import crud as users_crud  # noqa: E402
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "micro.json"
+DEFAULT_TOLERANCE = 0.25  # 25% slower than the baseline is a regression
+FLEET_SIZE = 100
+
+Benchmark = Callable[[], object] | Callable[[], Awaitable[object]]
+
+
+async def _seed_database():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        owner_id = (await conn.execute(insert(User).values(
+            email="bench@example.com", phone_number="+380990000000", hashed_password="x",
+            first_name="Bench", last_name="Owner", show_phone_number=True,
+        ))).inserted_primary_key[0]
+        await conn.execute(insert(Car), [
+            {"license_plate": f"BE{number:04d}NC", "license_plate_normalized": normalize_license_plate(f"BE{number:04d}NC"),
+             "brand": "Skoda", "model": "Octavia", "owner_id": owner_id}
+            for number in range(FLEET_SIZE)
+        ])
+    return engine, async_sessionmaker(engine, expire_on_commit=False), owner_id
+
+
+def build_benchmarks(session_factory: async_sessionmaker, owner_id: int) -> dict[str, tuple[Benchmark, float]]:
+    """
+    Назва -> (функція одного виклику, допуск). Функції з базою виконуються на SQLite у пам'яті,
+    тож вимірюють SQLAlchemy і драйвер, а не мережу.
+    Name -> (one-call function, tolerance). Database functions run on in-memory SQLite,
+    so they measure SQLAlchemy and the driver, not the network.
+    """
+    token = create_access_token({"sub": "bench@example.com"})
+    car = CarRecord(license_plate="BE0001NC", brand="Skoda", model="Octavia", id=1, owner_id=owner_id,
+                    short_code="aB3dE5gH")
+    car_row = templates.get_template("partials/car_row.html")
+
+    async def get_user_by_email():
+        async with session_factory() as db:
+            return await users_crud.get_user_by_email("bench@example.com", db)
+
+    async def get_car_by_license_plate():
+        async with session_factory() as db:
+            return await cars_crud.get_car_by_license_plate(db, "be 0001 nc")
+
+    async def get_user_cars():
+        async with session_factory() as db:
+            return await cars_crud.get_user_cars(db, owner_id)
+
+    def decode_access_token():
+        return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+    return {
+        "users.get_user_by_email": (get_user_by_email, DEFAULT_TOLERANCE),
+        "cars.get_car_by_license_plate": (get_car_by_license_plate, DEFAULT_TOLERANCE),
+        f"cars.get_user_cars[{FLEET_SIZE}]": (get_user_cars, DEFAULT_TOLERANCE),
+        "auth.create_access_token": (lambda: create_access_token({"sub": "bench@example.com"}), DEFAULT_TOLERANCE),
+        "auth.decode_access_token": (decode_access_token, DEFAULT_TOLERANCE),
+        # bcrypt cost is fixed by its rounds, a change here means the rounds or the backend changed
+        "auth.hash_password": (lambda: hash_password("benchmark-password"), 0.15),
+        "qr.render_png": (lambda: render_qr_png("http://127.0.0.1:8001/s/aB3dE5gH"), DEFAULT_TOLERANCE),
+        "templates.car_row": (lambda: car_row.render(car=car), DEFAULT_TOLERANCE),
+    }
+
+
+async def measure(func: Benchmark, repeat: int, min_time: float) -> float:
+    """
+    Секунд на виклик: кількість викликів у серії підбирається так, щоб серія тривала не менше min_time;
+    з `repeat` серій береться медіана (вона стійкіша до шуму, ніж середнє).
+    Seconds per call: the calls per round are chosen so a round takes at least min_time;
+    the median of `repeat` rounds is returned (it is more robust to noise than the mean).
+    """
+    is_async = inspect.iscoroutinefunction(func)
+
+    async def run(number: int) -> float:
+        start = time.perf_counter()
+        if is_async:
+            for _ in range(number):
+                await func()
+        else:
+            for _ in range(number):
+                func()
+        return time.perf_counter() - start
+
+    number = 1
+    while (elapsed := await run(number)) < min_time:  # also warms up caches
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+    return statistics.median([await run(number) / number for _ in range(repeat)])
+
+
+def compare(results: dict[str, float], baselines: dict) -> list[str]:
+    """Returns the names of benchmarks slower than their baseline by more than its tolerance."""
+    regressions = []
+    for name, seconds in results.items():
+        baseline = baselines.get("benchmarks", {}).get(name)
+        if baseline is not None and seconds > baseline["seconds"] * (1 + baseline["tolerance"]):
+            regressions.append(name)
+    return regressions
+
+
+def _environment() -> dict:
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+
+
+def _format(seconds: float) -> str:
+    return f"{seconds * 1e3:.2f} ms" if seconds >= 1e-3 else f"{seconds * 1e6:.1f} us"
+
+
+async def main(args: argparse.Namespace) -> int:
+    engine, session_factory, owner_id = await _seed_database()
+    benchmarks = {name: spec for name, spec in build_benchmarks(session_factory, owner_id).items()
+                  if name.startswith(tuple(args.only or ("",)))}
+    baselines = json.loads(args.baseline.read_text()) if args.baseline.is_file() else {}
+    if args.check and baselines.get("environment") not in (None, _environment()):
+        print(f"warning: baselines were recorded on {baselines['environment']}, this is {_environment()}")
+
+    results = {}
+    print(f"{'benchmark':32} {'time/call':>12} {'baseline':>12} {'change':>8}")
+    for name, (func, _) in benchmarks.items():
+        results[name] = await measure(func, args.repeat, args.min_time)
+        baseline = baselines.get("benchmarks", {}).get(name)
+        if baseline is None:
+            print(f"{name:32} {_format(results[name]):>12} {'-':>12} {'':>8}")
+        else:
+            change = (results[name] - baseline["seconds"]) / baseline["seconds"] * 100
+            print(f"{name:32} {_format(results[name]):>12} {_format(baseline['seconds']):>12} {change:+7.0f}%")
+    await engine.dispose()
+
+    if args.save:
+        stored = baselines.get("benchmarks", {})
+        for name, seconds in results.items():
+            stored[name] = {"seconds": seconds, "tolerance": benchmarks[name][1]}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({"environment": _environment(), "benchmarks": stored},
+                                            indent=2, sort_keys=True) + "\n")
+        print(f"Saved {len(results)} baselines to {args.baseline}")
+    if args.check:
+        regressions = compare(results, baselines)
+        for name in regressions:
+            tolerance = baselines["benchmarks"][name]["tolerance"]
+            print(f"REGRESSION: {name} is more than {tolerance:.0%} slower than its baseline")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="exit with code 1 on a regression")
+    parser.add_argument("--save", action="store_true", help="store the timings as baselines")
+    parser.add_argument("--only", action="append", help="run benchmarks whose name starts with this (repeatable)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baselines JSON file")
+    parser.add_argument("--repeat", type=int, default=5, help="measured rounds per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimal duration of one round, seconds")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,131 @@
+"""
+Порівняння шляхів читання: повні ORM-об'єкти + from_attributes проти проєкцій колонок + прямої серіалізації.
+Comparison of read paths: full ORM entities + from_attributes versus column projections + direct serialization.
+
+Run from the project root:
+    JWT_SECRET_KEY=bench python -m benchmarks.read_paths [--cars 100] [--rounds 300]
+
+For every path it prints the CPU time and the peak of newly allocated memory per request
+(database query + conversion + JSON encoding, i.e. everything the endpoint does after auth).
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from src.car_qr_service.auth.token_cache import UserSnapshot
+from src.car_qr_service.cars.cache import plate_cache
+from src.car_qr_service.cars.crud import get_public_car_by_license_plate, get_user_cars_page
+from src.car_qr_service.cars.schemas import CarRead, PublicCarInfo
+from src.car_qr_service.database.database import Base
+from src.car_qr_service.database.models import Car, User
+from src.car_qr_service.users.schemas import UserRead
+
+_car_list = TypeAdapter(list[CarRead])
+
+
+def _fastapi_json(adapter_or_model, value) -> bytes:
+    """What FastAPI does with a response_model: validate, dump to JSON-able Python, json.dumps."""
+    if isinstance(adapter_or_model, TypeAdapter):
+        validated = adapter_or_model.validate_python(value, from_attributes=True)
+        content = adapter_or_model.dump_python(validated, mode="json")
+    else:
+        content = adapter_or_model.model_validate(value, from_attributes=True).model_dump(mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def _setup(car_count: int):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as db:
+        user = User(email="bench@example.com", phone_number="+380990000000", hashed_password="x",
+                    show_phone_number=True)
+        db.add(user)
+        await db.flush()
+        db.add_all(Car(license_plate=f"BE{number:04d}NC", brand="Brand", model="Model", owner_id=user.id)
+                   for number in range(car_count))
+        await db.commit()
+        snapshot = UserSnapshot.from_user(user)
+    return engine, session_factory, snapshot
+
+
+def _paths(session_factory, snapshot: UserSnapshot, car_count: int):
+    async def cars_orm():
+        async with session_factory() as db:
+            cars = (await db.execute(select(Car).where(Car.owner_id == snapshot.id).order_by(Car.id)
+                                     .limit(car_count))).scalars().all()
+            return _fastapi_json(_car_list, cars)
+
+    async def cars_lean():
+        async with session_factory() as db:
+            return to_json(await get_user_cars_page(db, snapshot.id, limit=car_count))
+
+    async def lookup_orm():
+        async with session_factory() as db:
+            car = (await db.execute(select(Car).options(selectinload(Car.owner))
+                                    .where(Car.license_plate_normalized == "BE0001NC"))).scalars().first()
+            return _fastapi_json(PublicCarInfo, car)
+
+    async def lookup_lean():
+        plate_cache.clear()  # measure the database path, not the cache
+        async with session_factory() as db:
+            car = await get_public_car_by_license_plate(db, "BE0001NC")
+            return to_json({"brand": car.brand, "model": car.model})
+
+    async def me_orm():
+        return _fastapi_json(UserRead, snapshot)
+
+    async def me_lean():
+        return to_json(snapshot)
+
+    return {
+        "GET /cars/": (cars_orm, cars_lean),
+        "GET /public/cars/{plate} (cache miss)": (lookup_orm, lookup_lean),
+        "GET /users/me": (me_orm, me_lean),
+    }
+
+
+async def _measure(call, rounds: int) -> tuple[float, float]:
+    for _ in range(10):  # warm up caches of SQLAlchemy statements and pydantic
+        await call()
+    start = time.process_time()
+    for _ in range(rounds):
+        await call()
+    cpu_us = (time.process_time() - start) / rounds * 1e6
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(rounds, 50)):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        await call()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return cpu_us, sorted(peaks)[len(peaks) // 2] / 1024
+
+
+async def main(car_count: int, rounds: int) -> None:
+    engine, session_factory, snapshot = await _setup(car_count)
+    print(f"{'endpoint':40} {'path':6} {'cpu us/req':>11} {'peak KiB/req':>13}")
+    for name, (before, after) in _paths(session_factory, snapshot, car_count).items():
+        for label, call in (("orm", before), ("lean", after)):
+            cpu_us, peak_kib = await _measure(call, rounds)
+            print(f"{name:40} {label:6} {cpu_us:11.1f} {peak_kib:13.1f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cars", type=int, default=100, help="cars of the user (one page of GET /cars/)")
+    parser.add_argument("--rounds", type=int, default=300, help="requests measured per path")
+    args = parser.parse_args()
+    asyncio.run(main(args.cars, args.rounds))
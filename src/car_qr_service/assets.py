@@ -0,0 +1,157 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import shutil
+import stat
+from pathlib import Path
+
+import anyio.to_thread
+from jinja2 import pass_context
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from src.car_qr_service.config import settings
+
+try:
+    import brotli  # optional: poetry install --extras compression
+except ImportError:
+    brotli = None
+
+STATIC_SOURCE_DIR = Path(__file__).parent / "static"
+MANIFEST_NAME = "manifest.json"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Ці формати вже стиснені - gzip/brotli лише додали б байтів
+# These formats are already compressed - gzip/brotli would only add bytes
+_PRECOMPRESSED_SUFFIXES = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".woff2", ".gz", ".br", ".zip", ".pdf"}
+
+
+def _fingerprinted_name(path: Path, content: bytes) -> Path:
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    return path.with_name(f"{path.stem}.{digest}{path.suffix}")
+
+
+def _write_compressed(target: Path, content: bytes) -> None:
+    """Writes .gz (and .br if brotli is installed) next to the file, if that is noticeably smaller."""
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(content) * 0.9:
+            target.with_name(target.name + suffix).write_bytes(compressed)
+
+
+def build_assets(source_dir: Path = STATIC_SOURCE_DIR, output_dir: Path | None = None) -> dict[str, str]:
+    """
+    Збирає статику: копіює кожен файл під ім'ям з хешем вмісту (logo.<hash>.svg), поруч кладе
+    стиснені варіанти .gz/.br і записує manifest.json: вихідний шлях -> шлях з хешем.
+    Файли з хешем у назві ніколи не змінюються, тож браузер може кешувати їх назавжди.
+    Запуск на етапі збірки: python -m src.car_qr_service.assets
+
+    Builds the static assets: copies every file under a content-hashed name (logo.<hash>.svg),
+    puts compressed .gz/.br variants next to it and writes manifest.json: source path -> hashed path.
+    Hashed files never change, so browsers may cache them forever. Returns the manifest.
+    """
+    output_dir = output_dir or settings.STATIC_BUILD_DIR
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    manifest = {}
+    for source in sorted(path for path in source_dir.rglob("*") if path.is_file()):
+        relative = source.relative_to(source_dir)
+        content = source.read_bytes()
+        hashed = _fingerprinted_name(relative, content)
+        # The plain name is kept too, for links that do not go through the manifest
+        for name in (relative, hashed):
+            target = output_dir / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+            if source.suffix.lower() not in _PRECOMPRESSED_SUFFIXES:
+                _write_compressed(target, content)
+        manifest[relative.as_posix()] = hashed.as_posix()
+    (output_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest
+
+
+def load_manifest(build_dir: Path | None = None) -> dict[str, str]:
+    """Reads the manifest of a built assets directory (empty if the assets were not built)."""
+    path = (build_dir or settings.STATIC_BUILD_DIR) / MANIFEST_NAME
+    if not path.is_file():
+        return {}
+    return json.loads(path.read_text())
+
+
+def _accepts_encoding(accept_encoding: str, coding: str) -> bool:
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        if name.strip() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles, що віддає заздалегідь стиснений варіант файлу (.br, потім .gz), якщо клієнт його приймає,
+    і дозволяє кешувати назавжди файли з хешем у назві (Cache-Control: immutable).
+
+    StaticFiles that serves the precompressed variant of a file (.br, then .gz) when the client accepts it
+    and lets files with a content hash in their name be cached forever (Cache-Control: immutable).
+    """
+
+    def __init__(self, *, directory: Path, manifest: dict[str, str], max_age: int = 0, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.immutable_paths = set(manifest.values())
+        self.max_age = max_age
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        response = None
+        for coding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if not _accepts_encoding(accept_encoding, coding):
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+                response = self.file_response(full_path, stat_result, scope)
+                response.headers["content-type"] = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                response.headers["content-encoding"] = coding
+                break
+        if response is None:
+            response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["vary"] = "Accept-Encoding"
+            if path in self.immutable_paths:
+                response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+            else:
+                response.headers["cache-control"] = f"public, max-age={self.max_age}"
+        return response
+
+
+def create_static_app() -> StaticFiles:
+    """
+    Зібрана статика (якщо є manifest.json у STATIC_BUILD_DIR), інакше - вихідні файли як раніше.
+    The built assets (if STATIC_BUILD_DIR has a manifest.json), otherwise the source files as before.
+    """
+    manifest = load_manifest()
+    if not manifest:
+        return StaticFiles(directory=STATIC_SOURCE_DIR)
+    return PrecompressedStaticFiles(directory=settings.STATIC_BUILD_DIR, manifest=manifest,
+                                    max_age=settings.STATIC_MAX_AGE_SECONDS)
+
+
+_manifest = load_manifest()
+
+
+@pass_context
+def static_url(context: dict, path: str) -> str:
+    """
+    Хелпер шаблонів: посилання на файл статики з хешем у назві (або на вихідний файл, якщо збірки немає).
+    Template helper: URL of a static file with the content hash in its name (or of the source file without a build).
+    """
+    return str(context["request"].url_for("static", path=_manifest.get(path, path)))
+
+
+if __name__ == "__main__":
+    built = build_assets()
+    print(f"Built {len(built)} assets into {settings.STATIC_BUILD_DIR}")
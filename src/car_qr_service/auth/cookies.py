@@ -0,0 +1,41 @@
+from fastapi import Request, Response
+
+from src.car_qr_service.config import settings
+
+ACCESS_TOKEN_COOKIE = "access_token"
+REFRESH_TOKEN_COOKIE = "refresh_token"
+# Refresh-токен потрібен лише веб-сторінкам, тож браузер не надсилає його з іншими запитами
+# The refresh token is only needed by the web pages, so the browser does not send it with other requests
+REFRESH_TOKEN_COOKIE_PATH = "/pages"
+
+
+def set_auth_cookies(response: Response, access_token: str, refresh_token: str | None = None) -> None:
+    """
+    Встановлює cookie з токенами. httponly=True означає, що JavaScript на клієнті не зможе отримати
+    доступ до цих cookie, що є важливим елементом безпеки.
+    Sets the token cookies. httponly=True keeps them out of reach of client-side JavaScript.
+    """
+    response.set_cookie(key=ACCESS_TOKEN_COOKIE, value=f"Bearer {access_token}", httponly=True)
+    if refresh_token is not None:
+        response.set_cookie(key=REFRESH_TOKEN_COOKIE, value=refresh_token, httponly=True,
+                            path=REFRESH_TOKEN_COOKIE_PATH,
+                            max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600)
+
+
+def clear_auth_cookies(response: Response) -> None:
+    response.delete_cookie(key=ACCESS_TOKEN_COOKIE, httponly=True)
+    response.delete_cookie(key=REFRESH_TOKEN_COOKIE, httponly=True, path=REFRESH_TOKEN_COOKIE_PATH)
+
+
+def schedule_auth_cookies(request: Request, access_token: str, refresh_token: str | None) -> None:
+    """
+    Залежність не має доступу до відповіді, яку поверне ендпоінт, тому нові cookie запам'ятовуються
+    в request.state, а AuthCookieMiddleware додає їх до відповіді.
+    A dependency has no access to the response the endpoint returns, so the new cookies are kept
+    in request.state and AuthCookieMiddleware adds them to the response.
+    """
+    request.state.auth_cookies = lambda response: set_auth_cookies(response, access_token, refresh_token)
+
+
+def schedule_clear_auth_cookies(request: Request) -> None:
+    request.state.auth_cookies = clear_auth_cookies
@@ -0,0 +1,31 @@
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class AuthCookieMiddleware:
+    """
+    Додає до відповіді cookie, які запланувала автентифікація (тихе оновлення сесії за refresh-токеном).
+    Adds the cookies scheduled by authentication (silent session refresh by the refresh token) to the response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+
+        async def send_with_cookies(message: Message) -> None:
+            apply_cookies = state.get("auth_cookies")
+            if message["type"] == "http.response.start" and apply_cookies is not None:
+                # Cookies are formatted by Starlette's own set_cookie/delete_cookie
+                carrier = Response()
+                apply_cookies(carrier)
+                cookies = [(name, value) for name, value in carrier.raw_headers if name == b"set-cookie"]
+                message["headers"] = [*message.get("headers", []), *cookies]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookies)
@@ -0,0 +1,124 @@
+import datetime
+import hashlib
+import secrets
+from dataclasses import dataclass
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.models import RefreshToken, User, utc_now
+from src.car_qr_service.stats.registry import register_stats
+
+
+class RefreshCounters:
+    def __init__(self):
+        self.issued = 0
+        self.rotated = 0
+        self.grace = 0  # a parallel request presented the token that was just replaced
+        self.reused = 0  # a replaced token came back later - its session was revoked
+        self.rejected = 0  # unknown, expired or revoked token
+
+    def snapshot(self) -> dict:
+        return {"issued": self.issued, "rotated": self.rotated, "grace": self.grace,
+                "reused": self.reused, "rejected": self.rejected}
+
+
+counters = RefreshCounters()
+register_stats("refresh_tokens", counters.snapshot)
+
+
+@dataclass(frozen=True, slots=True)
+class RefreshResult:
+    user: User
+    # Новий refresh-токен; None - паралельний запит уже замінив цей токен, клієнт отримає новий від нього
+    # The new refresh token; None - a parallel request already replaced this one and hands out the new token
+    refresh_token: str | None
+
+
+def refresh_token_digest(token: str) -> str:
+    """
+    Токени випадкові (256 біт), тож для зберігання достатньо SHA-256 - дорогий bcrypt тут не потрібен.
+    Tokens are random (256 bits), so SHA-256 is enough to store them - no need for expensive bcrypt.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _add_token(db: AsyncSession, user_id: int, family_id: str, now: datetime.datetime) -> str:
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=refresh_token_digest(token),
+        family_id=family_id,
+        user_id=user_id,
+        created_at=now,
+        expires_at=now + datetime.timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+async def issue_refresh_token(db: AsyncSession, user_id: int) -> str:
+    """
+    Відкриває нову сесію (family) після входу з паролем і повертає її перший refresh-токен.
+    Заодно видаляє прострочені токени цього користувача, тож таблиця не росте.
+    Opens a new session (family) after a password login and returns its first refresh token.
+    Also deletes expired tokens of this user, so the table does not grow.
+    """
+    now = utc_now()
+    await db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id, RefreshToken.expires_at < now))
+    token = _add_token(db, user_id, secrets.token_hex(16), now)
+    await db.commit()
+    counters.issued += 1
+    return token
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> RefreshResult | None:
+    """
+    Обмінює refresh-токен на новий (один пошук за SHA-256 хешем, без bcrypt).
+    Кожен токен одноразовий: якщо вже замінений токен приходить знову після REFRESH_TOKEN_REUSE_GRACE_SECONDS,
+    його, ймовірно, вкрали - відкликається вся сесія. Повертає None, якщо токен не приймається.
+
+    Exchanges a refresh token for a new one (one lookup by the SHA-256 hash, no bcrypt).
+    Every token is single-use: if an already replaced token comes back after REFRESH_TOKEN_REUSE_GRACE_SECONDS,
+    it was probably stolen - the whole session is revoked. Returns None if the token is not accepted.
+    """
+    now = utc_now()
+    stored = (await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == refresh_token_digest(token))
+    )).scalar_one_or_none()
+    if stored is None or stored.revoked_at is not None or stored.expires_at <= now:
+        counters.rejected += 1
+        return None
+
+    claimed = False
+    if stored.used_at is None:
+        # Умовний UPDATE: з паралельних запитів (і воркерів) токен замінить лише один
+        # Conditional UPDATE: only one of parallel requests (and workers) replaces the token
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == stored.id, RefreshToken.used_at.is_(None))
+            .values(used_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = result.rowcount == 1
+    elif now - stored.used_at > datetime.timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS):
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == stored.family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        counters.reused += 1
+        return None
+
+    user = await db.get(User, stored.user_id)
+    if user is None:
+        counters.rejected += 1
+        return None
+    if not claimed:
+        counters.grace += 1
+        return RefreshResult(user=user, refresh_token=None)
+    new_token = _add_token(db, stored.user_id, stored.family_id, now)
+    await db.commit()
+    counters.rotated += 1
+    return RefreshResult(user=user, refresh_token=new_token)
@@ -1,9 +1,10 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Form, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.car_qr_service.auth.refresh import issue_refresh_token, rotate_refresh_token
 from src.car_qr_service.auth.utils import create_access_token, authenticate_user
 from src.car_qr_service.database.database import get_db_session
 
@@ -30,4 +31,30 @@ async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm,
             headers={"WWW-Authenticate": "Bearer"},
         )
     access_token = create_access_token(data={"sub": user.email})
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = await issue_refresh_token(db, user.id)
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+@router.post("/refresh",
+             summary="Обмінює refresh-токен на нову пару токенів (Exchanges a refresh token for a new token pair)")
+async def refresh_access_token(refresh_token: Annotated[str, Form()],
+                               db: Annotated[AsyncSession, Depends(get_db_session)]):
+    """
+    Видає новий access-токен без пароля. Refresh-токен одноразовий: відповідь містить наступний.
+    Повторне використання вже заміненого токена відкликає всю сесію.
+
+    Issues a new access token without the password. The refresh token is single-use: the response holds the next one.
+    Reusing an already replaced token revokes the whole session.
+    If a parallel request has just replaced the same token, only the access token is returned.
+    """
+    refreshed = await rotate_refresh_token(db, refresh_token)
+    if refreshed is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    access_token = create_access_token(data={"sub": refreshed.user.email})
+    if refreshed.refresh_token is None:
+        return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": access_token, "refresh_token": refreshed.refresh_token, "token_type": "bearer"}
@@ -1,7 +1,18 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from src.car_qr_service.config import settings
+from src.car_qr_service.metrics.request import timed_phase
+from src.car_qr_service.stats.registry import register_stats
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
 
 def hash_password(password: str) -> str:
     """Hashing the password using bcrypt."""
@@ -11,3 +22,68 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifying the password if it corresponds to the hashed one."""
     return pwd_context.verify(plain_password, hashed_password)
+
+
+# --- Асинхронний API: bcrypt виконується в окремому пулі, а не в event loop ---
+# --- Async API: bcrypt runs in a separate pool instead of the event loop ---
+_executor: Executor | None = None
+_pending = 0  # number of hashing jobs queued or running right now
+
+
+def _get_executor() -> Executor:
+    """Creates the hashing pool on first use."""
+    global _executor
+    if _executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS,
+                                           thread_name_prefix="password-hash")
+    return _executor
+
+
+async def _run_in_pool(func: Callable[..., T], *args) -> T:
+    """
+    Runs a hashing function in the pool.
+    Raises HTTP 503 instead of queueing when too many jobs are already waiting.
+    """
+    global _pending
+    if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервіс перевантажений, спробуйте пізніше (Service is busy, please try again later)",
+            headers={"Retry-After": "1"},
+        )
+    _pending += 1
+    try:
+        # Measured around the await, so the time includes waiting for a free pool worker
+        with timed_phase("hash"):
+            return await asyncio.get_running_loop().run_in_executor(_get_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """Hashing the password using bcrypt without blocking the event loop."""
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifying the password without blocking the event loop."""
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+
+def shutdown_password_executor() -> None:
+    """Stops the hashing pool (called on application shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+register_stats("password_hashing", lambda: {
+    "executor": settings.PASSWORD_HASH_EXECUTOR,
+    "workers": settings.PASSWORD_HASH_WORKERS,
+    "pending": _pending,
+    "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+})
@@ -0,0 +1,69 @@
+import datetime
+import hashlib
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+from src.car_qr_service.cache import TTLCache
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.models import User
+from src.car_qr_service.stats.registry import register_stats
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """
+    Легкий знімок даних користувача (без пароля і без ORM-стану).
+    Lightweight snapshot of user data (no password hash and no ORM state).
+    Returned by the auth guards instead of the `User` model.
+    """
+    id: int
+    email: str
+    phone_number: str
+    first_name: str
+    last_name: str
+    show_phone_number: bool
+    created_at: datetime.datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            phone_number=user.phone_number,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            show_phone_number=user.show_phone_number,
+            created_at=user.created_at,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class VerifiedToken:
+    """Decoded claims of an already verified JWT together with its user."""
+    claims: dict
+    user: UserSnapshot
+
+
+# Кеш перевірених токенів: sha256(token) -> claims + знімок користувача.
+# Cache of verified tokens: sha256(token) -> claims + user snapshot.
+token_cache: TTLCache[bytes, VerifiedToken] = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS
+)
+register_stats("token_cache", token_cache.stats)
+
+
+def token_digest(token: str) -> bytes:
+    """Key of the token in the cache - the raw token itself is never stored."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drops all cached tokens of the user."""
+    token_cache.discard_where(lambda verified: verified.user.id == user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_tokens_on_user_change(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
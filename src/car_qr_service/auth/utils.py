@@ -1,4 +1,5 @@
 import datetime
+import time
 from typing import Annotated, Optional
 
 from fastapi import Depends, HTTPException, status, Cookie, Request
@@ -6,9 +7,13 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.car_qr_service.auth.security import verify_password
+from src.car_qr_service.auth.cookies import ACCESS_TOKEN_COOKIE, REFRESH_TOKEN_COOKIE, schedule_auth_cookies, \
+    schedule_clear_auth_cookies
+from src.car_qr_service.auth.refresh import rotate_refresh_token
+from src.car_qr_service.auth.security import verify_password_async
+from src.car_qr_service.auth.token_cache import UserSnapshot, VerifiedToken, token_cache, token_digest
 from src.car_qr_service.config import settings
-from src.car_qr_service.database.database import get_db_session
+from src.car_qr_service.database.database import get_db_session, get_read_db_session
 from src.car_qr_service.database.models import User
 from src.car_qr_service.users import crud as users_crud
 
@@ -39,15 +44,54 @@ async def authenticate_user(email: str,
     user = await users_crud.get_user_by_email(email, db)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
     return user
 
 
+async def get_user_from_token(token: str, db: AsyncSession) -> UserSnapshot | None:
+    """
+    Перевіряє JWT і повертає знімок його користувача, або None якщо токен невалідний.
+    Перевірені токени кешуються до свого `exp`, тож повторні запити не декодують JWT
+    і не читають користувача з бази даних.
+
+    Verifies the JWT and returns a snapshot of its user, or None if the token is invalid.
+    Verified tokens are cached until their `exp`, so repeated requests neither decode
+    the JWT nor read the user from the database.
+    """
+    digest = token_digest(token)
+    verified = token_cache.get(digest)
+    if verified is not None:
+        return verified.user
+
+    generation = token_cache.generation
+    try:
+        payload = jwt.decode(token,
+                             settings.JWT_SECRET_KEY,
+                             algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return None
+    email: str | None = payload.get("sub")
+    if email is None:
+        return None
+
+    user = await users_crud.get_user_by_email(email, db)
+    if user is None:
+        return None
+    snapshot = UserSnapshot.from_user(user)
+
+    # Запис у кеші не може пережити сам токен
+    # A cache entry must never outlive the token itself
+    expires_at = payload.get("exp")
+    ttl = expires_at - time.time() if isinstance(expires_at, (int, float)) else None
+    token_cache.set(digest, VerifiedToken(claims=payload, user=snapshot), ttl=ttl, generation=generation)
+    return snapshot
+
+
 # --- ОХОРОНЕЦЬ №1: ДЛЯ JSON API ---
 # Він вимагає токен в заголовку і кидає помилку HTTPException.
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)],
-                           db: Annotated[AsyncSession, Depends(get_db_session)]) -> User:
+                           db: Annotated[AsyncSession, Depends(get_read_db_session)]) -> UserSnapshot:
     """
     Отримує поточного користувача з токена JWT у заголовку авторизації.
     Підвищує httpexception, якщо автентифікація не вдається.
@@ -61,17 +105,7 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)],
         detail="Не вдалося перевірити облікові дані",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token,
-                             settings.JWT_SECRET_KEY,
-                             algorithms=[settings.JWT_ALGORITHM])
-        email: str | None = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    user = await users_crud.get_user_by_email(email, db)
+    user = await get_user_from_token(token, db)
     if user is None:
         raise credentials_exception
     return user
@@ -81,31 +115,33 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)],
 # Він читає токен з cookie і повертає None, якщо щось не так.
 async def get_current_user_from_cookie(
         request: Request,
-        db: AsyncSession = Depends(get_db_session),
-) -> Optional[User]:
+        db: AsyncSession = Depends(get_read_db_session),
+        primary: AsyncSession = Depends(get_db_session),
+) -> Optional[UserSnapshot]:
     """
     Gets the current user from the JWT token stored in the browser cookie.
     Returns None if the user is not authenticated.
     Used for web page endpoints that need redirection.
+    Коли access-токен прострочений, сесія тихо оновлюється за refresh-cookie - без пароля і без bcrypt.
+    When the access token has expired, the session is silently renewed by the refresh cookie - no password, no bcrypt.
     """
-    access_token = request.cookies.get("access_token")
+    access_token = request.cookies.get(ACCESS_TOKEN_COOKIE)
+    if access_token:
+        scheme, _, param = access_token.partition(" ")
+        if scheme.lower() == "bearer":
+            user = await get_user_from_token(param, db)
+            if user is not None:
+                return user
 
-    if not access_token:
+    refresh_token = request.cookies.get(REFRESH_TOKEN_COOKIE)
+    if not refresh_token:
         return None
-
-    try:
-        scheme, _, param = access_token.partition(" ")
-        if scheme.lower() != "bearer":
-            return None
-
-        payload = jwt.decode(
-            param, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
-        email: str | None = payload.get("sub")
-        if email is None:
-            return None
-    except JWTError:
+    # Refresh-токен змінює стан, тож завжди обмінюється в основній БД
+    # Rotation writes, so it always runs against the primary database
+    refreshed = await rotate_refresh_token(primary, refresh_token)
+    if refreshed is None:
+        schedule_clear_auth_cookies(request)
         return None
-
-    user = await users_crud.get_user_by_email(email=email, db=db)
-    return user
+    new_access_token = create_access_token(data={"sub": refreshed.user.email})
+    schedule_auth_cookies(request, new_access_token, refreshed.refresh_token)
+    return UserSnapshot.from_user(refreshed.user)
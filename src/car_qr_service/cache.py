@@ -0,0 +1,91 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Невеликий in-process кеш з обмеженим розміром (LRU) і часом життя записів (TTL).
+    Small in-process cache bounded by size (LRU eviction) and entry lifetime (TTL).
+
+    All operations are synchronous and never await, so the cache is safe to use
+    from coroutines running on a single event loop without extra locking.
+
+    `generation` is bumped on every invalidation. A reader that has to go to the
+    database should remember it before the query and pass it to `set()`, so that
+    a value loaded before a concurrent invalidation is not stored back.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        """Returns cached value or None if the key is missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None, generation: int | None = None) -> None:
+        """
+        Stores value for `ttl` seconds (cache default if not given).
+        If `generation` is given and the cache was invalidated since, the value is dropped.
+        """
+        if self.max_size <= 0:
+            return
+        if generation is not None and generation != self.generation:
+            return
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        if lifetime <= 0:
+            return
+        self._data[key] = (time.monotonic() + lifetime, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> None:
+        """Removes a single key (if present)."""
+        self.generation += 1
+        self._data.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[V], bool]) -> None:
+        """Removes every entry whose value matches the predicate. O(n), meant for rare events."""
+        self.generation += 1
+        for key in [key for key, (_, value) in self._data.items() if predicate(value)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        """Removes all entries (counters are kept)."""
+        self.generation += 1
+        self._data.clear()
+
+    def stats(self) -> dict:
+        """Returns cache counters for monitoring."""
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,187 @@
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator, Literal
+
+from pydantic import ValidationError
+from pydantic_core import to_json
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.car_qr_service.cars import crud
+from src.car_qr_service.cars.plates import normalize_license_plate
+from src.car_qr_service.cars.schemas import CarCreate, CarImportResult, CarImportRowError
+from src.car_qr_service.cars.search import index_cars
+from src.car_qr_service.config import settings
+
+ImportFormat = Literal["csv", "ndjson"]
+CSV_COLUMNS = ("license_plate", "brand", "model")
+
+
+class ImportTooLarge(Exception):
+    """
+    Файл має більше рядків, ніж CAR_IMPORT_MAX_ROWS: імпорт скасовується повністю, нічого не зберігається.
+    The file has more rows than CAR_IMPORT_MAX_ROWS: the whole import is rolled back, nothing is saved.
+    """
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Splits a byte stream into text lines without reading the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        tail += decoder.decode(chunk)
+        *lines, tail = tail.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+async def _iter_records(chunks: AsyncIterator[bytes],
+                        import_format: ImportFormat) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """
+    Yields (line number, record, parse error) for every non-empty line.
+    CSV must start with a header row; quoted values with line breaks are not supported.
+    """
+    header: list[str] | None = None
+    line_number = 0
+    async for line in _iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        if import_format == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Each line must be a JSON object"
+                continue
+            yield line_number, record, None
+        else:
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [value.strip() for value in values]
+                continue
+            yield line_number, dict(zip(header, values)), None
+
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors())
+
+
+async def import_cars(db: AsyncSession,
+                      chunks: AsyncIterator[bytes],
+                      import_format: ImportFormat,
+                      owner_id: int) -> CarImportResult:
+    """
+    Імпортує автомобілі з потоку CSV/NDJSON в одній транзакції.
+    Рядки перевіряються схемою CarCreate і додаються пачками багаторядковими INSERT.
+
+    Imports cars from a CSV/NDJSON stream in a single transaction.
+    Rows are validated with the CarCreate schema and inserted in chunked multi-row INSERTs.
+    Raises ImportTooLarge (nothing is saved) if the stream has more than CAR_IMPORT_MAX_ROWS rows.
+    """
+    result = CarImportResult()
+    seen_plates: set[str] = set()
+    pending: list[tuple[int, dict]] = []
+    created: list[dict] = []
+
+    async def flush() -> None:
+        inserted = await crud.insert_cars_chunk(db, [row for _, row in pending])
+        result.created += len(inserted)
+        for line_number, row in pending:
+            if row["license_plate"] in inserted:
+                created.append(row)
+            else:
+                result.conflicts.append(CarImportRowError(
+                    line=line_number, license_plate=row["license_plate"],
+                    detail="Автомобіль з таким номером вже існує (License plate already exists)",
+                ))
+        pending.clear()
+
+    try:
+        rows_total = 0
+        async for line_number, record, parse_error in _iter_records(chunks, import_format):
+            rows_total += 1
+            if rows_total > settings.CAR_IMPORT_MAX_ROWS:
+                # Chunks inserted so far are not committed yet, the rollback below drops them
+                raise ImportTooLarge(f"Too many rows, the limit is {settings.CAR_IMPORT_MAX_ROWS}")
+            if parse_error is not None:
+                result.errors.append(CarImportRowError(line=line_number, detail=parse_error))
+                continue
+            try:
+                car = CarCreate.model_validate(record)
+            except ValidationError as e:
+                result.errors.append(CarImportRowError(
+                    line=line_number, license_plate=record.get("license_plate"), detail=_validation_detail(e),
+                ))
+                continue
+            plate_key = normalize_license_plate(car.license_plate)
+            if plate_key in seen_plates:
+                result.conflicts.append(CarImportRowError(
+                    line=line_number, license_plate=car.license_plate,
+                    detail="Номер повторюється у файлі (Duplicate license plate in the file)",
+                ))
+                continue
+            seen_plates.add(plate_key)
+            pending.append((line_number, {**car.model_dump(), "owner_id": owner_id}))
+            if len(pending) >= settings.CAR_IMPORT_CHUNK_SIZE:
+                await flush()
+        await flush()
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    index_cars((row["license_plate"], row["brand"], row["model"]) for row in created)
+    result.conflicts.sort(key=lambda conflict: conflict.line)
+    return result
+
+
+async def export_cars(db: AsyncSession, owner_id: int, export_format: ImportFormat) -> AsyncIterator[bytes]:
+    """
+    Вивантажує автомобілі користувача потоком у форматі CSV або NDJSON (сумісному з імпортом).
+    Streams the user's cars as CSV or NDJSON (compatible with the import).
+
+    FastAPI closes the request session before a streamed body is sent, so the
+    generator keeps using the (reusable) session and closes it again when done.
+    """
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if export_format == "csv":
+            writer.writerow(CSV_COLUMNS)
+        async for car in crud.stream_user_cars(db, owner_id):
+            if export_format == "csv":
+                writer.writerow([car.license_plate, car.brand, car.model])
+            else:
+                buffer.write(json.dumps({column: getattr(car, column) for column in CSV_COLUMNS},
+                                        ensure_ascii=False) + "\n")
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
+    finally:
+        await db.close()
+
+
+async def stream_car_list(db: AsyncSession, owner_id: int, after_id: int | None = None) -> AsyncIterator[bytes]:
+    """
+    Список автомобілів користувача як NDJSON (один CarRead на рядок) - потоком з серверного курсора.
+    The user's cars as NDJSON (one CarRead per line), streamed from a server-side result.
+    """
+    try:
+        buffer = bytearray()
+        async for car in crud.stream_user_cars(db, owner_id, after_id=after_id):
+            buffer += to_json(car)
+            buffer += b"\n"
+            if len(buffer) >= 64 * 1024:
+                yield bytes(buffer)
+                buffer.clear()
+        yield bytes(buffer)
+    finally:
+        await db.close()
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+from src.car_qr_service.cache import TTLCache
+from src.car_qr_service.cars.plates import normalize_license_plate
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.models import User
+from src.car_qr_service.stats.registry import register_stats
+
+
+@dataclass(frozen=True, slots=True)
+class OwnerContact:
+    """
+    Публічні контактні дані власника.
+    Номер телефону зберігається тільки якщо власник дозволив його показ.
+    Public contact data of the owner.
+    The phone number is kept only when the owner allowed to show it.
+    """
+    show_phone_number: bool
+    phone_number: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class PublicCarView:
+    """
+    Легка проєкція автомобіля для публічного пошуку (без ORM-об'єктів).
+    Lightweight projection of a car for the public lookup (no ORM objects inside).
+    """
+    id: int
+    license_plate: str
+    brand: str
+    model: str
+    owner_id: int
+    owner: OwnerContact
+
+
+# Кеш: нормалізований номерний знак -> публічна проєкція авто.
+# Cache: normalized license plate -> public projection of the car.
+plate_cache: TTLCache[str, PublicCarView] = TTLCache(
+    max_size=settings.PLATE_CACHE_MAX_SIZE, ttl=settings.PLATE_CACHE_TTL_SECONDS
+)
+register_stats("plate_cache", plate_cache.stats)
+
+
+def invalidate_plate(*license_plates: str | None) -> None:
+    """Drops cached lookups for the given license plates."""
+    for license_plate in license_plates:
+        if license_plate:
+            plate_cache.pop(normalize_license_plate(license_plate))
+
+
+def invalidate_owner(owner_id: int) -> None:
+    """Drops cached lookups of all cars that belong to the owner."""
+    plate_cache.discard_where(lambda view: view.owner_id == owner_id)
+
+
+# Будь-яка зміна профілю користувача (наприклад, show_phone_number чи телефон)
+# скидає кеш його автомобілів, незалежно від того, який код її зробив.
+# Any change of a user profile (e.g. show_phone_number or phone) drops the cache
+# of their cars, no matter which code path made the change.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_owner_on_user_change(mapper, connection, target: User) -> None:
+    invalidate_owner(target.id)
@@ -1,9 +1,17 @@
+from typing import AsyncIterator
+
 from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from src.car_qr_service.cars.cache import OwnerContact, PublicCarView, invalidate_plate, plate_cache
+from src.car_qr_service.cars.plates import normalize_license_plate
+from src.car_qr_service.cars.records import CAR_RECORD_COLUMNS, CarRecord
 from src.car_qr_service.cars.schemas import CarCreate, CarUpdate
-from src.car_qr_service.database.models import Car
+from src.car_qr_service.cars.search import index_car, unindex_plate
+from src.car_qr_service.cars.short_codes import generate_short_code, is_valid_short_code
+from src.car_qr_service.database.models import Car, User
 
 
 async def create_car(db: AsyncSession, car: CarCreate, owner_id: int) -> Car:
@@ -18,6 +26,8 @@ async def create_car(db: AsyncSession, car: CarCreate, owner_id: int) -> Car:
     db.add(db_car)
     await db.commit()
     await db.refresh(db_car)
+    invalidate_plate(db_car.license_plate)
+    index_car(db_car.license_plate, db_car.brand, db_car.model)
     return db_car
 
 
@@ -32,6 +42,79 @@ async def get_user_cars(db: AsyncSession, owner_id: int) -> list[Car]:
     result = await db.execute(query)
     return list(result.scalars().all())
 
+
+async def get_user_cars_page(
+        db: AsyncSession,
+        owner_id: int,
+        limit: int,
+        after_id: int | None = None,
+        newest_first: bool = False,
+) -> list[CarRecord]:
+    """
+    Повертає одну сторінку автомобілів користувача за курсором (keyset по Car.id):
+    авто, що йдуть після `after_id` у вибраному порядку. На відміну від OFFSET, база не
+    перебирає попередні сторінки - запит читає лише `limit` рядків з індексу (owner_id, id).
+    Вибираються лише колонки (CarRecord), без створення ORM-об'єктів.
+
+    Returns one keyset page (by Car.id) of the user's cars: the cars that follow `after_id`
+    in the chosen order. Unlike OFFSET, the database does not walk through previous pages -
+    the query reads only `limit` rows from the (owner_id, id) index.
+    Only the columns are selected (CarRecord), no ORM objects are built.
+    """
+    query = select(*CAR_RECORD_COLUMNS).where(Car.owner_id == owner_id)
+    if newest_first:
+        if after_id is not None:
+            query = query.where(Car.id < after_id)
+        query = query.order_by(Car.id.desc())
+    else:
+        if after_id is not None:
+            query = query.where(Car.id > after_id)
+        query = query.order_by(Car.id)
+    result = await db.execute(query.limit(limit))
+    return [CarRecord(*row) for row in result]
+
+
+async def stream_user_cars(db: AsyncSession, owner_id: int, after_id: int | None = None) -> AsyncIterator[CarRecord]:
+    """
+    Повертає автомобілі користувача потоком (серверний курсор), не завантажуючи весь список.
+    Streams the user's cars from a server-side result instead of loading the whole list.
+    """
+    query = (
+        select(*CAR_RECORD_COLUMNS)
+        .where(Car.owner_id == owner_id)
+        .order_by(Car.id)
+        .execution_options(yield_per=500)
+    )
+    if after_id is not None:
+        query = query.where(Car.id > after_id)
+    result = await db.stream(query)
+    async for row in result:
+        yield CarRecord(*row)
+
+
+async def insert_cars_chunk(db: AsyncSession, rows: list[dict]) -> set[str]:
+    """
+    Додає пачку автомобілів одним багаторядковим INSERT без коміту.
+    Рядки з номером, який вже існує, пропускаються (ON CONFLICT DO NOTHING).
+    Inserts a chunk of cars with a single multi-row INSERT, without committing.
+    Rows whose license plate already exists are skipped (ON CONFLICT DO NOTHING).
+    :return: Номери, які були додані (license plates that were inserted).
+    """
+    if not rows:
+        return set()
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    # Core INSERT bypasses the ORM validator, so the normalized key is filled in here
+    values = [{**row, "license_plate_normalized": normalize_license_plate(row["license_plate"])} for row in rows]
+    query = (
+        dialect_insert(Car)
+        .values(values)
+        .on_conflict_do_nothing()
+        .returning(Car.license_plate)
+    )
+    result = await db.execute(query)
+    return set(result.scalars().all())
+
+
 async def get_car_by_id(db: AsyncSession, car_id: int) -> Car | None:
     """Отримує автомобіль за його ID."""
     result = await db.execute(select(Car).filter(Car.id == car_id))
@@ -40,30 +123,133 @@ async def get_car_by_id(db: AsyncSession, car_id: int) -> Car | None:
 
 async def update_car(db: AsyncSession, car: Car, car_update: CarUpdate) -> Car:
     """Оновлює дані автомобіля."""
+    old_license_plate = car.license_plate
     update_data = car_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(car, key, value)
     await db.commit()
     await db.refresh(car)
+    invalidate_plate(old_license_plate, car.license_plate)
+    if normalize_license_plate(old_license_plate) != car.license_plate_normalized:
+        unindex_plate(old_license_plate)
+    index_car(car.license_plate, car.brand, car.model)
     return car
 
 
 async def delete_car(db: AsyncSession, car: Car):
     """Видаляє автомобіль з бази даних."""
+    license_plate = car.license_plate
     await db.delete(car)
     await db.commit()
+    invalidate_plate(license_plate)
+    unindex_plate(license_plate)
 
 
 async def get_car_by_license_plate(db: AsyncSession, license_plate: str) -> Car | None:
     """
     Отримує автомобіль за його номерним знаком.
     В оптимізованому варіанті додаємо дані про користувача,
-    Щоб в шаблоні результатів відображати телефон, якщо користувач дозволив
+    Щоб в шаблоні результатів відображати телефон, якщо користувач дозволив.
+    Номер у будь-якому написанні ("AA 1234 BB", "аа1234вв") шукається за нормалізованим ключем -
+    це один пошук по унікальному індексу.
+    A plate in any spelling is looked up by its normalized key - a single unique index lookup.
     """
     query = (
         select(Car)
         .options(selectinload(Car.owner))  # add user data
-        .where(Car.license_plate == license_plate)
+        .where(Car.license_plate_normalized == normalize_license_plate(license_plate))
     )
     result = await db.execute(query)
     return result.scalars().first()
+
+
+async def get_public_car_by_license_plate(db: AsyncSession, license_plate: str) -> PublicCarView | None:
+    """
+    Отримує публічну проєкцію автомобіля за номерним знаком.
+    Спочатку дивимось у кеш, і тільки при промаху йдемо в базу даних.
+    Gets the public projection of a car by its license plate.
+    Looks into the cache first and goes to the database only on a miss.
+    The cache is keyed by the normalized plate, so every spelling shares one entry.
+    """
+    plate_key = normalize_license_plate(license_plate)
+    if not plate_key:
+        return None
+    cached = plate_cache.get(plate_key)
+    if cached is not None:
+        return cached
+
+    generation = plate_cache.generation
+    row = (await db.execute(_public_car_query().where(Car.license_plate_normalized == plate_key))).first()
+    if row is None:
+        return None
+    view = _public_car_view(row)
+    plate_cache.set(plate_key, view, generation=generation)
+    return view
+
+
+async def get_public_car_by_short_code(db: AsyncSession, short_code: str) -> PublicCarView | None:
+    """
+    Публічна проєкція авто за кодом з QR-посилання /s/{code}: один пошук по унікальному індексу short_code.
+    Код не кешується окремо, тож після заміни коду старий перестає працювати одразу в усіх воркерах.
+    Public projection of a car by the code of its /s/{code} QR link: one unique index lookup on short_code.
+    Codes are not cached separately, so a replaced code stops working at once in every worker.
+    """
+    if not is_valid_short_code(short_code):
+        return None
+    generation = plate_cache.generation
+    row = (await db.execute(_public_car_query().where(Car.short_code == short_code))).first()
+    if row is None:
+        return None
+    view = _public_car_view(row)
+    # The plate lookups of the page (search, SMS, call) then hit the cache
+    plate_cache.set(normalize_license_plate(view.license_plate), view, generation=generation)
+    return view
+
+
+async def get_owned_short_code(db: AsyncSession, license_plate: str, owner_id: int) -> str | None:
+    """
+    Код QR-посилання авто, якщо авто належить користувачу. Читається з бази, а не з кешу проєкцій,
+    щоб після заміни коду жоден воркер не надрукував старий.
+    Code of the car's QR link if the car belongs to the user. Read from the database, not from the
+    projection cache, so that after a rotation no worker prints the old code.
+    """
+    query = select(Car.short_code).where(
+        Car.license_plate_normalized == normalize_license_plate(license_plate), Car.owner_id == owner_id
+    )
+    return (await db.execute(query)).scalar_one_or_none()
+
+
+async def rotate_short_code(db: AsyncSession, car: Car) -> Car:
+    """
+    Видає авто новий код QR-посилання; старий код (і надруковані з ним наліпки) перестає працювати.
+    Змінюється один рядок - посилання інших авто не зачіпаються.
+    Gives the car a new QR link code; the old code (and stickers printed with it) stops working.
+    Only this row changes - links of other cars are not affected.
+    """
+    car.short_code = generate_short_code()
+    await db.commit()
+    await db.refresh(car)
+    return car
+
+
+def _public_car_query():
+    # One joined query of the needed columns instead of loading Car and then its owner
+    return (
+        select(Car.id, Car.license_plate, Car.brand, Car.model, Car.owner_id,
+               User.show_phone_number, User.phone_number)
+        .join(Car.owner)
+    )
+
+
+def _public_car_view(row) -> PublicCarView:
+    return PublicCarView(
+        id=row.id,
+        license_plate=row.license_plate,
+        brand=row.brand,
+        model=row.model,
+        owner_id=row.owner_id,
+        owner=OwnerContact(
+            show_phone_number=bool(row.show_phone_number),
+            phone_number=row.phone_number if row.show_phone_number else None,
+        ),
+    )
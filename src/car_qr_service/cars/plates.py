@@ -0,0 +1,25 @@
+import unicodedata
+
+# Кириличні літери, які на номерних знаках виглядають так само, як латинські.
+# Українські номери використовують лише такі літери, тому "АА1234ВВ" кирилицею і латиницею - це один номер.
+# Cyrillic letters that look exactly like Latin ones on a license plate.
+# Ukrainian plates use only such letters, so "АА1234ВВ" typed in Cyrillic or Latin is the same plate.
+_CYRILLIC_TO_LATIN = str.maketrans({
+    "А": "A", "В": "B", "С": "C", "Е": "E", "Н": "H", "І": "I", "К": "K",
+    "М": "M", "О": "O", "Р": "P", "Т": "T", "У": "Y", "Х": "X",
+})
+
+
+def normalize_license_plate(license_plate: str) -> str:
+    """
+    Канонічний ключ номерного знака для пошуку та унікальності.
+    Регістр, пробіли, дефіси та інші роздільники не враховуються, кириличні двійники
+    латинських літер замінюються латинськими: "аа 1234-вв" -> "AA1234BB".
+
+    Canonical license plate key for lookups and uniqueness.
+    Case, spaces, dashes and other separators are ignored, Cyrillic look-alikes of Latin
+    letters are replaced with Latin ones: "аа 1234-вв" -> "AA1234BB".
+    """
+    # NFKC turns full-width and other compatibility forms into plain letters and digits
+    folded = unicodedata.normalize("NFKC", license_plate).upper().translate(_CYRILLIC_TO_LATIN)
+    return "".join(char for char in folded if char.isalnum())
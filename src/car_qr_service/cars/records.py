@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+
+from src.car_qr_service.database.models import Car
+
+
+@dataclass(frozen=True, slots=True)
+class CarRecord:
+    """
+    Легкий запис автомобіля для списків: лише колонки, без ORM-стану і identity map.
+    Поля і їхній порядок такі ж, як у CarRead, тож запис серіалізується в JSON напряму.
+
+    Lightweight car record for listings: plain columns, no ORM state and no identity map.
+    Fields and their order match CarRead, so the record is serialized to JSON directly.
+    """
+    license_plate: str
+    brand: str
+    model: str
+    id: int
+    owner_id: int
+    short_code: str
+
+    @classmethod
+    def from_car(cls, car: Car) -> "CarRecord":
+        return cls(license_plate=car.license_plate, brand=car.brand, model=car.model, id=car.id, owner_id=car.owner_id,
+                   short_code=car.short_code)
+
+
+# Колонки для select(...) у порядку полів CarRecord (Columns for select(...) in the CarRecord field order)
+CAR_RECORD_COLUMNS = (Car.license_plate, Car.brand, Car.model, Car.id, Car.owner_id, Car.short_code)
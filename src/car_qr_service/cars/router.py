@@ -1,16 +1,24 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, status, HTTPException, Response
+from fastapi import APIRouter, Depends, Query, Request, status, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.car_qr_service.auth.utils import get_current_user
-from src.car_qr_service.cars import crud
-from src.car_qr_service.cars.schemas import CarCreate, CarRead, CarUpdate
-from src.car_qr_service.database.database import get_db_session
-from src.car_qr_service.database.models import User
+from src.car_qr_service.cars import bulk, crud
+from src.car_qr_service.cars.records import CarRecord
+from src.car_qr_service.cars.schemas import CarCreate, CarImportResult, CarRead, CarUpdate
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.database import get_db_session, get_read_db_session
+from src.car_qr_service.serialization import json_response
+from src.car_qr_service.auth.token_cache import UserSnapshot
 
 router = APIRouter(prefix="/cars", tags=["cars"])
 
+# Типи вмісту для масового імпорту/експорту
+# Content types of the bulk import/export
+BULK_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
 
 @router.post(
     "/",
@@ -20,7 +28,7 @@ router = APIRouter(prefix="/cars", tags=["cars"])
 )
 async def add_new_car(
     body: CarCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[UserSnapshot, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db_session)],
 ):
     """
@@ -35,7 +43,8 @@ async def add_new_car(
     - **db**: Database session.
     """
     new_car = await crud.create_car(db=db, car=body, owner_id=current_user.id)
-    return new_car
+    # The car was just written from a validated body - no need to validate it again on the way out
+    return json_response(CarRecord.from_car(new_car), status_code=status.HTTP_201_CREATED)
 
 
 @router.get(
@@ -44,24 +53,106 @@ async def add_new_car(
     summary="Отримати список своїх автомобілів. (Get list of my cars)"
 )
 async def get_my_cars(
+    request: Request,
     # Ця залежність робить ендпоінт захищеним.
     # Якщо токен невалідний, код далі не виконається.
     # This dependency makes the endpoint secure.
     # If the token is invalid, the code will not continue.
-    current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[AsyncSession, Depends(get_db_session)],
+    current_user: Annotated[UserSnapshot, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_read_db_session)],
+    after: Annotated[int | None, Query(ge=0, description="Курсор: id останнього авто попередньої сторінки "
+                                                         "(Cursor: id of the last car of the previous page)")] = None,
+    limit: Annotated[int, Query(ge=1, le=settings.CARS_PAGE_MAX_SIZE)] = settings.CARS_PAGE_SIZE,
 ):
     """
     Endpoint для отримання списку автомобілів,
     що належать поточному залогіненому користувачу.
+    Список посторінковий (за курсором `after`); посилання на наступну сторінку - у заголовку `Link`.
+    З `Accept: application/x-ndjson` усі авто після курсора віддаються потоком, по одному на рядок.
+
     Endpoint to get a list of cars owned by the currently logged in user.
+    The list is paged by the `after` cursor; the next page URL is in the `Link` header.
+    With `Accept: application/x-ndjson` all cars after the cursor are streamed, one per line.
     """
+    if BULK_MEDIA_TYPES["ndjson"] in request.headers.get("accept", ""):
+        return StreamingResponse(bulk.stream_car_list(db, owner_id=current_user.id, after_id=after),
+                                 media_type=BULK_MEDIA_TYPES["ndjson"])
+
     # Ми передаємо ID поточного користувача в CRUD-функцію,
     # щоб отримати тільки його автомобілі.
     # We pass the current user's ID to the CRUD function,
     # to get only their cars.
-    cars = await crud.get_user_cars(db=db, owner_id=current_user.id)
-    return cars
+    # One extra row tells whether there is a next page
+    cars = await crud.get_user_cars_page(db=db, owner_id=current_user.id, limit=limit + 1, after_id=after)
+    headers = {}
+    if len(cars) > limit:
+        cars = cars[:limit]
+        next_url = request.url.include_query_params(after=cars[-1].id, limit=limit)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    # Records are already in the CarRead shape, so they skip the response_model validation
+    return json_response(cars, headers=headers)
+
+
+@router.post(
+    "/import",
+    response_model=CarImportResult,
+    summary="Масовий імпорт автомобілів з CSV або NDJSON. (Bulk import of cars from CSV or NDJSON)",
+    openapi_extra={"requestBody": {"required": True, "content": {
+        media_type: {"schema": {"type": "string"}} for media_type in BULK_MEDIA_TYPES.values()
+    }}},
+)
+async def import_cars(
+    request: Request,
+    current_user: Annotated[UserSnapshot, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db_session)],
+):
+    """
+    Endpoint для масового додавання автомобілів (наприклад, при підключенні автопарку).
+    Тіло запиту читається потоком: CSV з заголовком `license_plate,brand,model`
+    або NDJSON (один JSON-об'єкт на рядок). Все додається в одній транзакції,
+    а рядки з уже зареєстрованими номерами повертаються як конфлікти.
+
+    Endpoint for bulk creation of cars (e.g. when onboarding a fleet).
+    The body is read as a stream: CSV with a `license_plate,brand,model` header
+    or NDJSON (one JSON object per line). Everything is inserted in one transaction,
+    rows with already registered plates are reported as conflicts.
+    A file over CAR_IMPORT_MAX_ROWS rows is rejected with 413 and nothing is imported.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    formats = {media_type: name for name, media_type in BULK_MEDIA_TYPES.items()}
+    formats["application/jsonl"] = "ndjson"
+    if content_type not in formats:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Очікується text/csv або application/x-ndjson (Expected text/csv or application/x-ndjson)",
+        )
+    try:
+        return await bulk.import_cars(db, request.stream(), formats[content_type], owner_id=current_user.id)
+    except bulk.ImportTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Файл не імпортовано: забагато рядків (Nothing was imported: {e})",
+        ) from None
+
+
+@router.get(
+    "/export",
+    summary="Вивантажити свої автомобілі в CSV або NDJSON. (Export my cars as CSV or NDJSON)",
+)
+async def export_cars(
+    current_user: Annotated[UserSnapshot, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_read_db_session)],
+    export_format: Annotated[Literal["csv", "ndjson"], Query(alias="format")] = "csv",
+):
+    """
+    Потокове вивантаження автомобілів у форматі, який приймає імпорт.
+    Streamed export of cars in the same format the import accepts.
+    """
+    return StreamingResponse(
+        bulk.export_cars(db, owner_id=current_user.id, export_format=export_format),
+        media_type=BULK_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="cars.{export_format}"'},
+    )
 
 
 @router.patch(
@@ -72,7 +163,7 @@ async def get_my_cars(
 async def update_car_details(
     car_id: int,
     body: CarUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[UserSnapshot, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db_session)],
 ):
     """
@@ -89,7 +180,34 @@ async def update_car_details(
             status_code=403, detail="Недостатньо прав для оновлення цього автомобіля"
         )
     updated_car = await crud.update_car(db=db, car=db_car, car_update=body)
-    return updated_car
+    return json_response(CarRecord.from_car(updated_car))
+
+
+@router.post(
+    "/{car_id}/short-code",
+    response_model=CarRead,
+    summary="Замінити код QR-посилання авто. (Replace the QR link code of the car)",
+)
+async def rotate_car_short_code(
+    car_id: int,
+    current_user: Annotated[UserSnapshot, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(get_db_session)],
+):
+    """
+    Видає авто новий код QR-посилання /s/{code}, наприклад якщо наліпку вкрали або сфотографували.
+    Старий код одразу перестає працювати; QR-коди інших авто не змінюються.
+    Gives the car a new /s/{code} QR link code, e.g. when the sticker was stolen or photographed.
+    The old code stops working at once; QR codes of other cars do not change.
+    """
+    db_car = await crud.get_car_by_id(db, car_id=car_id)
+    if db_car is None:
+        raise HTTPException(status_code=404, detail="Автомобіль не знайдено")
+    if db_car.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403, detail="Недостатньо прав для оновлення цього автомобіля"
+        )
+    rotated_car = await crud.rotate_short_code(db, car=db_car)
+    return json_response(CarRecord.from_car(rotated_car))
 
 
 @router.delete(
@@ -99,7 +217,7 @@ async def update_car_details(
 )
 async def delete_car_by_id(
     car_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[UserSnapshot, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db_session)],
 ):
     """
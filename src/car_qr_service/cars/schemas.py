@@ -1,6 +1,18 @@
 from typing import Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator
+
+from src.car_qr_service.cars.plates import normalize_license_plate
+
+
+def _check_license_plate(license_plate: str | None) -> str | None:
+    """Номер повинен містити хоча б одну літеру або цифру (The plate needs at least one letter or digit)."""
+    if license_plate is None:
+        return None
+    license_plate = license_plate.strip()
+    if not normalize_license_plate(license_plate):
+        raise ValueError("License plate must contain letters or digits")
+    return license_plate
 
 
 class CarBase(BaseModel):
@@ -9,6 +21,11 @@ class CarBase(BaseModel):
     brand: str
     model: str
 
+    @field_validator("license_plate")
+    @classmethod
+    def validate_license_plate(cls, value: str | None) -> str | None:
+        return _check_license_plate(value)
+
 
 class CarCreate(CarBase):
     """Схема для створення нового автомобіля (вхідні дані)."""
@@ -19,6 +36,7 @@ class CarRead(CarBase):
     """Схема для читання даних про автомобіль (вихідні дані)."""
     id: int
     owner_id: int
+    short_code: str  # code of the /s/{code} QR link
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -33,6 +51,11 @@ class CarUpdate(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator("license_plate")
+    @classmethod
+    def validate_license_plate(cls, value: str | None) -> str | None:
+        return _check_license_plate(value)
+
 
 class PublicCarInfo(BaseModel):
     """
@@ -44,3 +67,19 @@ class PublicCarInfo(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+
+class CarImportRowError(BaseModel):
+    """Рядок імпорту, який не було додано (Import row that was not inserted)."""
+    line: int
+    license_plate: str | None = None
+    detail: str
+
+
+class CarImportResult(BaseModel):
+    """
+    Результат масового імпорту автомобілів.
+    Result of a bulk car import.
+    """
+    created: int = 0
+    conflicts: list[CarImportRowError] = []  # license plate is already registered
+    errors: list[CarImportRowError] = []  # row could not be parsed or validated
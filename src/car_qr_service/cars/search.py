@@ -0,0 +1,230 @@
+import asyncio
+import bisect
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.car_qr_service.cars.plates import normalize_license_plate
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.models import Car
+from src.car_qr_service.stats.registry import register_stats
+
+
+@dataclass(frozen=True, slots=True)
+class PlateSuggestion:
+    """
+    Публічні дані авто для підказок (ті ж поля, що й у PublicCarInfo).
+    Public car data for suggestions (the same fields as PublicCarInfo).
+    """
+    brand: str
+    model: str
+
+
+def _deletes(key: str) -> set[str]:
+    """All variants of the key with exactly one character removed."""
+    return {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if the keys differ by at most one insertion, deletion, substitution or swap of neighbours."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    prefix = 0
+    while prefix < len(a) and a[prefix] == b[prefix]:
+        prefix += 1
+    if len(a) < len(b):
+        return a[prefix:] == b[prefix + 1:]
+    if a[prefix + 1:] == b[prefix + 1:]:
+        return True
+    # Neighbours swapped: "AB12" vs "BA12"
+    return a[prefix + 1:prefix + 2] + a[prefix:prefix + 1] == b[prefix:prefix + 2] and a[prefix + 2:] == b[prefix + 2:]
+
+
+class PlateSearchIndex:
+    """
+    Індекс нормалізованих номерів у пам'яті для пошуку під час набору.
+    - префіксний пошук: відсортований список ключів + bisect;
+    - нечіткий пошук (одна помилка): symmetric delete - кожен ключ і всі його варіанти
+      без одного символу ведуть до самого ключа, тож кандидати знаходяться без перебору таблиці.
+
+    In-memory index of normalized plates for as-you-type search.
+    - prefix search: a sorted list of keys + bisect;
+    - fuzzy search (one typo): symmetric delete - every key and all its variants without one
+      character point to the key itself, so candidates are found without scanning the table.
+    """
+
+    def __init__(self):
+        self._keys: list[str] = []
+        self._cars: dict[str, PlateSuggestion] = {}
+        self._variants: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._cars)
+
+    def _link(self, key: str) -> None:
+        for variant in _deletes(key) | {key}:
+            self._variants.setdefault(variant, set()).add(key)
+
+    def _unlink(self, key: str) -> None:
+        for variant in _deletes(key) | {key}:
+            keys = self._variants.get(variant)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._variants[variant]
+
+    def add(self, key: str, suggestion: PlateSuggestion) -> None:
+        """Adds or replaces one car."""
+        if not key:
+            return
+        if key not in self._cars:
+            bisect.insort(self._keys, key)
+            self._link(key)
+        self._cars[key] = suggestion
+
+    def add_many(self, items: Iterable[tuple[str, PlateSuggestion]]) -> None:
+        """Adds many cars and sorts the key list once (used for the initial load and bulk imports)."""
+        new_keys = []
+        for key, suggestion in items:
+            if not key:
+                continue
+            if key not in self._cars:
+                new_keys.append(key)
+                self._link(key)
+            self._cars[key] = suggestion
+        if new_keys:
+            self._keys.extend(new_keys)
+            self._keys.sort()
+
+    def remove(self, key: str) -> None:
+        """Removes one car (if present)."""
+        if self._cars.pop(key, None) is None:
+            return
+        position = bisect.bisect_left(self._keys, key)
+        del self._keys[position]
+        self._unlink(key)
+
+    def search(self, query: str, limit: int) -> list[PlateSuggestion]:
+        """
+        Exact match first, then plates starting with the query, then plates one typo away.
+        The query must already be normalized.
+        """
+        found: dict[str, None] = {}
+        if query in self._cars:
+            found[query] = None
+        position = bisect.bisect_left(self._keys, query)
+        while len(found) < limit and position < len(self._keys) and self._keys[position].startswith(query):
+            found.setdefault(self._keys[position])
+            position += 1
+        if len(found) < limit:
+            candidates = set()
+            for variant in _deletes(query) | {query}:
+                candidates |= self._variants.get(variant, set())
+            for key in sorted(candidates):
+                if len(found) >= limit:
+                    break
+                if key not in found and _within_one_edit(query, key):
+                    found[key] = None
+        return [self._cars[key] for key in list(found)[:limit]]
+
+
+# Індекс будується з таблиці cars при першому пошуку, далі оновлюється після кожного
+# створення/зміни/видалення авто. Зміни з інших процесів підхоплюються періодичним перебудуванням.
+# The index is built from the cars table on the first search and then updated after every
+# car create/update/delete. Changes made by other processes are picked up by a periodic rebuild.
+_index: PlateSearchIndex | None = None
+_built_at = 0.0
+_build_lock = asyncio.Lock()
+_pending: list[tuple[str, PlateSuggestion | None]] | None = None  # changes made while a build is running
+_builds = 0
+
+
+def _apply(index: PlateSearchIndex, key: str, suggestion: PlateSuggestion | None) -> None:
+    if suggestion is None:
+        index.remove(key)
+    else:
+        index.add(key, suggestion)
+
+
+def _record(key: str, suggestion: PlateSuggestion | None) -> None:
+    if _pending is not None:
+        _pending.append((key, suggestion))
+    if _index is not None:
+        _apply(_index, key, suggestion)
+
+
+def index_car(license_plate: str, brand: str, model: str) -> None:
+    """Adds or refreshes a committed car in the search index."""
+    _record(normalize_license_plate(license_plate), PlateSuggestion(brand=brand, model=model))
+
+
+def index_cars(cars: Iterable[tuple[str, str, str]]) -> None:
+    """Adds many committed (license_plate, brand, model) cars at once, e.g. after a bulk import."""
+    items = [(normalize_license_plate(plate), PlateSuggestion(brand=brand, model=model)) for plate, brand, model in cars]
+    if _pending is not None:
+        _pending.extend(items)
+    if _index is not None:
+        _index.add_many(items)
+
+
+def unindex_plate(license_plate: str) -> None:
+    """Removes a committed deletion (or the old plate of a renamed car) from the search index."""
+    _record(normalize_license_plate(license_plate), None)
+
+
+def reset_plate_index() -> None:
+    """Drops the index; the next search builds it from the database again."""
+    global _index, _built_at
+    _index = None
+    _built_at = 0.0
+
+
+async def _build(db: AsyncSession) -> None:
+    global _index, _built_at, _pending, _builds
+    _pending = []
+    try:
+        index = PlateSearchIndex()
+        query = select(Car.license_plate_normalized, Car.brand, Car.model).execution_options(yield_per=5000)
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            index.add_many((key, PlateSuggestion(brand=brand, model=model)) for key, brand, model in partition)
+        # Changes committed while the table was being read are replayed in order (they are idempotent)
+        for key, suggestion in _pending:
+            _apply(index, key, suggestion)
+        _index, _built_at = index, time.monotonic()
+        _builds += 1
+    finally:
+        _pending = None
+
+
+async def search_plates(db: AsyncSession, query: str, limit: int | None = None) -> list[PlateSuggestion]:
+    """
+    Підказки для введеного фрагмента номера (без звернення до бази, крім побудови індексу).
+    Suggestions for a typed plate fragment (no database access except for building the index).
+    Queries shorter than PLATE_SEARCH_MIN_LENGTH return nothing, so the index can not be enumerated.
+    """
+    key = normalize_license_plate(query)
+    if len(key) < settings.PLATE_SEARCH_MIN_LENGTH:
+        return []
+    stale = time.monotonic() - _built_at > settings.PLATE_SEARCH_REBUILD_SECONDS
+    if _index is None or (stale and not _build_lock.locked()):
+        async with _build_lock:
+            if _index is None or time.monotonic() - _built_at > settings.PLATE_SEARCH_REBUILD_SECONDS:
+                await _build(db)
+    limit = min(limit or settings.PLATE_SEARCH_MAX_RESULTS, settings.PLATE_SEARCH_MAX_RESULTS)
+    return _index.search(key, limit)
+
+
+register_stats("plate_search", lambda: {
+    "built": _index is not None,
+    "plates": len(_index) if _index is not None else 0,
+    "builds": _builds,
+    "age_seconds": round(time.monotonic() - _built_at, 3) if _index is not None else None,
+})
@@ -0,0 +1,34 @@
+import secrets
+import string
+
+from src.car_qr_service.config import settings
+
+# base62: лише літери й цифри, тож код не потребує URL-кодування
+# base62: letters and digits only, so the code needs no URL encoding
+ALPHABET = string.digits + string.ascii_letters
+SHORT_CODE_MAX_LENGTH = 16  # width of the cars.short_code column
+
+
+def generate_short_code() -> str:
+    """
+    Випадковий непрозорий код авто для QR-посилання /s/{code}. Код не виводиться з номера,
+    тож за QR-кодом не можна дізнатися номер, а код можна замінити, не змінюючи номер.
+    Random opaque code of a car for the /s/{code} QR link. It is not derived from the plate,
+    so the QR code does not reveal the plate, and the code can be replaced without touching the plate.
+    """
+    return "".join(secrets.choice(ALPHABET) for _ in range(settings.SHORT_CODE_LENGTH))
+
+
+def is_valid_short_code(code: str) -> bool:
+    """Cheap check before the database lookup: a code is 1..16 base62 characters."""
+    return 0 < len(code) <= SHORT_CODE_MAX_LENGTH and all(char in ALPHABET for char in code)
+
+
+def build_short_url(short_code: str) -> str:
+    """
+    Коротке посилання, яке кодується в QR: коротший URL - менша версія QR, рідша картинка,
+    швидший рендер і надійніше сканування.
+    The short link encoded into the QR code: a shorter URL means a lower QR version, a sparser image,
+    faster rendering and more reliable scanning.
+    """
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/s/{short_code}"
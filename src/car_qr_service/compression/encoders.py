@@ -0,0 +1,136 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from src.car_qr_service.config import settings
+
+try:
+    import brotli  # optional: poetry install --extras compression
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard  # optional: poetry install --extras compression
+except ImportError:
+    zstandard = None
+
+
+class StreamCompressor(ABC):
+    """
+    Потоковий компресор однієї відповіді. `flush` віддає все стиснене на цей момент, не закриваючи потік,
+    тож частини стрімінгової відповіді доходять до клієнта без очікування кінця.
+
+    Streaming compressor of one response. `flush` returns everything compressed so far without closing
+    the stream, so chunks of a streaming response reach the client without waiting for its end.
+    """
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compresses the next chunk; may return nothing until enough data is buffered."""
+
+    @abstractmethod
+    def flush(self) -> bytes:
+        """Returns everything compressed so far, keeping the stream open."""
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        """Returns the rest of the stream and closes it."""
+
+
+class GzipCompressor(StreamCompressor):
+    def __init__(self):
+        self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor(StreamCompressor):
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor(StreamCompressor):
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+# Кодування, доступні в цьому оточенні (brotli і zstd - лише якщо встановлено їхні пакети)
+# Encodings available in this environment (brotli and zstd only if their packages are installed)
+_encoders: dict[str, Callable[[], StreamCompressor]] = {"gzip": GzipCompressor}
+if brotli is not None:
+    _encoders["br"] = BrotliCompressor
+if zstandard is not None:
+    _encoders["zstd"] = ZstdCompressor
+
+
+def register_encoder(name: str, factory: Callable[[], StreamCompressor]) -> None:
+    """Registers a content coding (its name as used in Accept-Encoding / Content-Encoding)."""
+    _encoders[name] = factory
+
+
+def create_compressor(name: str) -> StreamCompressor:
+    return _encoders[name]()
+
+
+def _parse_accept_encoding(header: str) -> dict[str, float]:
+    accepted = {}
+    for item in header.lower().split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Обирає кодування для відповіді: найвища вага q серед тих, що приймає клієнт і є в COMPRESSION_ENCODINGS;
+    за однакової ваги - порядок COMPRESSION_ENCODINGS. None - надсилати без стиснення.
+
+    Picks the response coding: the highest q among those the client accepts and COMPRESSION_ENCODINGS lists;
+    on equal weights the order of COMPRESSION_ENCODINGS wins. None means sending the body as is.
+    """
+    if not accept_encoding:
+        return None
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for name in (name.strip() for name in settings.COMPRESSION_ENCODINGS.split(",")):
+        if name not in _encoders:
+            continue
+        quality = accepted.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
@@ -0,0 +1,163 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.car_qr_service.compression.encoders import StreamCompressor, create_compressor, negotiate_encoding
+from src.car_qr_service.config import settings
+from src.car_qr_service.stats.registry import register_stats
+
+# Стискаються лише текстові формати; PNG з QR-кодами, ZIP і PDF уже стиснені
+# Only text formats are compressed; QR PNGs, ZIP and PDF are already compressed
+_COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def _is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type in _COMPRESSIBLE_TYPES
+
+
+class RouteCompressionStats:
+    def __init__(self):
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+
+class CompressionCounters:
+    def __init__(self):
+        self.routes: dict[str, RouteCompressionStats] = {}
+        self.skipped = 0
+
+    def record(self, route: str, bytes_in: int, bytes_out: int) -> None:
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = RouteCompressionStats()
+        stats.responses += 1
+        stats.bytes_in += bytes_in
+        stats.bytes_out += bytes_out
+
+    def snapshot(self) -> dict:
+        return {
+            "skipped": self.skipped,
+            "routes": {
+                route: {
+                    "responses": stats.responses,
+                    "bytes_in": stats.bytes_in,
+                    "bytes_out": stats.bytes_out,
+                    "bytes_saved": stats.bytes_in - stats.bytes_out,
+                }
+                for route, stats in self.routes.items()
+            },
+        }
+
+
+counters = CompressionCounters()
+
+
+def _route_name(scope: Scope) -> str:
+    # FastAPI puts the matched route into the scope, its path template keeps the metric keys bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class CompressionMiddleware:
+    """
+    Стискає відповіді кодуванням, яке приймає клієнт (zstd / br / gzip), якщо тіло текстове
+    і не менше COMPRESSION_MINIMUM_SIZE байтів. Стрімінгові відповіді стискаються частинами
+    без накопичення в пам'яті. Економія байтів рахується окремо для кожного маршруту.
+
+    Compresses responses with a coding the client accepts (zstd / br / gzip) when the body is text
+    and at least COMPRESSION_MINIMUM_SIZE bytes. Streaming responses are compressed chunk by chunk
+    without being buffered. Saved bytes are counted per route.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(scope, send, encoding))
+
+
+class _CompressingSend:
+    """Wraps `send` of one response: holds back the start message until the first body chunk decides."""
+
+    def __init__(self, scope: Scope, send: Send, encoding: str):
+        self.scope = scope
+        self.send = send
+        self.encoding = encoding
+        self.start: Message | None = None
+        self.compressor: StreamCompressor | None = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not self._should_compress(start, body, more_body):
+                counters.skipped += 1
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compressor = create_compressor(self.encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["content-encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                # The compressed body is not byte-identical to the original, so the validator becomes weak
+                headers["etag"] = f"W/{etag}"
+            del headers["content-length"]
+            if not more_body:
+                compressed = self._compress(body, more_body)
+                headers["content-length"] = str(len(compressed))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(start)
+
+        if self.compressor is None:
+            await self.send(message)
+            return
+        await self.send({"type": "http.response.body", "body": self._compress(body, more_body), "more_body": more_body})
+
+    def _should_compress(self, start: Message, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=start["headers"])
+        if start["status"] < 200 or start["status"] in (204, 206, 304):
+            return False
+        if "content-encoding" in headers or not _is_compressible(headers.get("content-type", "")):
+            return False
+        if "content-length" in headers:
+            return int(headers["content-length"]) >= settings.COMPRESSION_MINIMUM_SIZE
+        return more_body or len(body) >= settings.COMPRESSION_MINIMUM_SIZE
+
+    def _compress(self, body: bytes, more_body: bool) -> bytes:
+        compressed = self.compressor.compress(body)
+        compressed += self.compressor.flush() if more_body else self.compressor.finish()
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        if not more_body:
+            counters.record(_route_name(self.scope), self.bytes_in, self.bytes_out)
+        return compressed
+
+
+register_stats("compression", counters.snapshot)
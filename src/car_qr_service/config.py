@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -20,9 +21,88 @@ class Settings(BaseSettings):
     """
     # URL to connect to database
     DB_URL: str = DB_URL
+    DB_REPLICA_URL: str | None = None  # optional read-only replica for public lookups and listings
+    DB_REPLICA_STICKY_SECONDS: float = 5  # reads of a client go to the primary this long after its write
+    DB_ECHO: bool = False  # log every SQL statement (debug only - very expensive under load)
+    DB_POOL_SIZE: int = 5  # connections kept open in the pool
+    DB_MAX_OVERFLOW: int = 10  # extra connections allowed above DB_POOL_SIZE at peak
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds after which a connection is reopened (-1 disables)
+    DB_POOL_PRE_PING: bool = False  # test connections on checkout (useful with network databases)
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL lets readers work while a writer commits
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # safe with WAL and much cheaper than FULL
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # wait for a lock instead of failing with "database is locked"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # bytes of the database file mapped into memory
+    SQLITE_CACHE_SIZE: int = -64_000  # page cache size (negative value = KiB)
     JWT_SECRET_KEY: str  # secret key is been generated by developer and stores in .env file only - do not share
     JWT_ALGORITHM: str = "HS256"  # hash algorithm for JSON Web Token
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30  # minutes period for token life validity
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30  # lifetime of a refresh token; every use replaces it with a new one
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: float = 10  # a replaced token still works this long (parallel requests), later reuse revokes the session
+    PLATE_CACHE_MAX_SIZE: int = 10_000  # max number of license plates kept in the public lookup cache (0 disables it)
+    PLATE_CACHE_TTL_SECONDS: float = 300  # lifetime of a cached public lookup result
+    PLATE_SEARCH_MIN_LENGTH: int = 3  # shortest plate fragment the as-you-type search answers
+    PLATE_SEARCH_MAX_RESULTS: int = 10  # cap on suggestions returned by the plate search
+    PLATE_SEARCH_REBUILD_SECONDS: float = 600  # rebuild the search index from the table this often (other workers' changes)
+    RATE_LIMIT_ENABLED: bool = True  # token-bucket limits on the public endpoints
+    RATE_LIMIT_STORE: str = "memory"  # bucket store ("memory" = per process; register a shared one for many workers)
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # take the client IP from X-Forwarded-For (only behind a trusted proxy)
+    RATE_LIMIT_LOOKUP_PER_IP: str = "60/minute"  # GET /public/cars/{plate} per client IP ("" disables)
+    RATE_LIMIT_LOOKUP_PER_PLATE: str = "120/minute"  # GET /public/cars/{plate} per plate
+    RATE_LIMIT_SEARCH_PER_IP: str = "30/minute"  # POST /public/search per client IP
+    RATE_LIMIT_SEARCH_PER_PLATE: str = "60/minute"  # POST /public/search per plate
+    RATE_LIMIT_SUGGEST_PER_IP: str = "120/minute"  # as-you-type suggestions per client IP
+    RATE_LIMIT_SMS_PER_IP: str = "10/hour"  # SMS to owners per client IP
+    RATE_LIMIT_SMS_PER_PLATE: str = "5/hour"  # SMS to one car, from everyone
+    RATE_LIMIT_CALL_PER_IP: str = "10/hour"  # call requests per client IP
+    RATE_LIMIT_CALL_PER_PLATE: str = "5/hour"  # call requests to one car, from everyone
+    TOKEN_CACHE_MAX_SIZE: int = 10_000  # max number of verified JWTs kept in memory (0 disables the cache)
+    TOKEN_CACHE_TTL_SECONDS: float = 60  # how long a verified JWT is trusted without re-checking (never past its exp)
+    CAR_IMPORT_CHUNK_SIZE: int = 500  # rows per multi-row INSERT during bulk import
+    CAR_IMPORT_MAX_ROWS: int = 20_000  # max rows accepted by one bulk import request
+    CARS_PAGE_SIZE: int = 100  # default page size of GET /cars/ (keyset pagination by car id)
+    CARS_PAGE_MAX_SIZE: int = 1000  # largest page a client may ask for (use NDJSON streaming for more)
+    CABINET_PAGE_SIZE: int = 50  # cars rendered per cabinet page; more are loaded on scroll
+    PUBLIC_BASE_URL: str = "http://127.0.0.1:8001"  # scheme and host of the links encoded into QR codes (your domain)
+    SHORT_CODE_LENGTH: int = 8  # base62 characters of a car's short QR code (8 = ~47 bits, up to 16)
+    QR_CACHE_MAX_ITEMS: int = 2048  # number of rendered QR images kept in memory
+    QR_CACHE_DIR: Path | None = None  # optional directory for rendered QR images shared between workers/restarts
+    QR_RENDER_WORKERS: int = 2  # processes used to render QR codes for bulk export
+    QR_EXPORT_WINDOW: int = 16  # max QR renders in flight per export stream (bounds memory)
+    TEMPLATE_AUTO_RELOAD: bool = False  # re-read edited template files on render (development only)
+    TEMPLATE_BYTECODE_CACHE_DIR: Path | None = None  # compiled templates shared between workers/restarts
+    TEMPLATE_PRELOAD: bool = True  # compile all templates on startup instead of on their first request
+    TEMPLATE_FRAGMENT_CACHE_MAX_ITEMS: int = 64  # rendered static pages (index, login, register) kept in memory
+    STATIC_BUILD_DIR: Path = ROOT_DIR / "build" / "static"  # output of `python -m src.car_qr_service.assets`
+    STATIC_MAX_AGE_SECONDS: int = 3600  # Cache-Control max-age of built assets requested by their plain name
+    COMPRESSION_ENABLED: bool = True  # compress text responses (HTML, HTMX partials, JSON)
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # smaller bodies are sent as is (compression would not pay off)
+    COMPRESSION_ENCODINGS: str = "zstd,br,gzip"  # server preference; br/zstd need `--extras compression`
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1 (fast) .. 9 (small)
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0 .. 11; high levels are for build-time assets, not live responses
+    COMPRESSION_ZSTD_LEVEL: int = 3  # 1 .. 22
+    METRICS_ENABLED: bool = True  # per-route latency histograms and phase timings exported on /metrics
+    METRICS_SERVER_TIMING: bool = False  # add a Server-Timing header (db/hash/qr/template) to every response
+    JSON_ENCODER: Literal["auto", "orjson", "pydantic", "stdlib"] = "auto"  # auto = orjson if installed, else pydantic-core
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"  # pool type used for bcrypt hashing
+    PASSWORD_HASH_WORKERS: int = 4  # number of workers in the bcrypt pool
+    PASSWORD_HASH_MAX_PENDING: int = 64  # queued + running bcrypt jobs before answering 503
+    NOTIFY_WORKER_ENABLED: bool = True  # run the SMS/call outbox worker inside the web process
+    NOTIFY_SMS_PROVIDER: str = "console"  # provider that delivers SMS ("console" logs them, "fake" keeps them in memory)
+    NOTIFY_CALL_PROVIDER: str = "console"  # provider that places calls
+    NOTIFY_PROVIDER_CONCURRENCY: int = 4  # max simultaneous requests to one provider
+    NOTIFY_BATCH_SIZE: int = 50  # messages claimed from the outbox per round
+    NOTIFY_POLL_INTERVAL_SECONDS: float = 1  # how often the worker looks for due messages when idle
+    NOTIFY_MAX_ATTEMPTS: int = 5  # deliveries tried before a message is marked failed
+    NOTIFY_RETRY_BASE_SECONDS: float = 2  # first retry delay, doubled on every next attempt
+    NOTIFY_RETRY_MAX_SECONDS: float = 300  # upper bound of the retry delay
+    NOTIFY_LEASE_SECONDS: float = 60  # a claimed message is re-queued if its worker did not finish by then
+    NOTIFY_DEDUP_WINDOW_SECONDS: int = 60  # the same message to the same car is sent once per window
+    SCAN_EVENTS_ENABLED: bool = True  # record public car lookups and QR short link scans
+    SCAN_FLUSHER_ENABLED: bool = True  # run the flusher that writes buffered scan events inside the web process
+    SCAN_BUFFER_MAX_EVENTS: int = 10_000  # ring buffer size; when full the oldest unsaved event is dropped
+    SCAN_FLUSH_BATCH_SIZE: int = 500  # events per multi-row INSERT; a full batch triggers a flush at once
+    SCAN_FLUSH_INTERVAL_SECONDS: float = 2  # flush whatever is buffered at least this often
 
     model_config = SettingsConfigDict(env_file=".env") # read settings from created .env file
 
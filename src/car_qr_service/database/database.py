@@ -1,15 +1,166 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import DeclarativeBase
+import time
+from typing import Annotated, AsyncGenerator
+
+from fastapi import Depends, Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.car_qr_service.config import settings
+from src.car_qr_service.metrics.request import instrument_engine
+from src.car_qr_service.stats.registry import register_stats
+
+
+class PoolMetrics:
+    """
+    Лічильники пулу з'єднань: скільки разів і як довго чекали на з'єднання.
+    Connection pool counters: how often and how long requests waited for a connection.
+    """
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.wait_count += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Standard async queue pool that also measures how long a checkout waits for a connection."""
+
+    metrics: PoolMetrics
+
+    def recreate(self):
+        # engine.dispose() replaces the pool - keep counting into the same metrics
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Налаштування SQLite для кожного нового з'єднання.
+    WAL дозволяє читачам не блокуватися записом, busy_timeout - чекати замість помилки "database is locked".
+    SQLite tuning for every new connection.
+    WAL lets readers proceed during a write, busy_timeout waits instead of failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.close()
+
+
+def build_engine(url: str) -> AsyncEngine:
+    """
+    Створює асинхронний "двигун" з налаштуваннями пулу та SQL-логування з `Settings`.
+    Creates an async engine with pool and SQL logging options taken from `Settings`.
+    """
+    db_url = make_url(url)
+    is_sqlite = db_url.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and db_url.database in (None, "", ":memory:")
+
+    options: dict = {"echo": settings.DB_ECHO}
+    if not in_memory:
+        # In-memory SQLite lives inside one connection, so it keeps its default static pool
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    new_engine = create_async_engine(url, **options)
+
+    metrics = PoolMetrics()
+    pool = new_engine.sync_engine.pool
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        pool.metrics = metrics
+    if is_sqlite:
+        event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    @event.listens_for(new_engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.checkouts += 1
+
+    @event.listens_for(new_engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.checkins += 1
+
+    new_engine.sync_engine.pool_metrics = metrics
+    instrument_engine(new_engine)
+    return new_engine
+
+
+def pool_stats(db_engine: AsyncEngine) -> dict:
+    """Current state and counters of the engine pool."""
+    pool = db_engine.sync_engine.pool
+    metrics: PoolMetrics = db_engine.sync_engine.pool_metrics
+    stats = {
+        "connects": metrics.connects,
+        "checkouts": metrics.checkouts,
+        "checkins": metrics.checkins,
+        "wait_count": metrics.wait_count,
+        "wait_seconds_total": round(metrics.wait_seconds_total, 6),
+        "wait_seconds_max": round(metrics.wait_seconds_max, 6),
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    return stats
+
 
 # Створюємо асинхронний "двигун" для взаємодії з базою даних.
-# echo=True дозволяє бачити згенеровані SQL-запити в консолі (корисно для дебагу).
-engine = create_async_engine(settings.DB_URL, echo=True)
+# SQL-логування (DB_ECHO) за замовчуванням вимкнене: під навантаженням воно з'їдає більшість CPU.
+# SQL logging (DB_ECHO) is off by default: under load it eats most of the CPU.
+engine = build_engine(settings.DB_URL)
+register_stats("db_pool", lambda: pool_stats(engine))
+
+
+
+class PrimarySession(Session):
+    """Session class of the primary database (lets us listen to its commits only)."""
+
 
 # Створюємо фабрику асинхронних сесій.
 # Кожна сесія - це окремий "діалог" з базою даних.
-async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
+async_session_factory = async_sessionmaker(engine, expire_on_commit=False, sync_session_class=PrimarySession)
+
+# Необов'язкова репліка тільки для читання (наприклад, PostgreSQL streaming replica).
+# Optional read-only replica (e.g. a PostgreSQL streaming replica).
+replica_engine = build_engine(settings.DB_REPLICA_URL) if settings.DB_REPLICA_URL else None
+replica_session_factory = (
+    async_sessionmaker(replica_engine, expire_on_commit=False) if replica_engine is not None else None
+)
+if replica_engine is not None:
+    register_stats("db_replica_pool", lambda: pool_stats(replica_engine))
+
+# Cookie, яке після запису на деякий час направляє читання цього клієнта на основну БД,
+# щоб він одразу бачив власні зміни (read-your-writes).
+# Cookie that routes reads of this client to the primary for a while after a write,
+# so the client immediately sees its own changes (read-your-writes).
+PRIMARY_STICKY_COOKIE = "db_primary_until"
 
 
 # Створюємо базовий клас для наших моделей.
@@ -18,13 +169,70 @@ class Base(DeclarativeBase):
     pass
 
 
-async def get_db_session() -> AsyncSession:
+@event.listens_for(PrimarySession, "after_commit")
+def _remember_write(session) -> None:
+    """Marks the request as a writer, so the response makes the client stick to the primary."""
+    request_state = session.info.get("request_state")
+    if request_state is not None:
+        request_state.db_primary_sticky = True
+
+
+async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Функція-генератор для отримання сесії бази даних.
     Використовується в FastAPI Depends для керування сесіями.
+    Сесія завжди працює з основною БД (primary) - використовуйте її для запису.
+    The session always talks to the primary database - use it for writes.
+
+    Сесія "лінива": з'єднання береться з пулу лише при першому запиті до БД, тому
+    редіректи анонімів, відповіді 401 і кешовані відповіді не займають з'єднання.
+    FastAPI кешує залежність у межах запиту, тож усі вкладені залежності отримують одну сесію.
+    The session is lazy: a connection is checked out of the pool only on the first query, so
+    anonymous redirects, 401 answers and cached responses never hold a connection.
+    FastAPI caches the dependency per request, so all nested dependencies share one session.
     """
     async with async_session_factory() as session:
+        session.info["request_state"] = request.state
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+# Запити, які нічого не змінюють; інші методи читають теж з основної БД
+# Requests that change nothing; other methods read from the primary as well
+_READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _is_sticky_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db_session(
+        request: Request,
+        primary: Annotated[AsyncSession, Depends(get_db_session)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сесія для залежностей, які тільки читають дані.
+    Йде на репліку, якщо вона налаштована і клієнт нещодавно нічого не змінював,
+    інакше - на основну БД (сесія спільна з `get_db_session` в межах запиту).
+
+    Session for read-only dependencies.
+    Goes to the replica if one is configured, the request is read-only (GET/HEAD) and the client
+    has not written recently, otherwise to the primary (shared with `get_db_session` within the request,
+    so a write request that also authenticates the user uses one session and one connection).
+    The primary session does not check out a connection unless it is actually used.
+    """
+    if (replica_session_factory is None
+            or request.method not in _READ_ONLY_METHODS
+            or _is_sticky_to_primary(request)):
+        yield primary
+        return
+    async with replica_session_factory() as session:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
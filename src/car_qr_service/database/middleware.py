@@ -0,0 +1,36 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.database import PRIMARY_STICKY_COOKIE
+
+
+class PrimaryStickinessMiddleware:
+    """
+    Після запиту, який щось записав в основну БД, ставить cookie, що на кілька секунд
+    направляє читання цього клієнта на основну БД замість репліки.
+
+    After a request that wrote to the primary database, sets a cookie that routes reads
+    of this client to the primary instead of the replica for a few seconds.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and state.get("db_primary_sticky"):
+                seconds = settings.DB_REPLICA_STICKY_SECONDS
+                cookie = (f"{PRIMARY_STICKY_COOKIE}={time.time() + seconds:.3f}; "
+                          f"Max-Age={int(seconds) + 1}; Path=/; HttpOnly; SameSite=Lax")
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
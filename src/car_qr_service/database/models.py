@@ -1,11 +1,22 @@
 import datetime
 
-from sqlalchemy import String, ForeignKey, func, DateTime, Boolean
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, ForeignKey, func, DateTime, Boolean, Index, Integer, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+
+from src.car_qr_service.cars.plates import normalize_license_plate
+from src.car_qr_service.cars.short_codes import SHORT_CODE_MAX_LENGTH, generate_short_code
 
 from src.car_qr_service.database.database import Base
 
 
+def utc_now() -> datetime.datetime:
+    """
+    Поточний час UTC без часової зони (колонка - TIMESTAMP WITHOUT TIME ZONE).
+    Current UTC time without tzinfo (the column is TIMESTAMP WITHOUT TIME ZONE, asyncpg rejects aware values).
+    """
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
 class User(Base):
     """
     Модель Користувача.
@@ -22,7 +33,7 @@ class User(Base):
     first_name: Mapped[str] = mapped_column(String(128),default="", server_default="")
     last_name: Mapped[str] = mapped_column(String(128), default="", server_default="")
     created_at: Mapped[datetime.datetime] = mapped_column(
-        DateTime, default=datetime.datetime.now(datetime.timezone.utc), server_default=func.now()
+        DateTime, default=utc_now, server_default=func.now()
     )
     show_phone_number: Mapped[bool] = mapped_column(Boolean, default=False, server_default="0")
     # Зв'язок "один-до-багатьох": один користувач може мати багато автомобілів.
@@ -42,12 +53,103 @@ class Car(Base):
     __tablename__ = "cars"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    license_plate: Mapped[str] = mapped_column(String(20), unique=True, index=True)
+    license_plate: Mapped[str] = mapped_column(String(20))
+    # Канонічний ключ номера (див. normalize_license_plate): за ним шукаємо і перевіряємо унікальність.
+    # Canonical plate key (see normalize_license_plate): used for lookups and uniqueness.
+    license_plate_normalized: Mapped[str] = mapped_column(String(20), unique=True, index=True)
     brand: Mapped[str] = mapped_column(String(50))
     model: Mapped[str] = mapped_column(String(50))
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    # Випадковий код для QR-посилання /s/{code}; заміна коду (rotate) не зачіпає інші авто.
+    # Random code of the /s/{code} QR link; replacing it (rotation) does not affect other cars.
+    short_code: Mapped[str] = mapped_column(
+        String(SHORT_CODE_MAX_LENGTH), unique=True, index=True, default=generate_short_code
+    )
     # Зв'язок "багато-до-одного": багато авто можуть належати одному користувачу.
     # back_populates="cars" вказує на атрибут 'cars' в моделі User.
     # Many-to-one relationship: many cars can belong to the same user.
     # back_populates="cars" points to the 'cars' attribute in the User model.
     owner: Mapped["User"] = relationship(back_populates="cars")
+
+    __table_args__ = (
+        # Сторінки авто власника за курсором (id) читаються з індексу без сортування
+        # Keyset pages of an owner's cars (by id) are read from the index without sorting
+        Index("ix_cars_owner_id_id", "owner_id", "id"),
+    )
+
+    @validates("license_plate")
+    def _sync_normalized_plate(self, key: str, license_plate: str) -> str:
+        """Keeps the normalized key in step with every assignment of the plate."""
+        self.license_plate_normalized = normalize_license_plate(license_plate)
+        return license_plate
+
+
+class Notification(Base):
+    """
+    Модель повідомлення власнику (SMS або дзвінок) у черзі відправки (outbox).
+    Запит лише додає рядок, а фоновий воркер надсилає його через провайдера.
+    Notification Model (SMS or call to the owner) in the outbox.
+    The request only inserts the row, a background worker delivers it through a provider.
+    """
+    __tablename__ = "notifications"
+    __table_args__ = (
+        # Воркер вибирає готові до відправки повідомлення (The worker picks messages that are due)
+        Index("ix_notifications_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(16))  # "sms" or "call"
+    license_plate_normalized: Mapped[str] = mapped_column(String(20))
+    message: Mapped[str] = mapped_column(Text, default="", server_default="")
+    # Однакові повідомлення в межах вікна дедуплікації мають однаковий ключ
+    # Identical messages within the deduplication window share the key
+    dedup_key: Mapped[str] = mapped_column(String(64), unique=True)
+    status: Mapped[str] = mapped_column(String(16), default="pending", server_default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=utc_now)
+    locked_until: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=utc_now, server_default=func.now())
+    sent_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class RefreshToken(Base):
+    """
+    Refresh-токен сесії. Зберігається лише SHA-256 хеш токена. Кожне використання замінює токен новим
+    у тій самій сесії (family); повторне використання заміненого токена означає крадіжку - сесія відкликається.
+    Refresh token of a session. Only the SHA-256 hash of the token is stored. Every use replaces the token
+    with a new one in the same session (family); reusing a replaced token means theft - the session is revoked.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    family_id: Mapped[str] = mapped_column(String(32), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=utc_now, server_default=func.now())
+    expires_at: Mapped[datetime.datetime] = mapped_column(DateTime)
+    used_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)  # replaced by a newer token
+    revoked_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class ScanEvent(Base):
+    """
+    Подія сканування: публічний пошук авто за номером або перехід за коротким посиланням з QR-коду.
+    Події накопичуються в пам'яті і записуються пачками (див. scans/flusher.py).
+    Scan event: a public lookup of a car by plate or a visit of the short link from its QR code.
+    Events are buffered in memory and written in batches (see scans/flusher.py).
+    """
+    __tablename__ = "scan_events"
+    __table_args__ = (
+        # Статистика сканувань одного авто за період (Scans of one car over a period)
+        Index("ix_scan_events_car_id_scanned_at", "car_id", "scanned_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # Без зовнішнього ключа: подія пишеться пізніше за скан, і авто на той час вже може бути видалене
+    # No foreign key: the event is written after the scan, and the car may have been deleted by then
+    car_id: Mapped[int] = mapped_column(Integer)
+    scanned_at: Mapped[datetime.datetime] = mapped_column(DateTime)
+    source: Mapped[str] = mapped_column(String(8))  # "plate" (plate lookup) or "short" (QR short link)
+    client_kind: Mapped[str] = mapped_column(String(8))  # coarse User-Agent class: mobile, desktop, bot, other
+    ip_prefix: Mapped[str] = mapped_column(String(48))  # /24 of an IPv4 or /48 of an IPv6 address, never the full IP
@@ -1,28 +1,95 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
 
+from src.car_qr_service.assets import create_static_app
+from src.car_qr_service.auth.middleware import AuthCookieMiddleware
+from src.car_qr_service.auth.security import shutdown_password_executor
+from src.car_qr_service.compression.middleware import CompressionMiddleware
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.database import async_session_factory
+from src.car_qr_service.database.middleware import PrimaryStickinessMiddleware
+from src.car_qr_service.metrics.middleware import MetricsMiddleware
+from src.car_qr_service.metrics.router import router as metrics_router
+from src.car_qr_service.notifications.worker import start_notification_worker, stop_notification_worker
+from src.car_qr_service.ratelimit.middleware import RateLimitMiddleware
+from src.car_qr_service.scans.flusher import start_scan_flusher, stop_scan_flusher
+from src.car_qr_service.qr.export import shutdown_render_pool
 from src.car_qr_service.users.router import router as users_router
 from src.car_qr_service.auth.router import router as login_user
 from src.car_qr_service.cars.router import router as car_router
-from src.car_qr_service.public.router import router as public_router
-from src.car_qr_service.pages.router import router as pages_router, templates
+from src.car_qr_service.public.router import router as public_router, short_link_router
+from src.car_qr_service.pages.router import router as pages_router
+from src.car_qr_service.serialization import FastJSONResponse
+from src.car_qr_service.stats.router import router as stats_router
+from src.car_qr_service.templating import precompile_templates, render_static_page
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запуск і зупинка фонових ресурсів застосунку.
+    Startup and shutdown of background resources of the application.
+    """
+    if settings.TEMPLATE_PRELOAD:
+        precompile_templates()
+    if settings.NOTIFY_WORKER_ENABLED:
+        start_notification_worker(async_session_factory)
+    if settings.SCAN_FLUSHER_ENABLED:
+        start_scan_flusher(async_session_factory)
+    yield
+    # Events still in the buffer are written before the process exits
+    await stop_scan_flusher()
+    await stop_notification_worker()
+    shutdown_password_executor()
+    shutdown_render_pool()
 
 
+# Усі JSON-відповіді кодуються швидким кодувальником з JSON_ENCODER (orjson / pydantic-core)
+# Every JSON response is encoded with the fast encoder chosen by JSON_ENCODER (orjson / pydantic-core)
 app = FastAPI(title="Car QR Service",
               description="Service to contact with car owner by means of QR code.",
-              version="0.0.1")
+              version="0.0.1",
+              default_response_class=FastJSONResponse,
+              lifespan=lifespan)
+
+# Обмеження частоти публічних запитів - відповідає 429 ще до відкриття сесії БД
+# Rate limits of public requests - answers 429 before any database session is opened
+app.add_middleware(RateLimitMiddleware)
+
+# Cookie тихо оновленої сесії (refresh-токен) додаються до будь-якої відповіді сторінки
+# Cookies of a silently renewed session (refresh token) are added to whatever response the page returns
+app.add_middleware(AuthCookieMiddleware)
+
+# Read-your-writes: після запису клієнт на кілька секунд читає з основної БД, а не з репліки
+# Read-your-writes: after a write the client reads from the primary, not the replica, for a few seconds
+if settings.DB_REPLICA_URL:
+    app.add_middleware(PrimaryStickinessMiddleware)
+
+# Стиснення відповідей (HTML, HTMX-фрагменти, JSON) - додається останнім, тож стискає відповіді всіх інших шарів
+# Response compression (HTML, HTMX partials, JSON) - added last, so it wraps the responses of every other layer
+app.add_middleware(CompressionMiddleware)
+
+# Метрики запитів - найзовнішній шар, тож час включає всі інші шари
+# Request metrics - the outermost layer, so the time covers every other layer
+app.add_middleware(MetricsMiddleware)
 
-# Цей рядок каже FastAPI: "Якщо запит починається з /static,
-# шукай відповідний файл у папці 'src/car_qr_service/static'".
-app.mount("/static", StaticFiles(directory="src/car_qr_service/static"), name="static")
+# Цей рядок каже FastAPI: "Якщо запит починається з /static, шукай відповідний файл у зібраній статиці
+# (з хешем у назві і стисненими варіантами) або, якщо її не зібрано, у папці 'src/car_qr_service/static'".
+# Requests under /static are served from the built assets (hashed names, precompressed variants)
+# or, if the assets were not built, from 'src/car_qr_service/static'.
+app.mount("/static", create_static_app(), name="static")
 
 # include routers
 app.include_router(users_router)
 app.include_router(login_user)
 app.include_router(car_router)
 app.include_router(public_router)
+app.include_router(short_link_router)
 app.include_router(pages_router)
+app.include_router(stats_router)
+app.include_router(metrics_router)
 
 
 @app.get("/",
@@ -34,6 +101,6 @@ async def get_root(request: Request):
     Цей ендпоінт віддає нашу головну вітальну HTML-сторінку.
     This endpoint returns our main welcoming HTML page.
     """
-    # We simply render the pages/welcome.html file and pass the request object into it
-    # Ми просто рендеримо файл pages/welcome.html і передаємо в нього об'єкт request
-    return templates.TemplateResponse(request, "pages/welcome.html")
+    # The page has no user data, so it is rendered once and then served from memory
+    # Сторінка не містить даних користувача, тож рендериться один раз і далі віддається з пам'яті
+    return render_static_page(request, "pages/welcome.html")
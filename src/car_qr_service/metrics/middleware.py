@@ -0,0 +1,73 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.car_qr_service.config import settings
+from src.car_qr_service.metrics.core import COUNT_BUCKETS, Counter, Gauge, Histogram
+from src.car_qr_service.metrics.request import PHASES, finish_request, start_request
+
+requests_total = Counter("http_requests_total", "Finished HTTP requests.", ["method", "route", "status"])
+requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests being handled right now.")
+request_seconds = Histogram("http_request_duration_seconds", "Time from receiving a request to its last byte.",
+                            ["method", "route"])
+request_db_queries = Histogram("http_request_db_queries", "SQL statements executed per request.",
+                               ["method", "route"], buckets=COUNT_BUCKETS)
+request_phase_seconds = Histogram("http_request_phase_seconds",
+                                  "Time per request spent in a phase (db, hash, qr, template).",
+                                  ["method", "route", "phase"])
+
+
+def _route_name(scope: Scope) -> str:
+    # The route template (e.g. "/cars/{car_id}") keeps the label set bounded; unmatched paths share one label
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Записує для кожного HTTP-запиту тривалість, статус, кількість запитів у обробці,
+    а також кількість SQL-запитів і час етапів (БД, bcrypt, QR, шаблони) - за шаблоном маршруту.
+    З METRICS_SERVER_TIMING ці ж етапи повертаються в заголовку Server-Timing (видно в DevTools).
+
+    Records for every HTTP request its duration, status, the number of requests in flight,
+    the SQL statement count and the time of the phases (db, bcrypt, QR, templates) - per route template.
+    With METRICS_SERVER_TIMING the same phases are returned in the Server-Timing header (visible in DevTools).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        metrics, token = start_request()
+        status_code = 500
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.METRICS_SERVER_TIMING:
+                    timings = [f"{phase};dur={metrics.seconds[phase] * 1000:.2f}"
+                               for phase in PHASES if metrics.seconds[phase]]
+                    timings.append(f"app;dur={(time.perf_counter() - start) * 1000:.2f}")
+                    MutableHeaders(scope=message).append("Server-Timing", ", ".join(timings))
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            requests_in_flight.dec()
+            finish_request(token)
+            method, route = scope["method"], _route_name(scope)
+            request_seconds.observe(time.perf_counter() - start, method, route)
+            requests_total.inc(method, route, str(status_code))
+            request_db_queries.observe(metrics.db_queries, method, route)
+            for phase in PHASES:
+                if metrics.seconds[phase]:
+                    request_phase_seconds.observe(metrics.seconds[phase], method, route, phase)
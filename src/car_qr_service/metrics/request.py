@@ -0,0 +1,91 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.car_qr_service.metrics.core import Histogram
+
+# Час окремих етапів обробки запиту (Time of the individual phases of request handling)
+PHASES = ("db", "hash", "qr", "template")
+
+phase_seconds = Histogram(
+    "app_phase_duration_seconds",
+    "Duration of one operation of a phase: SQL statement, bcrypt hash/verify, QR render, template render.",
+    ["phase"],
+)
+
+
+@dataclass(slots=True)
+class RequestMetrics:
+    """
+    Накопичувач метрик одного запиту: скільки SQL-запитів і скільки часу зайняв кожен етап.
+    Accumulator of one request: number of SQL statements and time spent in every phase.
+    """
+    db_queries: int = 0
+    seconds: dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+
+
+# Метрики поточного запиту; ContextVar видно і в подіях SQLAlchemy, і в потоках asyncio.to_thread
+# Metrics of the current request; the ContextVar is visible in SQLAlchemy events and in asyncio.to_thread threads
+_current: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+def start_request() -> tuple[RequestMetrics, object]:
+    """Starts collecting for the current request. Returns the accumulator and a token for `finish_request`."""
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token) -> None:
+    _current.reset(token)
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    """Records one operation of a phase (into the global histogram and the current request, if any)."""
+    phase_seconds.observe(seconds, phase)
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.seconds[phase] += seconds
+        if phase == "db":
+            metrics.db_queries += 1
+
+
+class timed_phase:
+    """
+    Контекстний менеджер, що вимірює блок коду як операцію етапу: `with timed_phase("qr"): ...`.
+    Context manager that measures a block of code as one operation of a phase: `with timed_phase("qr"): ...`.
+    """
+    __slots__ = ("phase", "start")
+
+    def __init__(self, phase: str):
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        record_phase(self.phase, time.perf_counter() - self.start)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Counts and times every SQL statement of the engine (cursor execution, without pool waits)."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if starts:
+            record_phase("db", time.perf_counter() - starts.pop())
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _on_error(exception_context):
+        connection = exception_context.connection
+        starts = connection.info.get("query_start") if connection is not None else None
+        if starts:
+            record_phase("db", time.perf_counter() - starts.pop())
@@ -0,0 +1,46 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.car_qr_service.metrics.core import Gauge, render_metrics
+from src.car_qr_service.stats.registry import collect_stats
+
+router = APIRouter(tags=["stats"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _StatsGauge(Gauge):
+    """
+    Числові лічильники з /stats (кеші, пули, черги) у форматі Prometheus - збираються під час експорту.
+    Numeric counters of /stats (caches, pools, queues) in the Prometheus format - collected on export.
+    """
+
+    def collect(self):
+        self._values = {}
+        for subsystem, stats in collect_stats().items():
+            self._flatten(subsystem, "", stats)
+        return super().collect()
+
+    def _flatten(self, subsystem: str, prefix: str, stats: dict) -> None:
+        for key, value in stats.items():
+            name = f"{prefix}{key}"
+            if isinstance(value, dict):
+                self._flatten(subsystem, f"{name}.", value)
+            elif isinstance(value, (int, float)):  # bool is an int as well
+                self._values[(subsystem, name)] = float(value)
+
+
+_StatsGauge("app_stat", "Numeric counters of the /stats subsystems.", ["subsystem", "name"])
+
+
+@router.get("/metrics",
+            response_class=PlainTextResponse,
+            summary="Метрики у форматі Prometheus (Metrics in the Prometheus text format)")
+async def get_metrics() -> PlainTextResponse:
+    """
+    Гістограми затримок за маршрутами, статуси, запити в обробці, SQL-запити і час етапів на запит,
+    а також усі числові лічильники з /stats.
+    Per-route latency histograms, statuses, requests in flight, SQL statements and phase time per request,
+    and all numeric counters of /stats.
+    """
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
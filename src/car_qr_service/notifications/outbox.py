@@ -0,0 +1,71 @@
+import hashlib
+import time
+from typing import Callable, Literal
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.car_qr_service.cars.plates import normalize_license_plate
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.models import Notification
+
+NotificationKind = Literal["sms", "call"]
+
+
+class OutboxCounters:
+    """Лічильники постановки в чергу (Enqueue counters)."""
+
+    def __init__(self):
+        self.enqueued = 0
+        self.deduplicated = 0
+
+
+outbox_counters = OutboxCounters()
+_wake_callbacks: list[Callable[[], None]] = []
+
+
+def on_enqueue(callback: Callable[[], None]) -> None:
+    """Registers a callback called after a message is committed (the worker uses it to wake up)."""
+    _wake_callbacks.append(callback)
+
+
+def dedup_key(kind: str, license_plate: str, message: str, now: float | None = None) -> str:
+    """
+    Ключ дедуплікації: той самий текст тому ж авто в межах вікна NOTIFY_DEDUP_WINDOW_SECONDS.
+    Deduplication key: the same text to the same car within the NOTIFY_DEDUP_WINDOW_SECONDS window.
+    """
+    window = int((time.time() if now is None else now) // settings.NOTIFY_DEDUP_WINDOW_SECONDS)
+    raw = f"{kind}|{normalize_license_plate(license_plate)}|{message.strip()}|{window}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def enqueue_notification(db: AsyncSession, kind: NotificationKind, license_plate: str, message: str = "") -> bool:
+    """
+    Додає повідомлення власнику авто в outbox і одразу повертається - відправляє його воркер.
+    Повертає False, якщо таке саме повідомлення вже в черзі (повторне натискання кнопки).
+
+    Puts a message to the car owner into the outbox and returns at once - the worker delivers it.
+    Returns False if the same message is already queued (e.g. a double-click).
+    """
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    query = (
+        dialect_insert(Notification)
+        .values(
+            kind=kind,
+            license_plate_normalized=normalize_license_plate(license_plate),
+            message=message.strip(),
+            dedup_key=dedup_key(kind, license_plate, message),
+        )
+        .on_conflict_do_nothing()
+        .returning(Notification.id)
+    )
+    result = await db.execute(query)
+    inserted = result.scalar_one_or_none() is not None
+    await db.commit()
+    if not inserted:
+        outbox_counters.deduplicated += 1
+        return False
+    outbox_counters.enqueued += 1
+    for callback in _wake_callbacks:
+        callback()
+    return True
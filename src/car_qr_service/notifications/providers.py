@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable
+
+from src.car_qr_service.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class OutgoingMessage:
+    """Повідомлення, готове до відправки (Message ready to be delivered)."""
+    id: int
+    kind: str  # "sms" or "call"
+    phone_number: str
+    text: str
+
+
+class ProviderError(Exception):
+    """Тимчасова помилка провайдера - повідомлення буде надіслано повторно (Temporary failure, will be retried)."""
+
+
+class PermanentProviderError(ProviderError):
+    """Помилка, яку повтор не виправить (A failure a retry will not fix, e.g. invalid number)."""
+
+
+class NotificationProvider(ABC):
+    """
+    Інтерфейс провайдера SMS/дзвінків.
+    Воркер передає повідомлення пачками; `send_batch` повертає для кожного None (успіх) або виняток.
+    Не більше `max_concurrency` викликів одного провайдера виконуються одночасно.
+
+    SMS/call provider interface.
+    The worker hands messages over in batches; `send_batch` returns None (success) or an exception for each.
+    At most `max_concurrency` calls to one provider run at the same time.
+    """
+    name = "base"
+
+    def __init__(self, max_concurrency: int | None = None):
+        self.max_concurrency = max_concurrency or settings.NOTIFY_PROVIDER_CONCURRENCY
+        self._semaphore: asyncio.Semaphore | None = None
+
+    @abstractmethod
+    async def send(self, message: OutgoingMessage) -> None:
+        """Delivers one message; raises ProviderError (retried) or PermanentProviderError (failed)."""
+
+    async def send_batch(self, messages: list[OutgoingMessage]) -> list[Exception | None]:
+        """
+        Default batch implementation: one `send` per message, at most `max_concurrency` at a time
+        (override for providers with a bulk API).
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def guarded(message: OutgoingMessage) -> Exception | None:
+            async with self._semaphore:
+                try:
+                    await self.send(message)
+                except Exception as e:
+                    return e
+            return None
+
+        return list(await asyncio.gather(*(guarded(message) for message in messages)))
+
+
+class ConsoleProvider(NotificationProvider):
+    """Пише повідомлення в лог - поведінка колишніх заглушок (Logs messages, like the former stubs)."""
+    name = "console"
+
+    async def send(self, message: OutgoingMessage) -> None:
+        if message.kind == "call":
+            logger.info("Initiating call to %s", message.phone_number)
+        else:
+            logger.info("Імітація відправки SMS на %s з повідомленням: '%s'", message.phone_number, message.text)
+
+
+class FakeProvider(NotificationProvider):
+    """
+    Локальний провайдер для тестів: зберігає надіслані повідомлення і може імітувати збої.
+    Local provider for tests: keeps delivered messages and can simulate failures.
+    """
+    name = "fake"
+
+    def __init__(self, max_concurrency: int | None = None, failures: list[Exception] | None = None):
+        super().__init__(max_concurrency)
+        self.sent: list[OutgoingMessage] = []
+        self.failures = list(failures or [])  # raised one by one before messages start to succeed
+        self.active = 0
+        self.max_active = 0
+
+    async def send(self, message: OutgoingMessage) -> None:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0)  # let other sends start, so the concurrency limit is observable
+            if self.failures:
+                raise self.failures.pop(0)
+            self.sent.append(message)
+        finally:
+            self.active -= 1
+
+
+# Реєстр провайдерів за назвою з налаштувань (Provider registry by the name used in settings)
+_provider_factories: dict[str, Callable[[], NotificationProvider]] = {
+    ConsoleProvider.name: ConsoleProvider,
+    FakeProvider.name: FakeProvider,
+}
+
+
+def register_provider(name: str, factory: Callable[[], NotificationProvider]) -> None:
+    """Registers a provider implementation (e.g. a real SMS gateway) under a settings name."""
+    _provider_factories[name] = factory
+
+
+def create_provider(name: str) -> NotificationProvider:
+    """Creates the provider configured under the given name."""
+    try:
+        return _provider_factories[name]()
+    except KeyError:
+        raise ValueError(f"Unknown notification provider: {name}") from None
@@ -0,0 +1,243 @@
+import asyncio
+import contextlib
+import datetime
+import logging
+import random
+import time
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.models import Car, Notification, User, utc_now
+from src.car_qr_service.notifications.outbox import on_enqueue, outbox_counters
+from src.car_qr_service.notifications.providers import (
+    NotificationProvider,
+    OutgoingMessage,
+    PermanentProviderError,
+    create_provider,
+)
+from src.car_qr_service.stats.registry import register_stats
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Експоненційна затримка з випадковим розкидом, щоб повтори не приходили хвилею.
+    Exponential backoff with jitter, so retries do not arrive as a wave.
+    """
+    delay = min(settings.NOTIFY_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.NOTIFY_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class WorkerMetrics:
+    """Лічильники відправки (Delivery counters)."""
+
+    def __init__(self):
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.queue_depth = 0
+        self.latency_seconds_total = 0.0  # enqueue -> delivered
+        self.latency_seconds_max = 0.0
+        self.provider_seconds_total = 0.0  # time spent inside providers
+
+    def record_delivery(self, latency: float) -> None:
+        self.sent += 1
+        self.latency_seconds_total += latency
+        self.latency_seconds_max = max(self.latency_seconds_max, latency)
+
+
+class NotificationWorker:
+    """
+    Фоновий воркер outbox: забирає пачку повідомлень, знаходить телефони власників,
+    передає повідомлення провайдерам і записує результат (надіслано / повтор пізніше / помилка).
+    Кілька воркерів (процесів) можуть працювати одночасно: повідомлення захоплюється умовним
+    UPDATE і "орендується" на NOTIFY_LEASE_SECONDS, після чого його може забрати інший воркер.
+
+    Outbox background worker: claims a batch of messages, looks up the owners' phone numbers,
+    hands messages to the providers and records the outcome (sent / retry later / failed).
+    Several workers (processes) can run at once: a message is claimed with a conditional UPDATE
+    and leased for NOTIFY_LEASE_SECONDS, after which another worker may pick it up.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, providers: dict[str, NotificationProvider]):
+        self.session_factory = session_factory
+        self.providers = providers
+        self.metrics = WorkerMetrics()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def wake(self) -> None:
+        """Starts the next round right away instead of waiting for the poll interval."""
+        self._wake.set()
+
+    @staticmethod
+    def _is_due(now: datetime.datetime):
+        return or_(
+            and_(Notification.status == "pending", Notification.next_attempt_at <= now),
+            and_(Notification.status == "sending", Notification.locked_until < now),
+        )
+
+    async def _claim(self) -> list:
+        now = utc_now()
+        async with self.session_factory() as db:
+            ids = (await db.execute(
+                select(Notification.id)
+                .where(self._is_due(now))
+                .order_by(Notification.next_attempt_at, Notification.id)
+                .limit(settings.NOTIFY_BATCH_SIZE)
+            )).scalars().all()
+            if not ids:
+                return []
+            # The condition is checked again, so a message claimed by another worker meanwhile is skipped
+            claimed = (await db.execute(
+                update(Notification)
+                .where(Notification.id.in_(ids), self._is_due(now))
+                .values(status="sending", attempts=Notification.attempts + 1,
+                        locked_until=now + datetime.timedelta(seconds=settings.NOTIFY_LEASE_SECONDS))
+                .returning(Notification.id, Notification.kind, Notification.license_plate_normalized,
+                           Notification.message, Notification.attempts, Notification.created_at)
+            )).all()
+            phones = dict((await db.execute(
+                select(Car.license_plate_normalized, User.phone_number)
+                .join(Car.owner)
+                .where(Car.license_plate_normalized.in_({row.license_plate_normalized for row in claimed}))
+            )).all()) if claimed else {}
+            await db.commit()
+        return [(row, phones.get(row.license_plate_normalized)) for row in claimed]
+
+    async def run_once(self) -> int:
+        """Processes one batch. Returns the number of claimed messages."""
+        claimed = await self._claim()
+        if not claimed:
+            return 0
+
+        outcomes: dict[int, Exception | None] = {}
+        by_provider: dict[str, list[OutgoingMessage]] = {}
+        for row, phone_number in claimed:
+            if phone_number is None:
+                outcomes[row.id] = PermanentProviderError("Car is not registered anymore")
+            elif row.kind not in self.providers:
+                outcomes[row.id] = PermanentProviderError(f"No provider for {row.kind}")
+            else:
+                by_provider.setdefault(row.kind, []).append(
+                    OutgoingMessage(id=row.id, kind=row.kind, phone_number=phone_number, text=row.message)
+                )
+
+        async def deliver(kind: str, messages: list[OutgoingMessage]) -> None:
+            start = time.perf_counter()
+            try:
+                results = await self.providers[kind].send_batch(messages)
+            except Exception as e:
+                results = [e] * len(messages)
+            self.metrics.provider_seconds_total += time.perf_counter() - start
+            outcomes.update(zip((message.id for message in messages), results))
+
+        await asyncio.gather(*(deliver(kind, messages) for kind, messages in by_provider.items()))
+        await self._record(claimed, outcomes)
+        return len(claimed)
+
+    async def _record(self, claimed: list, outcomes: dict[int, Exception | None]) -> None:
+        now = utc_now()
+        rows = []
+        for row, _ in claimed:
+            error = outcomes.get(row.id)
+            values = {"id": row.id, "locked_until": None, "next_attempt_at": now, "sent_at": None, "last_error": None}
+            if error is None:
+                values.update(status="sent", sent_at=now)
+                self.metrics.record_delivery((now - row.created_at).total_seconds())
+            elif isinstance(error, PermanentProviderError) or row.attempts >= settings.NOTIFY_MAX_ATTEMPTS:
+                values.update(status="failed", last_error=str(error)[:1000])
+                self.metrics.failed += 1
+            else:
+                values.update(status="pending", last_error=str(error)[:1000],
+                              next_attempt_at=now + datetime.timedelta(seconds=retry_delay(row.attempts)))
+                self.metrics.retried += 1
+            rows.append(values)
+        # ORM bulk UPDATE by primary key: one executemany for the whole batch
+        async with self.session_factory() as db:
+            await db.execute(update(Notification), rows)
+            await db.commit()
+
+    async def refresh_queue_depth(self) -> None:
+        async with self.session_factory() as db:
+            self.metrics.queue_depth = (await db.execute(
+                select(func.count()).select_from(Notification).where(Notification.status.in_(("pending", "sending")))
+            )).scalar_one()
+
+    async def run(self) -> None:
+        """Works until cancelled: drains due messages, then sleeps until woken or the poll interval passes."""
+        while True:
+            try:
+                while await self.run_once() >= settings.NOTIFY_BATCH_SIZE:
+                    pass
+                await self.refresh_queue_depth()
+            except Exception:
+                logger.exception("Notification worker round failed")
+            self._wake.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.NOTIFY_POLL_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+_worker: NotificationWorker | None = None
+
+
+def _wake_worker() -> None:
+    if _worker is not None:
+        _worker.wake()
+
+
+on_enqueue(_wake_worker)
+
+
+def start_notification_worker(session_factory: async_sessionmaker) -> None:
+    """Starts the outbox worker with the providers from settings (called on application startup)."""
+    global _worker
+    _worker = NotificationWorker(session_factory, {
+        "sms": create_provider(settings.NOTIFY_SMS_PROVIDER),
+        "call": create_provider(settings.NOTIFY_CALL_PROVIDER),
+    })
+    _worker.start()
+
+
+async def stop_notification_worker() -> None:
+    """Stops the outbox worker (called on application shutdown). Unsent messages stay in the outbox."""
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
+
+
+def _notification_stats() -> dict:
+    stats = {
+        "worker_running": _worker is not None,
+        "enqueued": outbox_counters.enqueued,
+        "deduplicated": outbox_counters.deduplicated,
+    }
+    if _worker is not None:
+        metrics = _worker.metrics
+        stats.update(
+            queue_depth=metrics.queue_depth,
+            sent=metrics.sent,
+            retried=metrics.retried,
+            failed=metrics.failed,
+            latency_seconds_avg=round(metrics.latency_seconds_total / metrics.sent, 6) if metrics.sent else None,
+            latency_seconds_max=round(metrics.latency_seconds_max, 6),
+            provider_seconds_total=round(metrics.provider_seconds_total, 6),
+        )
+    return stats
+
+
+register_stats("notifications", _notification_stats)
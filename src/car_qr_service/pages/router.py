@@ -1,20 +1,26 @@
-from typing import Annotated, Optional
-import qrcode
-import io
+from typing import Annotated, Literal, Optional
 
-from fastapi import APIRouter, Request, Depends, Form, Request, Response, status, HTTPException
+from fastapi import APIRouter, Request, Depends, Form, Query, Request, Response, status, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.car_qr_service.auth.cookies import set_auth_cookies
+from src.car_qr_service.auth.refresh import issue_refresh_token
 from src.car_qr_service.auth.utils import get_current_user, authenticate_user, create_access_token, \
     get_current_user_from_cookie
-from src.car_qr_service.database.database import get_db_session
-from src.car_qr_service.database.models import User
+from src.car_qr_service.database.database import get_db_session, get_read_db_session
+from src.car_qr_service.auth.token_cache import UserSnapshot
 from src.car_qr_service.users import crud as users_crud
 from src.car_qr_service.cars import crud as cars_crud
+from src.car_qr_service.cars.plates import normalize_license_plate
+from src.car_qr_service.cars.short_codes import build_short_url
 from src.car_qr_service.users.schemas import UserCreate
 from src.car_qr_service.cars.schemas import CarCreate
+from src.car_qr_service.config import settings
+from src.car_qr_service.qr.cache import etag_matches, get_qr_image
+from src.car_qr_service.qr.export import stream_qr_pdf, stream_qr_zip
+from src.car_qr_service.qr.render import qr_cache_key
+from src.car_qr_service.templating import render_static_page, templates
 
 # Створюємо роутер
 # Create a router
@@ -23,13 +29,6 @@ router = APIRouter(
     tags=["Frontend Pages"]
 )
 
-# Вказуємо FastAPI, де шукати HTML-шаблони
-# Важливо: шлях вказується відносно кореня проєкту, де ви запускаєте uvicorn
-# Tell FastAPI where to look for HTML templates
-# Important: the path is specified relative to the root of the project where you run uvicorn
-templates = Jinja2Templates(directory="src/car_qr_service/templates")
-
-
 @router.get("/",
             response_class=HTMLResponse,
             summary="Повертає головну сторінку пошуку автомобіля за державним номером реєстрації "
@@ -39,9 +38,9 @@ async def get_main_page(request: Request):
     Цей ендпоінт віддає нашу головну HTML-сторінку.
     This endpoint returns our main HTML page.
     """
-    # We simply render the index.html file and pass the request object into it
-    # Ми просто рендеримо файл index.html і передаємо в нього об'єкт request
-    return templates.TemplateResponse(request, "index.html")
+    # The page has no user data, so it is rendered once and then served from memory
+    # Сторінка не містить даних користувача, тож рендериться один раз і далі віддається з пам'яті
+    return render_static_page(request, "index.html")
 
 
 @router.get("/login", response_class=HTMLResponse)
@@ -49,7 +48,7 @@ async def get_login_page(request: Request):
     """
     Serves the user login page.
     """
-    return templates.TemplateResponse(request, "pages/login.html")
+    return render_static_page(request, "pages/login.html")
 
 
 @router.post("/login", response_class=HTMLResponse)
@@ -71,31 +70,39 @@ async def handle_login(
             url="/pages/login", status_code=status.HTTP_302_FOUND
         )
 
-    # Якщо автентифікація успішна, створюємо токен
+    # Якщо автентифікація успішна, створюємо токени: refresh-токен далі оновлює сесію без пароля
+    # On success create the tokens: the refresh token later renews the session without the password
     access_token = create_access_token(data={"sub": user.email})
+    refresh_token = await issue_refresh_token(db, user.id)
 
     # Створюємо відповідь-перенаправлення на сторінку кабінету
     response = RedirectResponse(
         url="/pages/cabinet", status_code=status.HTTP_302_FOUND
     )
 
-    # Встановлюємо токен в cookie. httponly=True означає, що
-    # JavaScript на клієнті не зможе отримати доступ до цього cookie,
-    # що є важливим елементом безпеки.
-    response.set_cookie(
-        key="access_token", value=f"Bearer {access_token}", httponly=True
-    )
+    # Встановлюємо токени в cookie (httponly - недоступні для JavaScript)
+    set_auth_cookies(response, access_token, refresh_token)
     return response
 
 
+async def _load_cabinet_cars(db: AsyncSession, owner_id: int, after_id: int | None = None) -> dict:
+    """One cabinet page (newest first) and the cursor of the next one (None on the last page)."""
+    page_size = settings.CABINET_PAGE_SIZE
+    # One extra row tells whether there is a next page
+    cars = await cars_crud.get_user_cars_page(db, owner_id, limit=page_size + 1, after_id=after_id, newest_first=True)
+    if len(cars) > page_size:
+        return {"cars": cars[:page_size], "next_after": cars[page_size - 1].id}
+    return {"cars": cars, "next_after": None}
+
+
 @router.get("/cabinet", response_class=HTMLResponse)
 async def get_cabinet_page(
         request: Request,
         # 1. Використовуємо нового "охоронця", який читає з cookie і може повернути None
         current_user: Annotated[
-            Optional[User], Depends(get_current_user_from_cookie)
+            Optional[UserSnapshot], Depends(get_current_user_from_cookie)
         ],
-        db: Annotated[AsyncSession, Depends(get_db_session)],
+        db: Annotated[AsyncSession, Depends(get_read_db_session)],
 ):
     """
     Serves the user's personal cabinet page.
@@ -107,22 +114,38 @@ async def get_cabinet_page(
             url="/pages/login", status_code=status.HTTP_302_FOUND
         )
 
-    # 2. Якщо все добре, зчитуємо з бази усі авта користувача і віддаємо сторінку
-    # Отримуємо список авто поточного користувача
-    user_cars = await cars_crud.get_user_cars(db, owner_id=current_user.id)
-
+    # 2. Якщо все добре, зчитуємо з бази першу сторінку авто користувача і віддаємо сторінку;
+    # наступні сторінки довантажуються під час прокрутки (get_cabinet_cars_page)
+    # Read the first page of the user's cars; next pages are loaded on scroll (get_cabinet_cars_page)
     context = {
         "request": request,
         "user": current_user,
-        "cars": user_cars,  # Передаємо список авто в шаблон
+        **await _load_cabinet_cars(db, owner_id=current_user.id),  # Передаємо список авто в шаблон
     }
     return templates.TemplateResponse(request, "pages/cabinet.html", context)
 
 
+@router.get("/cabinet/cars", response_class=HTMLResponse)
+async def get_cabinet_cars_page(
+        request: Request,
+        current_user: Annotated[Optional[UserSnapshot], Depends(get_current_user_from_cookie)],
+        db: Annotated[AsyncSession, Depends(get_read_db_session)],
+        after: Annotated[int, Query(ge=0)],
+):
+    """
+    Наступна сторінка рядків авто для нескінченної прокрутки кабінету (HTMX).
+    Next page of car rows for the infinite scroll of the cabinet (HTMX).
+    """
+    if not current_user:
+        return HTMLResponse(content="Not authorized", status_code=401)
+    context = {"request": request, **await _load_cabinet_cars(db, owner_id=current_user.id, after_id=after)}
+    return templates.TemplateResponse(request, "partials/car_page.html", context)
+
+
 @router.post("/cabinet/add-car", response_class=HTMLResponse)
 async def handle_add_car(
         request: Request,
-        current_user: Annotated[User, Depends(get_current_user_from_cookie)],
+        current_user: Annotated[UserSnapshot, Depends(get_current_user_from_cookie)],
         db: Annotated[AsyncSession, Depends(get_db_session)],
         license_plate: str = Form(...),
         brand: str = Form(...),
@@ -143,36 +166,82 @@ async def handle_add_car(
 
 @router.get("/qr-code/{license_plate}")
 async def generate_qr_code(
+        request: Request,
         license_plate: str,
-        current_user: Annotated[User, Depends(get_current_user_from_cookie)],
+        current_user: Annotated[UserSnapshot, Depends(get_current_user_from_cookie)],
+        # Код читається з основної БД: заміну коду через API не може приховати затримка репліки
+        # The code is read from the primary: replica lag must not hide a code rotated through the API
         db: Annotated[AsyncSession, Depends(get_db_session)],
 ):
     """
     Generates a QR code image for a specific car.
     Only the owner can generate the QR code.
+    The image is cached and served with a strong ETag, so repeated downloads get 304.
     """
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    car = await cars_crud.get_car_by_license_plate(db, license_plate)
-
-    if not car or car.owner_id != current_user.id:
+    # QR-код містить коротке посилання /s/{code} замість номера: менша версія QR і номер не розкривається
+    # The QR code holds the short /s/{code} link instead of the plate: a lower QR version and no plate leak
+    short_code = await cars_crud.get_owned_short_code(db, license_plate, owner_id=current_user.id)
+    if short_code is None:
         raise HTTPException(status_code=403, detail="Not your car")
 
-    # Формуємо URL для публічної сторінки
-    # В реальному житті тут має бути ваш домен
-    public_url = f"http://127.0.0.1:8001/public/cars/{license_plate}"
+    public_url = build_short_url(short_code)
+
+    # ETag залежить тільки від URL і параметрів рендерингу,
+    # тому на умовний запит відповідаємо 304 навіть не дивлячись у кеш зображень.
+    # no-cache: браузер перевіряє ETag щоразу, тож після заміни коду одразу отримує новий QR, а не старий з кешу.
+    # The ETag depends only on the URL and render parameters,
+    # so a conditional request is answered with 304 without even looking into the image cache.
+    # no-cache: the browser revalidates the ETag every time, so after a code rotation it gets the new QR at once.
+    headers = {
+        "ETag": f'"{qr_cache_key(public_url)}"',
+        "Cache-Control": "private, no-cache",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    # Генеруємо QR-код
-    qr_img = qrcode.make(public_url)
+    qr_image = await get_qr_image(public_url)
+    return Response(content=qr_image.content, media_type="image/png", headers=headers)
 
-    # Зберігаємо зображення в буфер в пам'яті
-    buffer = io.BytesIO()
-    qr_img.save(buffer, format="PNG")
-    buffer.seek(0)
 
-    # Повертаємо зображення
-    return StreamingResponse(buffer, media_type="image/png")
+@router.get("/qr-codes/export")
+async def export_qr_codes(
+        current_user: Annotated[UserSnapshot, Depends(get_current_user_from_cookie)],
+        db: Annotated[AsyncSession, Depends(get_db_session)],  # primary: never print a rotated-out code
+        export_format: Annotated[Literal["zip", "pdf"], Query(alias="format")] = "zip",
+        license_plate: Annotated[list[str] | None, Query()] = None,
+):
+    """
+    Вивантажує QR-коди всіх (або вибраних через `license_plate`) авто користувача
+    одним архівом ZIP з PNG або PDF-аркушем для друку.
+    Коди рендеряться паралельно в пулі процесів, а відповідь передається потоком,
+    тож пам'ять не росте з розміром автопарку.
+
+    Exports QR codes of all (or selected via `license_plate`) cars of the user
+    as a ZIP of PNG files or as a printable PDF sheet.
+    Codes are rendered in parallel on a process pool and the response is streamed,
+    so memory does not grow with the fleet size.
+    """
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    user_cars = await cars_crud.get_user_cars(db, owner_id=current_user.id)
+    if license_plate:
+        selected = {normalize_license_plate(plate) for plate in license_plate}
+        user_cars = [car for car in user_cars if car.license_plate_normalized in selected]
+    if not user_cars:
+        raise HTTPException(status_code=404, detail="Автомобілі не знайдено (No cars found)")
+
+    # Все, що потрібно потоку - це номери і URL; сесія БД йому вже не потрібна
+    # The stream only needs plates and URLs; it does not need the DB session anymore
+    stickers = [(car.license_plate, build_short_url(car.short_code)) for car in user_cars]
+    if export_format == "pdf":
+        return StreamingResponse(stream_qr_pdf(stickers), media_type="application/pdf",
+                                 headers={"Content-Disposition": 'attachment; filename="qr-codes.pdf"'})
+    return StreamingResponse(stream_qr_zip(stickers), media_type="application/zip",
+                             headers={"Content-Disposition": 'attachment; filename="qr-codes.zip"'})
 
 
 @router.get("/register", response_class=HTMLResponse)
@@ -180,7 +249,7 @@ async def get_register_page(request: Request):
     """
     Віддає сторінку реєстрації користувача.
     """
-    return templates.TemplateResponse(request, "pages/register.html")
+    return render_static_page(request, "pages/register.html")
 
 
 @router.post("/register")
@@ -217,19 +286,18 @@ async def handle_registration(
 
     # Автоматично логінимо нового користувача
     access_token = create_access_token(data={"sub": user.email})
+    refresh_token = await issue_refresh_token(db, user.id)
     response = RedirectResponse(
         url="/pages/cabinet", status_code=status.HTTP_302_FOUND
     )
-    response.set_cookie(
-        key="access_token", value=f"Bearer {access_token}", httponly=True
-    )
+    set_auth_cookies(response, access_token, refresh_token)
     return response
 
 
 @router.delete("/cabinet/cars/{car_id}", response_class=HTMLResponse)
 async def delete_car_for_user(
     car_id: int,
-    current_user: Annotated[User, Depends(get_current_user_from_cookie)],
+    current_user: Annotated[UserSnapshot, Depends(get_current_user_from_cookie)],
     db: Annotated[AsyncSession, Depends(get_db_session)],
 ):
     """
@@ -1,19 +1,43 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Form, HTTPException, Request
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.car_qr_service.cars import crud as cars_crud
+from src.car_qr_service.cars.cache import PublicCarView
 from src.car_qr_service.cars.schemas import PublicCarInfo
-from src.car_qr_service.database.database import get_db_session
+from src.car_qr_service.cars.search import search_plates
+from src.car_qr_service.database.database import get_db_session, get_read_db_session
+from src.car_qr_service.notifications.outbox import enqueue_notification
+from src.car_qr_service.scans.buffer import record_scan
+from src.car_qr_service.serialization import json_response
+from src.car_qr_service.templating import templates
 
 router = APIRouter(prefix="/public", tags=["public"])
+# Короткі посилання з QR-кодів живуть поза /public, щоб URL у QR був якомога коротшим
+# Short links of the QR codes live outside /public to keep the URL in the QR code as short as possible
+short_link_router = APIRouter(tags=["public"])
 
-# Вказуємо, де шукати шаблони
-# Specify where to look for templates
-templates = Jinja2Templates(directory="src/car_qr_service/templates")
+@router.get(
+    "/suggest",
+    response_model=list[PublicCarInfo],
+    summary="Підказки за фрагментом номера під час набору " +
+            "(As-you-type suggestions for a license plate fragment)",
+)
+async def suggest_cars(
+    q: Annotated[str, Query(max_length=32)],
+    db: Annotated[AsyncSession, Depends(get_read_db_session)],
+    limit: Annotated[int | None, Query(ge=1)] = None,
+):
+    """
+    Шукає номери, що починаються з введеного фрагмента або відрізняються від нього одним символом.
+    Відповідь береться з індексу в пам'яті і містить тільки публічні дані (марка, модель).
+
+    Finds plates that start with the typed fragment or differ from it by one character.
+    Answers come from an in-memory index and contain only public data (make, model).
+    """
+    return await search_plates(db, q, limit)
 
 
 @router.get(
@@ -23,8 +47,9 @@ templates = Jinja2Templates(directory="src/car_qr_service/templates")
             "(Find auto by its license plate and get public infor)",
 )
 async def find_car_by_plate(
+    request: Request,
     license_plate: str,
-    db: Annotated[AsyncSession, Depends(get_db_session)],
+    db: Annotated[AsyncSession, Depends(get_read_db_session)],
 ):
     """
     Публічний endpoint для пошуку автомобіля за його номерним знаком.
@@ -33,11 +58,20 @@ async def find_car_by_plate(
     Public endpoint for searching for a car by its license plate.
     Returns only secure information (make, model).
     """
-    db_car = await cars_crud.get_car_by_license_plate(db, license_plate=license_plate)
-    if db_car is None:
+    car = await _get_public_car(license_plate, db)
+    record_scan(request, car.id, "plate")
+    # Only the public fields, serialized straight from the cached projection
+    return json_response({"brand": car.brand, "model": car.model})
+
+
+async def _get_public_car(license_plate: str, db: AsyncSession) -> PublicCarView:
+    # Гарячі номери віддаються з кешу без звернення до бази даних
+    # Hot plates are served from the cache without touching the database
+    car = await cars_crud.get_public_car_by_license_plate(db, license_plate=license_plate)
+    if car is None:
         raise HTTPException(status_code=404, detail=f"Автомобіль з таким номером не знайдено." +
                                                     f" (Car with {license_plate} number is not found)")
-    return db_car
+    return car
 
 
 @router.post("/search",
@@ -47,19 +81,19 @@ async def find_car_by_plate(
 async def search_car_for_htmx(
     request: Request,
     license_plate: Annotated[str, Form()],
-    db: Annotated[AsyncSession, Depends(get_db_session)],
+    db: Annotated[AsyncSession, Depends(get_read_db_session)],
 ):
     """
-    Цей ендпоінт є адаптером для HTMX. Він викликає існуючий API,
-    і перетворює його відповідь (JSON або помилку) на HTML.
-    This endpoint is an adapter for HTMX. It calls an existing API,
-    and converts its response (JSON or error) to HTML.
+    Цей ендпоінт є адаптером для HTMX. Він виконує той самий пошук, що й JSON API,
+    і перетворює його результат (авто або помилку) на HTML.
+    This endpoint is an adapter for HTMX. It runs the same lookup as the JSON API,
+    and converts its result (car or error) to HTML.
     """
     context = {"request": request}
     try:
-        # Викликаємо нашу існуючу, протестовану функцію
-        # Call our existing, tested function
-        car = await find_car_by_plate(license_plate, db)
+        # Викликаємо той самий пошук, що й JSON API
+        # Call the same lookup as the JSON API
+        car = await _get_public_car(license_plate, db)
         context["car"] = car
     except HTTPException as e:
         # Якщо API кинув помилку, ми її ловимо
@@ -72,22 +106,37 @@ async def search_car_for_htmx(
     return templates.TemplateResponse(request, "partials/car_result.html", context)
 
 
+@router.post("/search/suggestions", response_class=HTMLResponse)
+async def suggest_cars_for_htmx(
+    request: Request,
+    license_plate: Annotated[str, Form()],
+    db: Annotated[AsyncSession, Depends(get_read_db_session)],
+):
+    """
+    HTMX-адаптер для підказок: викликає suggest_cars і рендерить список.
+    HTMX adapter for suggestions: calls suggest_cars and renders the list.
+    """
+    suggestions = await suggest_cars(license_plate[:32], db)
+    return templates.TemplateResponse(request, "partials/car_suggestions.html", {"suggestions": suggestions})
+
+
 @router.post("/send-sms/{license_plate}", response_class=HTMLResponse)
 async def send_sms_stub(
     license_plate: str,
     message: Annotated[str, Form()],
+    db: Annotated[AsyncSession, Depends(get_db_session)],
 ):
     """
-    Ендпоінт-заглушка для форми відправки SMS.
-    Наразі він не робить нічого, лише повертає повідомлення про успіх.
-    Endpoint stub for SMS sending form.
-    Currently it does nothing but returns a success message.
+    Ендпоінт для форми відправки SMS власнику.
+    Повідомлення лише ставиться в чергу (outbox), а надсилає його фоновий воркер,
+    тож відповідь не чекає на SMS-провайдера.
+    Endpoint of the SMS form.
+    The message is only put into the outbox and a background worker sends it,
+    so the response does not wait for the SMS provider.
     """
-    # У майбутньому тут буде логіка інтеграції з SMS-сервісом.
-    # Ми б використовували `license_plate`, щоб знайти номер власника.
-    # In the future, there will be logic here to integrate with the SMS service.
-    # We would use `license_plate` to find the owner's number.
-    print(f"Імітація відправки SMS для авто {license_plate} з повідомленням: '{message}'")
+    if await cars_crud.get_public_car_by_license_plate(db, license_plate) is None:
+        return HTMLResponse(content='<span class="text-red-600">Автомобіль не знайдено</span>', status_code=404)
+    await enqueue_notification(db, "sms", license_plate, message)
 
     # Повертаємо простий HTML, який HTMX вставить у div#sms-status
     return HTMLResponse(
@@ -100,11 +149,41 @@ async def send_sms_stub(
 async def initiate_call_stub(
     request: Request,
     license_plate: Annotated[str, Form()],
+    db: Annotated[AsyncSession, Depends(get_db_session)],
 ):
     """
-    Ендпоінт-заглушка для імітації телефонного дзвінка.
+    Ендпоінт для запиту дзвінка власнику: дзвінок ставиться в чергу і виконується воркером.
+    Endpoint that requests a call to the owner: the call is queued and placed by the worker.
     """
-    print(f"Initiating call to owner of {license_plate}")
+    if await cars_crud.get_public_car_by_license_plate(db, license_plate) is None:
+        return HTMLResponse(content='<span class="text-red-600">Автомобіль не знайдено</span>', status_code=404)
+    await enqueue_notification(db, "call", license_plate)
     return templates.TemplateResponse(
         request, "partials/call_success.html", {"license_plate": license_plate}
-    )
\ No newline at end of file
+    )
+
+
+@short_link_router.get(
+    "/s/{short_code}",
+    response_class=HTMLResponse,
+    summary="Сторінка авто за кодом з QR-наліпки (Car page by the code of its QR sticker)",
+)
+async def resolve_short_link(
+    request: Request,
+    short_code: str,
+    db: Annotated[AsyncSession, Depends(get_read_db_session)],
+):
+    """
+    Відкривається скануванням QR-коду: один пошук по унікальному індексу коду і сторінка зв'язку з власником.
+    Невідомий або замінений код - 404.
+
+    Opened by scanning the QR code: one unique index lookup of the code and the page to contact the owner.
+    An unknown or replaced code is 404.
+    """
+    car = await cars_crud.get_public_car_by_short_code(db, short_code)
+    if car is None:
+        context = {"request": request, "car": None,
+                   "detail": "QR-код недійсний або застарів (The QR code is invalid or outdated)"}
+        return templates.TemplateResponse(request, "pages/car.html", context, status_code=404)
+    record_scan(request, car.id, "short")
+    return templates.TemplateResponse(request, "pages/car.html", {"request": request, "car": car})
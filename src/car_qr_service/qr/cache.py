@@ -0,0 +1,98 @@
+import asyncio
+import contextlib
+import math
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.car_qr_service.cache import TTLCache
+from src.car_qr_service.config import settings
+from src.car_qr_service.metrics.request import record_phase
+from src.car_qr_service.qr.render import qr_cache_key, render_qr_png
+from src.car_qr_service.stats.registry import register_stats
+
+
+@dataclass(frozen=True, slots=True)
+class QrImage:
+    """Rendered QR code together with its strong ETag."""
+    etag: str
+    content: bytes
+
+
+# Контент-адресований кеш: ключ = хеш URL і параметрів рендерингу -> байти PNG.
+# Записи не застарівають (вміст визначається ключем), тому обмежуємо лише кількість.
+# Content-addressed cache: key = hash of the URL and render parameters -> PNG bytes.
+# Entries never go stale (content is defined by the key), so only the size is bounded.
+qr_memory_cache: TTLCache[str, bytes] = TTLCache(max_size=settings.QR_CACHE_MAX_ITEMS, ttl=math.inf)
+_disk_hits = 0
+_renders = 0
+
+
+def _disk_path(key: str) -> Path | None:
+    """Location of the image in the optional on-disk cache."""
+    if settings.QR_CACHE_DIR is None:
+        return None
+    return Path(settings.QR_CACHE_DIR) / key[:2] / f"{key}.png"
+
+
+def _load_or_render(key: str, url: str, box_size: int, border: int, error_correction: str) -> tuple[bytes, bool]:
+    """
+    Reads the image from the disk cache or renders it (and stores it on disk).
+    Returns the PNG bytes and whether they came from the disk.
+    """
+    path = _disk_path(key)
+    if path is not None and path.is_file():
+        return path.read_bytes(), True
+
+    content = render_qr_png(url, box_size=box_size, border=border, error_correction=error_correction)
+    if path is not None:
+        # Дисковий кеш необов'язковий: помилка запису не повинна ламати відповідь
+        # The disk cache is optional: a failed write must not break the response
+        with contextlib.suppress(OSError):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, path)
+    return content, False
+
+
+async def get_qr_image(url: str, box_size: int = 10, border: int = 4, error_correction: str = "M") -> QrImage:
+    """
+    Returns the QR image for the URL: from memory, from disk, or freshly rendered
+    in a worker thread so the event loop is not blocked.
+    """
+    global _disk_hits, _renders
+    key = qr_cache_key(url, box_size=box_size, border=border, error_correction=error_correction)
+    etag = f'"{key}"'
+    content = qr_memory_cache.get(key)
+    if content is not None:
+        return QrImage(etag=etag, content=content)
+
+    start = time.perf_counter()
+    content, from_disk = await asyncio.to_thread(_load_or_render, key, url, box_size, border, error_correction)
+    if from_disk:
+        _disk_hits += 1
+    else:
+        _renders += 1
+        record_phase("qr", time.perf_counter() - start)
+    qr_memory_cache.set(key, content)
+    return QrImage(etag=etag, content=content)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Checks an `If-None-Match` header against the ETag (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (value.strip().removeprefix("W/") for value in if_none_match.split(","))
+    return etag in candidates
+
+
+register_stats("qr_cache", lambda: {
+    **qr_memory_cache.stats(),
+    "disk_enabled": settings.QR_CACHE_DIR is not None,
+    "disk_hits": _disk_hits,
+    "renders": _renders,
+})
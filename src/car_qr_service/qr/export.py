@@ -0,0 +1,221 @@
+import asyncio
+import io
+import multiprocessing
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Callable, Iterable, TypeVar
+
+from src.car_qr_service.config import settings
+from src.car_qr_service.qr.render import render_qr_matrix, render_qr_png
+
+T = TypeVar("T")
+
+# --- Пул процесів для масового рендерингу QR-кодів ---
+# --- Process pool for bulk QR rendering ---
+_render_pool: ProcessPoolExecutor | None = None
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    """Creates the render pool on first use ("spawn" is safe with the threads of the server)."""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=settings.QR_RENDER_WORKERS,
+                                           mp_context=multiprocessing.get_context("spawn"))
+    return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    """Stops the render pool (called on application shutdown)."""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=False, cancel_futures=True)
+        _render_pool = None
+
+
+async def _render_in_order(func: Callable[..., T], urls: Iterable[str]) -> AsyncIterator[T]:
+    """
+    Renders URLs in parallel on the process pool and yields results in input order.
+    At most QR_EXPORT_WINDOW renders are in flight, so memory does not grow with the fleet size.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_render_pool()
+    in_flight: deque[asyncio.Future] = deque()
+    try:
+        for url in urls:
+            in_flight.append(loop.run_in_executor(pool, func, url))
+            if len(in_flight) >= settings.QR_EXPORT_WINDOW:
+                yield await in_flight.popleft()
+        while in_flight:
+            yield await in_flight.popleft()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def _safe_filename(license_plate: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", license_plate) or "car"
+
+
+# --- ZIP з PNG-файлами ---
+# --- ZIP of PNG files ---
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only, non-seekable stream: zipfile falls back to data descriptors
+    and we hand out the written bytes chunk by chunk.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_qr_zip(stickers: list[tuple[str, str]]) -> AsyncIterator[bytes]:
+    """
+    Streams a ZIP archive with one PNG per (license_plate, url) pair.
+    PNG is already compressed, so entries are stored without compression.
+    """
+    sink = _ChunkSink()
+    used_names: set[str] = set()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        rendered = _render_in_order(render_qr_png, (url for _, url in stickers))
+        index = 0
+        async for png in rendered:
+            name = f"{_safe_filename(stickers[index][0])}.png"
+            if name in used_names:
+                name = f"{index}_{name}"
+            used_names.add(name)
+            archive.writestr(name, png)
+            index += 1
+            yield sink.drain()
+    yield sink.drain()
+
+
+# --- Багатосторінковий PDF для друку ---
+# --- Printable multi-page PDF ---
+_PAGE_WIDTH, _PAGE_HEIGHT = 595, 842  # A4 in points
+_COLUMNS, _ROWS = 3, 4
+_STICKER_SIZE = 150  # side of a QR code on paper, points
+_LABEL_FONT_SIZE = 12
+
+
+def _pdf_text(value: str) -> str:
+    """Escapes a string for a PDF literal (Helvetica/WinAnsi, unknown characters become '?')."""
+    encoded = value.encode("cp1252", errors="replace").decode("latin-1")
+    return encoded.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class _PdfWriter:
+    """Minimal PDF writer that keeps only the xref offsets in memory."""
+
+    def __init__(self):
+        self.offset = 0
+        self.offsets: dict[int, int] = {}
+        self.next_id = 4  # 1 - catalog, 2 - page tree, 3 - font
+
+    def reserve(self) -> int:
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def raw(self, data: bytes) -> bytes:
+        self.offset += len(data)
+        return data
+
+    def obj(self, object_id: int, body: bytes, stream: bytes | None = None) -> bytes:
+        self.offsets[object_id] = self.offset
+        data = b"%d 0 obj\n" % object_id + body
+        if stream is not None:
+            data += b"\nstream\n" + stream + b"\nendstream"
+        return self.raw(data + b"\nendobj\n")
+
+    def trailer(self) -> bytes:
+        xref_offset = self.offset
+        lines = [b"xref\n0 %d\n" % self.next_id, b"0000000000 65535 f \n"]
+        for object_id in range(1, self.next_id):
+            lines.append(b"%010d 00000 n \n" % self.offsets[object_id])
+        lines.append(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self.next_id, xref_offset))
+        return self.raw(b"".join(lines))
+
+
+def _pdf_page(writer: _PdfWriter, stickers: list[tuple[str, int, bytes]]) -> tuple[int, bytes]:
+    """Writes one page with up to COLUMNS x ROWS stickers. Returns the page id and its bytes."""
+    cell_width = _PAGE_WIDTH / _COLUMNS
+    cell_height = _PAGE_HEIGHT / _ROWS
+    chunks = []
+    xobjects = []
+    content = []
+    for position, (license_plate, size, bitmap) in enumerate(stickers):
+        image_id = writer.reserve()
+        chunks.append(writer.obj(
+            image_id,
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+            b"/BitsPerComponent 1 /Filter /FlateDecode /Length %d >>" % (size, size, len(bitmap)),
+            bitmap,
+        ))
+        xobjects.append(b"/Im%d %d 0 R" % (position, image_id))
+        column, row = position % _COLUMNS, position // _COLUMNS
+        x = column * cell_width + (cell_width - _STICKER_SIZE) / 2
+        y = _PAGE_HEIGHT - (row + 1) * cell_height + (cell_height - _STICKER_SIZE) / 2 + _LABEL_FONT_SIZE
+        label_x = column * cell_width + cell_width / 2 - len(license_plate) * _LABEL_FONT_SIZE * 0.3
+        content.append(
+            f"q {_STICKER_SIZE} 0 0 {_STICKER_SIZE} {x:.2f} {y:.2f} cm /Im{position} Do Q\n"
+            f"BT /F1 {_LABEL_FONT_SIZE} Tf {label_x:.2f} {y - _LABEL_FONT_SIZE - 4:.2f} Td "
+            f"({_pdf_text(license_plate)}) Tj ET\n"
+        )
+    content_stream = "".join(content).encode("latin-1")
+    content_id = writer.reserve()
+    chunks.append(writer.obj(content_id, b"<< /Length %d >>" % len(content_stream), content_stream))
+    page_id = writer.reserve()
+    chunks.append(writer.obj(
+        page_id,
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+        b"/Resources << /Font << /F1 3 0 R >> /XObject << %s >> >> >>"
+        % (_PAGE_WIDTH, _PAGE_HEIGHT, content_id, b" ".join(xobjects)),
+    ))
+    return page_id, b"".join(chunks)
+
+
+async def stream_qr_pdf(stickers: list[tuple[str, str]]) -> AsyncIterator[bytes]:
+    """
+    Streams a printable A4 PDF with a grid of labelled QR codes.
+    Codes are embedded as tiny 1-bit bitmaps (one pixel per module), so pages stay small and sharp.
+    """
+    writer = _PdfWriter()
+    yield writer.raw(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    yield writer.obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    yield writer.obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    per_page = _COLUMNS * _ROWS
+    page_ids: list[int] = []
+    page: list[tuple[str, int, bytes]] = []
+    index = 0
+    async for size, bitmap in _render_in_order(render_qr_matrix, (url for _, url in stickers)):
+        page.append((stickers[index][0], size, bitmap))
+        index += 1
+        if len(page) == per_page:
+            page_id, data = _pdf_page(writer, page)
+            page_ids.append(page_id)
+            page = []
+            yield data
+    if page or not page_ids:
+        page_id, data = _pdf_page(writer, page)
+        page_ids.append(page_id)
+        yield data
+
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    yield writer.obj(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids)))
+    yield writer.trailer()
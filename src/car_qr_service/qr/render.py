@@ -0,0 +1,70 @@
+import hashlib
+import io
+import zlib
+from importlib.metadata import version
+
+import qrcode
+from qrcode import constants
+
+# Рівні корекції помилок QR-коду
+# QR error correction levels
+ERROR_CORRECTION_LEVELS = {
+    "L": constants.ERROR_CORRECT_L,
+    "M": constants.ERROR_CORRECT_M,
+    "Q": constants.ERROR_CORRECT_Q,
+    "H": constants.ERROR_CORRECT_H,
+}
+
+# Версії бібліотек входять у ключ кешу: інша версія може дати інші байти PNG,
+# а сильний ETag обіцяє побайтову ідентичність.
+# Library versions are part of the cache key: another version may produce different PNG bytes,
+# and a strong ETag promises byte-for-byte identity.
+_RENDERER_SIGNATURE = f"qrcode={version('qrcode')};pillow={version('pillow')}"
+
+
+def qr_cache_key(url: str, box_size: int = 10, border: int = 4, error_correction: str = "M") -> str:
+    """
+    Content address of a rendered QR image.
+    The PNG is a pure function of these inputs, so the key doubles as a strong ETag.
+    """
+    raw = f"{_RENDERER_SIGNATURE}|{error_correction}|{box_size}|{border}|{url}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def render_qr_png(url: str, box_size: int = 10, border: int = 4, error_correction: str = "M") -> bytes:
+    """
+    Renders the QR code for the URL as PNG bytes.
+    Defaults are the same as `qrcode.make`. CPU-heavy: do not call it in the event loop.
+    """
+    qr = qrcode.QRCode(
+        error_correction=ERROR_CORRECTION_LEVELS[error_correction],
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(url)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    qr.make_image().save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_qr_matrix(url: str, border: int = 4, error_correction: str = "M") -> tuple[int, bytes]:
+    """
+    Renders the QR code as a 1-bit bitmap with one pixel per module (border included).
+    Returns the side length and zlib-compressed rows, where bit 1 is white and rows are
+    padded to whole bytes - ready to embed into a PDF as a DeviceGray image.
+    """
+    qr = qrcode.QRCode(error_correction=ERROR_CORRECTION_LEVELS[error_correction], border=border)
+    qr.add_data(url)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+    size = len(matrix)
+    packed = bytearray()
+    for row in matrix:
+        for start in range(0, size, 8):
+            byte = 0xFF
+            for bit, is_dark in enumerate(row[start:start + 8]):
+                if is_dark:
+                    byte &= ~(0x80 >> bit)
+            packed.append(byte)
+    return size, zlib.compress(bytes(packed))
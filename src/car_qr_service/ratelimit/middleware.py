@@ -0,0 +1,227 @@
+import functools
+import json
+import math
+import re
+from dataclasses import dataclass
+from starlette.formparsers import MultiPartException
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.car_qr_service.cars.plates import normalize_license_plate
+from src.car_qr_service.config import settings
+from src.car_qr_service.ratelimit.store import TokenBucketStore, create_store
+from src.car_qr_service.stats.registry import register_stats
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitRule:
+    """
+    Публічний маршрут під обмеженням. Ліміти беруться з Settings: RATE_LIMIT_<name>_PER_IP / _PER_PLATE.
+    A limited public route. Limits come from Settings: RATE_LIMIT_<name>_PER_IP / _PER_PLATE.
+    """
+    name: str
+    method: str
+    path: re.Pattern
+    plate_form_field: str | None = None  # plate taken from a form field instead of the path
+
+
+RULES = (
+    RateLimitRule("LOOKUP", "GET", re.compile(r"^/public/cars/(?P<plate>[^/]+)$")),
+    RateLimitRule("LOOKUP", "GET", re.compile(r"^/s/[^/]+$")),  # QR short links: per IP only
+    RateLimitRule("SEARCH", "POST", re.compile(r"^/public/search$"), plate_form_field="license_plate"),
+    RateLimitRule("SUGGEST", "POST", re.compile(r"^/public/search/suggestions$")),
+    RateLimitRule("SUGGEST", "GET", re.compile(r"^/public/suggest$")),
+    RateLimitRule("SMS", "POST", re.compile(r"^/public/send-sms/(?P<plate>[^/]+)$")),
+    RateLimitRule("CALL", "POST", re.compile(r"^/public/initiate-call$"), plate_form_field="license_plate"),
+)
+
+_UNITS = {"s": 1, "second": 1, "m": 60, "minute": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+_MAX_FORM_BYTES = 16 * 1024
+_FORM_CONTENT_TYPES = (b"application/x-www-form-urlencoded", b"multipart/form-data")
+
+
+@functools.lru_cache(maxsize=64)
+def parse_limit(limit: str) -> tuple[float, float] | None:
+    """
+    Розбирає ліміт виду "60/minute", "5/10m" або "1000/day" у (токенів за секунду, розмір бакета).
+    Порожній рядок вимикає ліміт.
+    Parses a limit like "60/minute", "5/10m" or "1000/day" into (tokens per second, bucket capacity).
+    An empty string disables the limit.
+    """
+    if not limit.strip():
+        return None
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d*)\s*([a-z]+?)s?\s*", limit.lower())
+    if match is None or match.group(3) not in _UNITS:
+        raise ValueError(f"Invalid rate limit: {limit!r}")
+    count = int(match.group(1))
+    period = int(match.group(2) or 1) * _UNITS[match.group(3)]
+    return count / period, float(count)
+
+
+class RateLimitCounters:
+    def __init__(self):
+        self.allowed = 0
+        self.rejected: dict[str, int] = {}
+
+
+counters = RateLimitCounters()
+_store: TokenBucketStore | None = None
+
+
+def get_store() -> TokenBucketStore:
+    global _store
+    if _store is None:
+        _store = create_store()
+    return _store
+
+
+def reset_rate_limits() -> None:
+    """Forgets all buckets (used by tests)."""
+    if _store is not None:
+        _store.clear()
+
+
+def client_ip(scope: Scope) -> str:
+    """Client IP of the request (the first X-Forwarded-For hop if RATE_LIMIT_TRUST_FORWARDED is on)."""
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class UnreadableForm(Exception):
+    """
+    Тіло форми, з якого не вдається прочитати номер: такий запит відхиляється, а не пропускається без ліміту.
+    A form body the plate cannot be read from: such a request is rejected instead of passing without the limit.
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+async def _read_form_field(scope: Scope, receive: Receive, field: str) -> tuple[str | None, list[Message]]:
+    """
+    Reads a small form body (urlencoded or multipart, as FastAPI `Form()` accepts) to get one field.
+    Returns the value and the consumed messages, which are replayed to the application.
+    Raises UnreadableForm for other content types, bodies over _MAX_FORM_BYTES and malformed bodies.
+    """
+    headers = dict(scope.get("headers", []))
+    content_type = headers.get(b"content-type", b"").split(b";")[0].strip().lower()
+    if content_type not in _FORM_CONTENT_TYPES:
+        raise UnreadableForm(415, "Очікується форма (Form data expected)")
+    messages: list[Message] = []
+    size = 0
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            return None, messages
+        size += len(message.get("body", b""))
+        if size > _MAX_FORM_BYTES:
+            raise UnreadableForm(413, "Завеликий запит (Request body is too large)")
+        if not message.get("more_body", False):
+            break
+
+    pending = list(messages)
+
+    async def replay() -> Message:
+        return pending.pop(0) if pending else {"type": "http.request", "body": b"", "more_body": False}
+
+    try:
+        form = await Request(scope, replay).form(max_files=0, max_fields=32)
+    except MultiPartException:
+        raise UnreadableForm(400, "Некоректна форма (Malformed form data)") from None
+    value = form.get(field)
+    return (value if isinstance(value, str) else None), messages
+
+
+class RateLimitMiddleware:
+    """
+    Обмежує частоту запитів до публічних маршрутів токен-бакетами за IP клієнта і за номером авто.
+    Працює на рівні ASGI до маршрутизації, тож відхилений запит не відкриває сесію БД.
+
+    Limits public routes with token buckets per client IP and per license plate.
+    Works at the ASGI level before routing, so a rejected request never opens a database session.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        rule, match = self._match(scope)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        buckets = []
+        per_ip = parse_limit(getattr(settings, f"RATE_LIMIT_{rule.name}_PER_IP", ""))
+        if per_ip is not None:
+            buckets.append((f"{rule.name}:ip:{client_ip(scope)}", per_ip))
+        per_plate = parse_limit(getattr(settings, f"RATE_LIMIT_{rule.name}_PER_PLATE", ""))
+        replay: list[Message] = []
+        if per_plate is not None:
+            plate = match.groupdict().get("plate")
+            if plate is None and rule.plate_form_field:
+                try:
+                    plate, replay = await _read_form_field(scope, receive, rule.plate_form_field)
+                except UnreadableForm as e:
+                    counters.rejected[rule.name] = counters.rejected.get(rule.name, 0) + 1
+                    await self._respond(send, e.status_code, e.detail)
+                    return
+            plate_key = normalize_license_plate(plate) if plate else ""
+            if plate_key:
+                buckets.append((f"{rule.name}:plate:{plate_key}", per_plate))
+
+        # Every bucket is checked before any token is taken: a request rejected by the plate limit
+        # does not spend the client's IP budget
+        wait = await get_store().take_all([(key, rate, capacity) for key, (rate, capacity) in buckets])
+        if wait > 0:
+            counters.rejected[rule.name] = counters.rejected.get(rule.name, 0) + 1
+            await self._respond(send, 429, "Забагато запитів, спробуйте пізніше (Too many requests)",
+                                ((b"retry-after", str(max(1, math.ceil(wait))).encode()),))
+            return
+        counters.allowed += 1
+
+        async def replaying_receive() -> Message:
+            if replay:
+                return replay.pop(0)
+            return await receive()
+
+        await self.app(scope, replaying_receive, send)
+
+    @staticmethod
+    def _match(scope: Scope) -> tuple[RateLimitRule | None, re.Match | None]:
+        for rule in RULES:
+            if scope["method"] == rule.method:
+                match = rule.path.match(scope["path"])
+                if match is not None:
+                    return rule, match
+        return None, None
+
+    @staticmethod
+    async def _respond(send: Send, status_code: int, detail: str, headers: tuple[tuple[bytes, bytes], ...] = ()) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+register_stats("rate_limit", lambda: {
+    "allowed": counters.allowed,
+    "rejected": dict(counters.rejected),
+    **(_store.stats() if _store is not None else {}),
+})
@@ -0,0 +1,128 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from src.car_qr_service.config import settings
+
+
+class TokenBucketStore(ABC):
+    """
+    Інтерфейс сховища токен-бакетів. Для кількох процесів/серверів потрібне спільне сховище
+    (наприклад, Redis зі скриптом, що виконує `take_all` атомарно) - його реєструють через `register_store`.
+
+    Token bucket store interface. Several processes/servers need a shared store
+    (e.g. Redis with a script that performs `take_all` atomically) - register it with `register_store`.
+    """
+
+    @abstractmethod
+    async def take_all(self, buckets: list[tuple[str, float, float]]) -> float:
+        """
+        Бере по токену з кожного бакета (ключ, `rate` токенів за секунду, не більше `capacity`), лише якщо
+        токен є в усіх; інакше не бере нічого, тож відхилений запит не витрачає ліміт інших бакетів.
+        Takes one token from every bucket (key, `rate` tokens per second, at most `capacity`) only if all
+        of them have one; otherwise takes nothing, so a rejected request does not spend the other buckets.
+        Returns 0 if the request is allowed, otherwise the seconds until every bucket has a token.
+        """
+
+    async def take(self, key: str, rate: float, capacity: float) -> float:
+        """Takes one token from a single bucket (see `take_all`)."""
+        return await self.take_all([(key, rate, capacity)])
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Empties every bucket."""
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryTokenBucketStore(TokenBucketStore):
+    """
+    Сховище в пам'яті процесу - локальна заміна спільного сховища (для одного процесу, розробки і тестів).
+    Кожен ключ займає один кортеж (токени, час оновлення, час наповнення, слот). Бакет, який знову повний,
+    нічим не відрізняється від відсутнього, тому ключ кладеться у слот "колеса часу" за моментом,
+    коли бакет наповниться, і видаляється, коли колесо доходить до цього слоту. Усі операції O(1).
+
+    In-process store - a local stand-in for a shared store (single process, development and tests).
+    Every key takes one tuple (tokens, updated at, full at, slot). A bucket that is full again is no different
+    from a missing one, so the key is put into the time-wheel slot of the moment its bucket refills
+    and is deleted when the wheel reaches that slot. All operations are O(1).
+    """
+
+    def __init__(self, slot_seconds: float = 1.0, slots: int = 3600, clock: Callable[[], float] = time.monotonic):
+        self.slot_seconds = slot_seconds
+        self.clock = clock
+        # key -> (tokens, updated at, full at, slot number)
+        self._buckets: dict[str, tuple[float, float, float, int]] = {}
+        self._slots: list[set[str]] = [set() for _ in range(slots)]
+        self._swept_until = math.floor(clock() / slot_seconds)
+        self.expired = 0
+
+    def _place(self, key: str, tokens: float, updated_at: float, full_at: float) -> None:
+        # A bucket that refills beyond the wheel horizon is parked in the last slot and placed again on sweep
+        slot = min(math.ceil(full_at / self.slot_seconds), self._swept_until + len(self._slots) - 1)
+        slot = max(slot, self._swept_until + 1)
+        old = self._buckets.get(key)
+        if old is not None and old[3] != slot:
+            self._slots[old[3] % len(self._slots)].discard(key)
+        self._slots[slot % len(self._slots)].add(key)
+        self._buckets[key] = (tokens, updated_at, full_at, slot)
+
+    def _sweep(self, now: float) -> None:
+        current = math.floor(now / self.slot_seconds)
+        first = max(self._swept_until + 1, current - len(self._slots) + 1)
+        self._swept_until = current
+        for slot in range(first, current + 1):
+            keys = self._slots[slot % len(self._slots)]
+            due = [key for key in keys if self._buckets[key][3] <= current]
+            for key in due:
+                keys.discard(key)
+                tokens, updated_at, full_at, _ = self._buckets.pop(key)
+                if full_at <= now:
+                    self.expired += 1
+                else:
+                    self._place(key, tokens, updated_at, full_at)
+
+    async def take_all(self, buckets: list[tuple[str, float, float]]) -> float:
+        now = self.clock()
+        self._sweep(now)
+        levels = []
+        for key, rate, capacity in buckets:
+            entry = self._buckets.get(key)
+            levels.append(capacity if entry is None else min(capacity, entry[0] + (now - entry[1]) * rate))
+        wait = max(((1 - tokens) / rate for (_, rate, _), tokens in zip(buckets, levels) if tokens < 1), default=0.0)
+        if wait > 0:
+            return wait
+        for (key, rate, capacity), tokens in zip(buckets, levels):
+            tokens -= 1
+            self._place(key, tokens, now, now + (capacity - tokens) / rate)
+        return 0.0
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        for slot in self._slots:
+            slot.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "expired": self.expired}
+
+
+_store_factories: dict[str, Callable[[], TokenBucketStore]] = {"memory": MemoryTokenBucketStore}
+
+
+def register_store(name: str, factory: Callable[[], TokenBucketStore]) -> None:
+    """Registers a store implementation (e.g. a shared Redis store) under a settings name."""
+    _store_factories[name] = factory
+
+
+def create_store(name: str | None = None) -> TokenBucketStore:
+    """Creates the store configured in RATE_LIMIT_STORE."""
+    name = name or settings.RATE_LIMIT_STORE
+    try:
+        return _store_factories[name]()
+    except KeyError:
+        raise ValueError(f"Unknown rate limit store: {name}") from None
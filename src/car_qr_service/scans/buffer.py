@@ -0,0 +1,126 @@
+import collections
+import datetime
+import ipaddress
+from dataclasses import dataclass
+from typing import Callable, Literal
+
+from fastapi import Request
+
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.models import utc_now
+from src.car_qr_service.ratelimit.middleware import client_ip
+
+ScanSource = Literal["plate", "short"]
+
+
+@dataclass(frozen=True, slots=True)
+class ScanRecord:
+    """Подія сканування, що чекає на запис (A scan event waiting to be written)."""
+    car_id: int
+    scanned_at: datetime.datetime
+    source: ScanSource
+    client_kind: str
+    ip_prefix: str
+
+    def as_row(self) -> dict:
+        return {"car_id": self.car_id, "scanned_at": self.scanned_at, "source": self.source,
+                "client_kind": self.client_kind, "ip_prefix": self.ip_prefix}
+
+
+class ScanBuffer:
+    """
+    Кільцевий буфер подій у пам'яті: додавання не чекає на базу даних, а пам'ять обмежена.
+    Коли буфер повний, нова подія витісняє найстарішу, і та рахується як втрачена.
+    In-memory ring buffer of events: appending never waits for the database and memory is bounded.
+    When the buffer is full, a new event pushes out the oldest one, which is counted as dropped.
+    """
+
+    def __init__(self, max_events: int):
+        self._events: collections.deque[ScanRecord] = collections.deque(maxlen=max_events)
+        self.appended = 0
+        self.dropped = 0
+
+    def append(self, event: ScanRecord) -> int:
+        """Adds the event and returns the number of buffered events."""
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+        self.appended += 1
+        return len(self._events)
+
+    def drain(self, limit: int) -> list[ScanRecord]:
+        """Removes and returns up to `limit` oldest events."""
+        return [self._events.popleft() for _ in range(min(limit, len(self._events)))]
+
+    def requeue(self, events: list[ScanRecord]) -> None:
+        """
+        Повертає незаписану пачку на початок буфера. Що не вміщається, рахується як втрачене (найстаріші події).
+        Puts an unwritten batch back at the front of the buffer. What does not fit is counted as dropped (oldest events).
+        """
+        room = self._events.maxlen - len(self._events)
+        kept = events[-room:] if room > 0 else []
+        self.dropped += len(events) - len(kept)
+        self._events.extendleft(reversed(kept))
+
+    @property
+    def capacity(self) -> int:
+        return self._events.maxlen
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+scan_buffer = ScanBuffer(settings.SCAN_BUFFER_MAX_EVENTS)
+_batch_ready_callbacks: list[Callable[[], None]] = []
+
+
+def on_batch_ready(callback: Callable[[], None]) -> None:
+    """Registers a callback called when a full batch is buffered (the flusher uses it to wake up)."""
+    _batch_ready_callbacks.append(callback)
+
+
+def classify_user_agent(user_agent: str) -> str:
+    """
+    Грубий клас клієнта за User-Agent - повний рядок не зберігається.
+    Coarse client class from the User-Agent - the full string is not stored.
+    """
+    user_agent = user_agent.lower()
+    if any(marker in user_agent for marker in ("bot", "crawler", "spider")):
+        return "bot"
+    if any(marker in user_agent for marker in ("mobile", "android", "iphone", "ipad")):
+        return "mobile"
+    if user_agent.startswith("mozilla/"):
+        return "desktop"
+    return "other"
+
+
+def ip_prefix(ip: str) -> str:
+    """Network of the address (/24 for IPv4, /48 for IPv6), so scans can be grouped without storing the IP."""
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return "unknown"
+    prefix = 24 if address.version == 4 else 48
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+def record_scan(request: Request, car_id: int, source: ScanSource) -> None:
+    """
+    Записує сканування в буфер. Лише додавання в пам'ять - запит не чекає на базу даних.
+    Records a scan in the buffer. Only an in-memory append - the request does not wait for the database.
+    """
+    if not settings.SCAN_EVENTS_ENABLED:
+        return
+    event = ScanRecord(
+        car_id=car_id,
+        scanned_at=utc_now(),
+        source=source,
+        client_kind=classify_user_agent(request.headers.get("user-agent", "")),
+        ip_prefix=ip_prefix(client_ip(request.scope)),
+    )
+    if scan_buffer.append(event) >= settings.SCAN_FLUSH_BATCH_SIZE:
+        for callback in _batch_ready_callbacks:
+            callback()
@@ -0,0 +1,131 @@
+import asyncio
+import contextlib
+import logging
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.models import ScanEvent
+from src.car_qr_service.scans.buffer import ScanBuffer, on_batch_ready, scan_buffer
+from src.car_qr_service.stats.registry import register_stats
+
+logger = logging.getLogger(__name__)
+
+
+class ScanFlusher:
+    """
+    Фоновий запис подій сканування: раз на SCAN_FLUSH_INTERVAL_SECONDS або одразу, коли набралася пачка
+    SCAN_FLUSH_BATCH_SIZE, буфер записується багаторядковими INSERT (один запис на пачку, а не на скан).
+    Під час зупинки записується все, що залишилося в буфері.
+
+    Background writer of scan events: every SCAN_FLUSH_INTERVAL_SECONDS, or at once when a batch of
+    SCAN_FLUSH_BATCH_SIZE is buffered, the buffer is written with multi-row INSERTs (one write per batch, not per scan).
+    On stop everything left in the buffer is written.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, buffer: ScanBuffer = scan_buffer):
+        self.session_factory = session_factory
+        self.buffer = buffer
+        self.written = 0
+        self.failed = 0  # batch writes that failed (the batch is put back and retried on the next round)
+        self.flushes = 0
+        self.flush_seconds_total = 0.0
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    def wake(self) -> None:
+        """Flushes right away instead of waiting for the interval."""
+        self._wake.set()
+
+    async def flush(self) -> int:
+        """Writes the buffered events batch by batch. Returns the number of written events."""
+        written = 0
+        while batch := self.buffer.drain(settings.SCAN_FLUSH_BATCH_SIZE):
+            start = time.perf_counter()
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(insert(ScanEvent).values([event.as_row() for event in batch]))
+                    await db.commit()
+            except Exception:
+                # The batch goes back to the front of the buffer and the next round retries it;
+                # if the buffer filled up meanwhile, the overflow is counted as dropped
+                logger.exception("Failed to write %d scan events", len(batch))
+                self.failed += 1
+                self.buffer.requeue(batch)
+                break
+            self.flush_seconds_total += time.perf_counter() - start
+            self.flushes += 1
+            written += len(batch)
+        self.written += written
+        return written
+
+    async def run(self) -> None:
+        """Flushes on every wake-up or interval until stopped, then writes what is left."""
+        while not self._stopping:
+            self._wake.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.SCAN_FLUSH_INTERVAL_SECONDS)
+            await self.flush()
+        await self.flush()
+
+    def start(self) -> None:
+        self._stopping = False
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        # Not cancelled: a batch in the middle of its INSERT would be lost
+        if self._task is not None:
+            self._stopping = True
+            self.wake()
+            await self._task
+            self._task = None
+
+
+_flusher: ScanFlusher | None = None
+
+
+def _wake_flusher() -> None:
+    if _flusher is not None:
+        _flusher.wake()
+
+
+on_batch_ready(_wake_flusher)
+
+
+def start_scan_flusher(session_factory: async_sessionmaker) -> None:
+    """Starts the scan event flusher (called on application startup)."""
+    global _flusher
+    _flusher = ScanFlusher(session_factory)
+    _flusher.start()
+
+
+async def stop_scan_flusher() -> None:
+    """Writes the pending scan events and stops the flusher (called on application shutdown)."""
+    global _flusher
+    if _flusher is not None:
+        await _flusher.stop()
+        _flusher = None
+
+
+def _scan_stats() -> dict:
+    stats = {
+        "flusher_running": _flusher is not None,
+        "buffered": len(scan_buffer),
+        "capacity": scan_buffer.capacity,
+        "recorded": scan_buffer.appended,
+        "dropped": scan_buffer.dropped,
+    }
+    if _flusher is not None:
+        stats.update(
+            written=_flusher.written,
+            failed=_flusher.failed,
+            flushes=_flusher.flushes,
+            flush_seconds_avg=round(_flusher.flush_seconds_total / _flusher.flushes, 6) if _flusher.flushes else None,
+        )
+    return stats
+
+
+register_stats("scan_events", _scan_stats)
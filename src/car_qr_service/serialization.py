@@ -0,0 +1,72 @@
+import dataclasses
+import datetime
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from src.car_qr_service.config import settings
+
+try:
+    import orjson  # optional: poetry install --extras speedups
+except ImportError:
+    orjson = None
+
+
+def _stdlib_default(value: Any) -> Any:
+    """
+    Типи, які orjson і pydantic-core кодують самі: dataclass (записи, знімки) і дата/час в ISO 8601.
+    Types that orjson and pydantic-core encode natively: dataclasses (records, snapshots) and ISO 8601 dates/times.
+    """
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    Серіалізує вміст у JSON кодувальником з JSON_ENCODER: orjson, pydantic-core або stdlib json.
+    "auto" - orjson, якщо його встановлено, інакше pydantic-core. Обидва працюють за один прохід
+    з dataclass, datetime і вкладеними структурами, без проміжного jsonable-словника.
+
+    Serializes content to JSON with the encoder chosen by JSON_ENCODER: orjson, pydantic-core or stdlib json.
+    "auto" is orjson when installed, otherwise pydantic-core. Both handle dataclasses, datetimes
+    and nested structures in one pass, without an intermediate JSON-able dict.
+    """
+    encoder = settings.JSON_ENCODER
+    if encoder == "auto":
+        encoder = "orjson" if orjson is not None else "pydantic"
+    if encoder == "orjson":
+        if orjson is None:
+            raise RuntimeError("JSON_ENCODER=orjson, but orjson is not installed")
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    if encoder == "pydantic":
+        return to_json(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=_stdlib_default).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Типовий клас відповіді застосунку: той самий JSONResponse, але з кодувальником dump_json.
+    Default response class of the application: the same JSONResponse, encoded with dump_json.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def json_response(content: Any, status_code: int = 200, headers: dict[str, str] | None = None) -> FastJSONResponse:
+    """
+    JSON-відповідь для довірених даних (записи з бази, знімки користувача у формі схеми відповіді):
+    вони серіалізуються одразу в байти, без повторної перевірки через response_model і без обходу
+    атрибутів from_attributes. Схему відповіді для документації все одно вказуйте в response_model маршруту.
+
+    JSON response for trusted data (database records, user snapshots already in the response schema shape):
+    they are serialized straight to bytes, without validating them again against response_model and
+    without the from_attributes walk. Keep the route's response_model for the OpenAPI schema.
+    """
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
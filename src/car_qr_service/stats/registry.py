@@ -0,0 +1,17 @@
+from typing import Callable
+
+# Реєстр джерел статистики: кожна підсистема (кеші, пули, черги) реєструє функцію,
+# яка повертає словник з поточними лічильниками.
+# Registry of stats providers: every subsystem (caches, pools, queues) registers a function
+# that returns a dict with its current counters.
+_providers: dict[str, Callable[[], dict]] = {}
+
+
+def register_stats(name: str, provider: Callable[[], dict]) -> None:
+    """Registers (or replaces) a stats provider under the given name."""
+    _providers[name] = provider
+
+
+def collect_stats() -> dict[str, dict]:
+    """Returns counters of all registered providers."""
+    return {name: provider() for name, provider in _providers.items()}
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from src.car_qr_service.stats.registry import collect_stats
+
+router = APIRouter(tags=["stats"])
+
+
+@router.get("/stats",
+            summary="Лічильники внутрішніх кешів та пулів (Counters of internal caches and pools)")
+async def get_stats() -> dict[str, dict]:
+    """
+    Повертає лічильники всіх зареєстрованих підсистем (наприклад, hit/miss кешу).
+    Returns counters of all registered subsystems (for example cache hits/misses).
+    """
+    return collect_stats()
@@ -0,0 +1,110 @@
+import hashlib
+import math
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from src.car_qr_service.assets import static_url
+from src.car_qr_service.cache import TTLCache
+from src.car_qr_service.config import settings
+from src.car_qr_service.metrics.request import timed_phase
+from src.car_qr_service.qr.cache import etag_matches
+from src.car_qr_service.stats.registry import register_stats
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+
+def _create_environment() -> Environment:
+    """
+    Одне спільне середовище Jinja2 для всіх роутерів. Скомпільовані шаблони зберігаються
+    в TEMPLATE_BYTECODE_CACHE_DIR, тож новий воркер не компілює їх заново; без TEMPLATE_AUTO_RELOAD
+    Jinja2 не перевіряє файли шаблонів на диску під час кожного рендеру.
+
+    One shared Jinja2 environment for all routers. Compiled templates are stored in
+    TEMPLATE_BYTECODE_CACHE_DIR, so a new worker does not compile them again; without TEMPLATE_AUTO_RELOAD
+    Jinja2 does not check the template files on disk on every render.
+    """
+    bytecode_cache = None
+    if settings.TEMPLATE_BYTECODE_CACHE_DIR is not None:
+        settings.TEMPLATE_BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(settings.TEMPLATE_BYTECODE_CACHE_DIR))
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=settings.TEMPLATE_AUTO_RELOAD,
+        bytecode_cache=bytecode_cache,
+    )
+    env.globals["static_url"] = static_url
+    return env
+
+
+class TimedJinja2Templates(Jinja2Templates):
+    """Jinja2Templates that records every render as a "template" phase of the request metrics."""
+
+    def TemplateResponse(self, *args, **kwargs):
+        with timed_phase("template"):
+            return super().TemplateResponse(*args, **kwargs)
+
+
+templates = TimedJinja2Templates(env=_create_environment())
+
+# Готові HTML сторінок без даних користувача: (шаблон, базовий URL запиту) -> (тіло, ETag).
+# Базовий URL входить у ключ, бо від нього залежать посилання static_url(...).
+# Ready HTML of pages without user data: (template, request base URL) -> (body, ETag).
+# The base URL is part of the key because static_url(...) links depend on it.
+static_page_cache: TTLCache[tuple[str, str], tuple[bytes, str]] = TTLCache(
+    max_size=settings.TEMPLATE_FRAGMENT_CACHE_MAX_ITEMS, ttl=math.inf
+)
+
+
+def render_static_page(request: Request, name: str) -> Response:
+    """
+    Віддає сторінку, яка залежить лише від шаблону (головна, вхід, реєстрація): рендер відбувається
+    один раз, далі відповідь береться з пам'яті, а повторний запит браузера отримує 304.
+    Serves a page that depends only on its template (index, login, register): it is rendered once,
+    then served from memory, and a browser revalidation gets 304.
+    """
+    if settings.TEMPLATE_AUTO_RELOAD:
+        # Development: template edits must show up right away
+        return templates.TemplateResponse(request, name)
+    key = (name, str(request.base_url))
+    cached = static_page_cache.get(key)
+    if cached is None:
+        with timed_phase("template"):
+            body = templates.get_template(name).render(request=request).encode()
+        cached = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        static_page_cache.set(key, cached)
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(body, headers=headers)
+
+
+def precompile_templates() -> int:
+    """
+    Компілює всі шаблони (і записує байткод у TEMPLATE_BYTECODE_CACHE_DIR, якщо його задано).
+    Викликається під час старту застосунку або на етапі збірки:
+    python -m src.car_qr_service.templating
+
+    Compiles all templates (and writes their bytecode to TEMPLATE_BYTECODE_CACHE_DIR if it is set).
+    Called on application startup or at build time. Returns the number of templates.
+    """
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.get_template(name)
+    return len(names)
+
+
+register_stats("templates", lambda: {
+    "auto_reload": templates.env.auto_reload,
+    "bytecode_cache": settings.TEMPLATE_BYTECODE_CACHE_DIR is not None,
+    "static_pages": static_page_cache.stats(),
+})
+
+
+if __name__ == "__main__":
+    print(f"Compiled {precompile_templates()} templates")
@@ -2,7 +2,7 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.car_qr_service.auth.security import hash_password
+from src.car_qr_service.auth.security import hash_password_async
 from src.car_qr_service.database.models import User
 from src.car_qr_service.users.schemas import UserCreate
 
@@ -16,6 +16,8 @@ async def get_user_by_email(email: str, db: AsyncSession) -> User | None:
 
 async def create_user(body: UserCreate, db: AsyncSession) -> User:
     """Create new user in the database"""
+    # bcrypt is slow - hash in the worker pool so other requests are not blocked
+    hashed_password = await hash_password_async(body.password)
     # Create instance of User lodel class
     new_user = User(
         email=body.email,
@@ -23,7 +25,7 @@ async def create_user(body: UserCreate, db: AsyncSession) -> User:
         first_name=body.first_name,
         last_name=body.last_name,
         # Важливо: хешуємо пароль перед збереженням!
-        hashed_password=hash_password(body.password),
+        hashed_password=hashed_password,
         show_phone_number = body.show_phone_number,
     )
     # Add new user in database session
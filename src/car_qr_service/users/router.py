@@ -3,10 +3,11 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.car_qr_service.auth.token_cache import UserSnapshot
 from src.car_qr_service.auth.utils import get_current_user
-from src.car_qr_service.database.models import User
 
 from src.car_qr_service.database.database import get_db_session
+from src.car_qr_service.serialization import json_response
 from src.car_qr_service.users import crud
 from src.car_qr_service.users.schemas import UserCreate, UserRead
 
@@ -42,17 +43,19 @@ async def create_new_user(
     # Добре - створюємо нового користувача
     # All right - creat new user
     new_user = await crud.create_user(body, db)
-    return new_user
+    # The snapshot has exactly the UserRead fields, the email was validated on the way in
+    return json_response(UserSnapshot.from_user(new_user), status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/me",
             response_model=UserRead,
             summary="Отримати дані поточного користувача. (Get data of current user)")
-async def read_users_me(current_user: Annotated[User, Depends(get_current_user)]):
+async def read_users_me(current_user: Annotated[UserSnapshot, Depends(get_current_user)]):
     """
     Повертає дані про користувача, який зараз залогінений.
     Доступ можливий тільки з валідним JWT-токеном.
     Returns data about the currently logged in user.
     Access is only possible with a valid JWT token.
     """
-    return current_user
+    # The snapshot has exactly the UserRead fields (and no password), so it is serialized as is
+    return json_response(current_user)
@@ -43,3 +43,16 @@ def create_car_for_user(client: TestClient, token: str, car_suffix: str = "") ->
     response = client.post("/cars/", json=car_data, headers=headers)
     assert response.status_code == 201, "Failed to create a car for a test user"
     return response.json()
+
+
+def login_with_cookie(client: TestClient, user_suffix: str = "") -> str:
+    """Helper: creates a test user and logs in via the web form, so the client keeps the auth cookie."""
+    token = get_auth_token(client, user_suffix=user_suffix)
+    response = client.post(
+        "/pages/login",
+        data={"username": f"car_test{user_suffix}@example.com", "password": "testpassword"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 302, "Failed to log in via the web form"
+    assert "access_token" in client.cookies
+    return token
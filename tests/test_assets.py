@@ -0,0 +1,65 @@
+import gzip
+
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from src.car_qr_service import assets
+from src.car_qr_service.assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    STATIC_SOURCE_DIR,
+    PrecompressedStaticFiles,
+    build_assets,
+    load_manifest,
+)
+from src.car_qr_service.templating import static_page_cache
+
+
+def _static_client(build_dir, manifest) -> TestClient:
+    static = PrecompressedStaticFiles(directory=build_dir, manifest=manifest, max_age=60)
+    return TestClient(Starlette(routes=[Mount("/static", app=static, name="static")]))
+
+
+def test_build_assets_fingerprints_and_compresses(tmp_path):
+    """Test: every asset gets a hashed copy in the manifest; only compressible ones get a .gz variant."""
+    manifest = build_assets(STATIC_SOURCE_DIR, tmp_path)
+
+    assert load_manifest(tmp_path) == manifest
+    logo = manifest["images/logo.svg"]
+    assert logo.startswith("images/logo.") and logo.endswith(".svg") and logo != "images/logo.svg"
+    assert (tmp_path / logo).read_bytes() == (STATIC_SOURCE_DIR / "images/logo.svg").read_bytes()
+    assert (tmp_path / f"{logo}.gz").is_file()
+    assert not (tmp_path / f"{manifest['images/welcome_bg.jpg']}.gz").exists()
+
+
+def test_hashed_asset_is_served_precompressed_and_immutable(tmp_path):
+    """Test: a client accepting gzip gets the .gz variant of a hashed asset with immutable caching."""
+    manifest = build_assets(STATIC_SOURCE_DIR, tmp_path)
+    client = _static_client(tmp_path, manifest)
+    logo = manifest["images/logo.svg"]
+
+    response = client.get(f"/static/{logo}", headers={"Accept-Encoding": "gzip"})
+    identity = client.get(f"/static/{logo}", headers={"Accept-Encoding": "identity"})
+    plain = client.get("/static/images/logo.svg", headers={"Accept-Encoding": "gzip;q=0"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"] == "image/svg+xml"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == (STATIC_SOURCE_DIR / "images/logo.svg").read_bytes()
+    assert int(response.headers["content-length"]) == len(gzip.compress(response.content, 9, mtime=0))
+    assert "content-encoding" not in identity.headers
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["cache-control"] == "public, max-age=60"
+
+
+def test_templates_link_hashed_assets(tmp_path, client: TestClient, monkeypatch):
+    """Test: static_url() in templates resolves source paths through the manifest."""
+    monkeypatch.setattr(assets, "_manifest", {"images/logo.svg": "images/logo.0123456789ab.svg"})
+    static_page_cache.clear()
+
+    response = client.get("/pages/login")
+
+    assert "/static/images/logo.0123456789ab.svg" in response.text
+    static_page_cache.clear()
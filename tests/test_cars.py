@@ -1,5 +1,16 @@
-from fastapi.testclient import TestClient
+import json
+from typing import AsyncGenerator
 
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.car_qr_service.auth.token_cache import token_cache
+from src.car_qr_service.cars.plates import normalize_license_plate
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.database import get_db_session
+from src.car_qr_service.database.models import Car
+from src.car_qr_service.main import app
 from helpers import get_auth_token, create_car_for_user
 
 
@@ -18,6 +29,23 @@ def test_create_car_success(client: TestClient):
     assert data["license_plate"] == car_data["license_plate"]
 
 
+def test_normalize_license_plate():
+    """Тест: регістр, роздільники та кириличні двійники не впливають на ключ номера."""
+    assert normalize_license_plate("AA 1234 BB") == "AA1234BB"
+    assert normalize_license_plate(" aa-1234-bb ") == "AA1234BB"
+    assert normalize_license_plate("АА1234ВВ") == "AA1234BB"  # Cyrillic
+    assert normalize_license_plate("ＫＡ１２３４ＸＸ") == "KA1234XX"  # full-width
+    assert normalize_license_plate("- . -") == ""
+
+
+def test_create_car_without_letters_or_digits_is_rejected(client: TestClient):
+    """Тест: номер без літер і цифр не проходить валідацію."""
+    token = get_auth_token(client, "norm02")
+    response = client.post("/cars/", json={"license_plate": " - ", "brand": "A", "model": "B"},
+                           headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 422
+
+
 def test_create_car_unauthorized(client: TestClient):
     """Тест на помилку при спробі створити авто без токену."""
     car_data = {
@@ -87,6 +115,37 @@ def test_get_my_cars_with_no_cars(client: TestClient):
     assert response.json() == []
 
 
+def test_get_my_cars_is_paged_by_cursor(client: TestClient):
+    """Тест: список видається сторінками за курсором, посилання на наступну - в заголовку Link."""
+    token = get_auth_token(client, user_suffix="page01")
+    headers = {"Authorization": f"Bearer {token}"}
+    plates = [create_car_for_user(client, token, car_suffix=f"PG{number}")["license_plate"] for number in range(5)]
+
+    seen = []
+    url = "/cars/?limit=2"
+    while url:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        seen.extend(car["license_plate"] for car in response.json())
+        url = response.links.get("next", {}).get("url")
+
+    assert seen == plates
+
+
+def test_get_my_cars_streams_ndjson(client: TestClient):
+    """Тест: з Accept: application/x-ndjson усі авто після курсора віддаються потоком."""
+    token = get_auth_token(client, user_suffix="page02")
+    cars = [create_car_for_user(client, token, car_suffix=f"ND{number}") for number in range(3)]
+
+    response = client.get("/cars/", params={"after": cars[0]["id"]},
+                          headers={"Authorization": f"Bearer {token}", "Accept": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == cars[1:]
+
+
 def test_get_my_cars_does_not_show_other_users_cars(client: TestClient):
     """Тест: користувач не бачить автомобілі інших користувачів."""
     # Arrange: Створюємо двох користувачів. Першому додаємо авто.
@@ -179,3 +238,102 @@ def test_delete_other_user_car_forbidden(client: TestClient):
     response_get = client.get("/cars/", headers=headers_user1)
     assert len(response_get.json()) == 1
 
+
+
+# --- Тести для масового імпорту/експорту ---
+def test_import_cars_from_csv_reports_conflicts_and_errors(client: TestClient):
+    """Тест: імпорт CSV додає валідні рядки і повідомляє про конфлікти та помилки."""
+    token = get_auth_token(client, "bulk01")
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "text/csv"}
+    existing = create_car_for_user(client, token, "B01")
+    body = (
+        "license_plate,brand,model\n"
+        "BULK-001,Toyota,Camry\n"
+        "BULK-002,Honda,Civic\n"
+        f"{existing['license_plate']},BMW,X5\n"
+        "bulk 001,Toyota,Corolla\n"
+        "BULK-003,Audi\n"
+    )
+
+    response = client.post("/cars/import", content=body.encode(), headers=headers)
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["created"] == 2
+    assert [(c["line"], c["license_plate"]) for c in result["conflicts"]] == [
+        (4, existing["license_plate"]), (5, "bulk 001")
+    ]
+    assert [e["line"] for e in result["errors"]] == [6]
+    plates = {car["license_plate"] for car in client.get("/cars/", headers=headers).json()}
+    assert plates == {existing["license_plate"], "BULK-001", "BULK-002"}
+
+
+def test_import_cars_from_ndjson_in_several_chunks(client: TestClient, monkeypatch):
+    """Тест: NDJSON імпорт розбивається на кілька багаторядкових INSERT."""
+    monkeypatch.setattr(settings, "CAR_IMPORT_CHUNK_SIZE", 2)
+    token = get_auth_token(client, "bulk02")
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+    body = "\n".join(
+        json.dumps({"license_plate": f"ND-{i}", "brand": "Skoda", "model": "Octavia"}) for i in range(5)
+    ) + "\nnot json\n"
+
+    response = client.post("/cars/import", content=body.encode(), headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["created"] == 5
+    assert response.json()["errors"][0]["line"] == 6
+    assert len(client.get("/cars/", headers=headers).json()) == 5
+
+
+def test_import_cars_over_row_limit_imports_nothing(client: TestClient, savepoint_db_session: AsyncSession,
+                                                    monkeypatch):
+    """Тест: файл понад ліміт рядків відхиляється повністю, навіть якщо частину вже вставлено пачками."""
+    async def override_get_db_session() -> AsyncGenerator[AsyncSession, None]:
+        yield savepoint_db_session
+
+    # The import rolls back its own transaction: with a SAVEPOINT session the data created before it survives
+    app.dependency_overrides[get_db_session] = override_get_db_session
+    monkeypatch.setattr(settings, "CAR_IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "CAR_IMPORT_MAX_ROWS", 3)
+    token = get_auth_token(client, "bulk05")
+    existing = create_car_for_user(client, token, "B05")
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+    body = "\n".join(
+        json.dumps({"license_plate": f"LIM-{i}", "brand": "Skoda", "model": "Octavia"}) for i in range(5)
+    )
+
+    response = client.post("/cars/import", content=body.encode(), headers=headers)
+
+    async def stored_plates() -> list[str]:
+        return list((await savepoint_db_session.execute(select(Car.license_plate))).scalars())
+
+    assert response.status_code == 413
+    assert client.portal.call(stored_plates) == [existing["license_plate"]]  # two chunks were inserted, none kept
+    token_cache.clear()  # the user is read from the database again, not from the verified token cache
+    assert [car["license_plate"] for car in client.get("/cars/", headers=headers).json()] == [existing["license_plate"]]
+
+
+def test_import_cars_rejects_unknown_content_type(client: TestClient):
+    """Тест: непідтримуваний формат тіла запиту повертає 415."""
+    token = get_auth_token(client, "bulk03")
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/xml"}
+    response = client.post("/cars/import", content=b"<cars/>", headers=headers)
+    assert response.status_code == 415
+
+
+def test_export_cars_round_trips_with_import(client: TestClient):
+    """Тест: експорт повертає всі авто користувача у форматі, який приймає імпорт."""
+    token = get_auth_token(client, "bulk04")
+    headers = {"Authorization": f"Bearer {token}"}
+    create_car_for_user(client, token, "E01")
+    create_car_for_user(client, token, "E02")
+
+    csv_response = client.get("/cars/export?format=csv", headers=headers)
+    ndjson_response = client.get("/cars/export?format=ndjson", headers=headers)
+
+    assert csv_response.status_code == 200
+    assert csv_response.text.splitlines() == [
+        "license_plate,brand,model", "PLATE-E01,Brand-E01,Model-E01", "PLATE-E02,Brand-E02,Model-E02",
+    ]
+    rows = [json.loads(line) for line in ndjson_response.text.splitlines()]
+    assert [row["license_plate"] for row in rows] == ["PLATE-E01", "PLATE-E02"]
@@ -0,0 +1,64 @@
+import gzip
+
+from fastapi.testclient import TestClient
+
+from src.car_qr_service.compression.encoders import negotiate_encoding
+from src.car_qr_service.compression.middleware import counters
+from tests.helpers import create_car_for_user, get_auth_token, login_with_cookie
+
+
+def test_negotiate_encoding_respects_quality_and_availability():
+    """Test: the client's q-values win, unknown codings are ignored, q=0 refuses a coding."""
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("*") is not None
+    assert negotiate_encoding("compress, x-unknown") is None
+    assert negotiate_encoding("") is None
+
+
+def test_html_page_is_gzipped_with_weak_etag(client: TestClient):
+    """Test: a large HTML page is compressed, keeps a (weak) validator and still revalidates with 304."""
+    saved_before = counters.snapshot()["routes"].get("/pages/login", {}).get("bytes_saved", 0)
+
+    response = client.get("/pages/login", headers={"Accept-Encoding": "gzip"})
+    revalidated = client.get("/pages/login", headers={"Accept-Encoding": "gzip",
+                                                      "If-None-Match": response.headers["etag"]})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["etag"].startswith('W/"')
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert "<html" in response.text
+    assert revalidated.status_code == 304
+    assert counters.snapshot()["routes"]["/pages/login"]["bytes_saved"] > saved_before
+
+
+def test_small_and_binary_responses_are_not_compressed(client: TestClient):
+    """Test: bodies below the threshold and QR PNG images are sent as is."""
+    token = login_with_cookie(client, user_suffix="gz01")
+    car = create_car_for_user(client, token, car_suffix="GZ01")
+
+    small = client.get("/public/suggest", params={"q": "zzzz"}, headers={"Accept-Encoding": "gzip"})
+    image = client.get(f"/pages/qr-code/{car['license_plate']}", headers={"Accept-Encoding": "gzip"})
+
+    assert small.status_code == 200
+    assert "content-encoding" not in small.headers
+    assert image.headers["content-type"] == "image/png"
+    assert "content-encoding" not in image.headers
+
+
+def test_streamed_export_is_compressed_chunk_by_chunk(client: TestClient):
+    """Test: a streaming response is compressed without a Content-Length and decodes to the full body."""
+    token = get_auth_token(client, user_suffix="gz02")
+    for number in range(3):
+        create_car_for_user(client, token, car_suffix=f"GZ02{number}")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with client.stream("GET", "/cars/export", params={"format": "csv"},
+                       headers={**headers, "Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    body = gzip.decompress(raw).decode()
+    assert all(f"PLATE-GZ02{number}" in body for number in range(3))
@@ -0,0 +1,128 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.car_qr_service.database import database
+from src.car_qr_service.database.database import (
+    PRIMARY_STICKY_COOKIE,
+    PrimarySession,
+    build_engine,
+    get_read_db_session,
+    pool_stats,
+)
+from src.car_qr_service.database.middleware import PrimaryStickinessMiddleware
+
+
+def _request(cookie: str = "", method: str = "GET") -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": method, "path": "/", "headers": headers})
+
+
+async def test_sqlite_engine_applies_pragmas(tmp_path):
+    """Test: every new SQLite connection is switched to WAL with the configured pragmas."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'pragmas.db'}")
+    try:
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1  # NORMAL
+            assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 5000
+    finally:
+        await engine.dispose()
+
+
+async def test_engine_counts_pool_checkouts(tmp_path):
+    """Test: pool metrics count checkouts and the time spent waiting for a connection."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}")
+    try:
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        stats = pool_stats(engine)
+        assert stats["checkouts"] == 3
+        assert stats["checkins"] == 3
+        assert stats["connects"] == 1
+        assert stats["wait_count"] == 3
+        assert stats["checked_out"] == 0
+    finally:
+        await engine.dispose()
+
+
+async def test_read_session_goes_to_replica_unless_client_is_sticky(tmp_path, monkeypatch):
+    """Test: read-only dependencies use the replica, but a client that has just written reads the primary."""
+    replica = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(database, "replica_session_factory", async_sessionmaker(replica))
+    primary = object()
+    try:
+        reader = get_read_db_session(_request(), primary)
+        session = await anext(reader)
+        assert session is not primary
+        assert session.bind is replica
+        await reader.aclose()
+
+        sticky = get_read_db_session(_request(f"{PRIMARY_STICKY_COOKIE}=9999999999"), primary)
+        assert await anext(sticky) is primary
+        await sticky.aclose()
+
+        expired = get_read_db_session(_request(f"{PRIMARY_STICKY_COOKIE}=1"), primary)
+        assert await anext(expired) is not primary
+        await expired.aclose()
+
+        # A write request shares the primary session with its read-only dependencies
+        writer = get_read_db_session(_request(method="POST"), primary)
+        assert await anext(writer) is primary
+        await writer.aclose()
+    finally:
+        await replica.dispose()
+
+
+def test_commit_on_primary_sets_sticky_cookie(tmp_path):
+    """Test: a request that commits on the primary gets the read-your-writes cookie, a read-only one does not."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    session_factory = async_sessionmaker(engine, sync_session_class=PrimarySession)
+
+    async def write(request: Request):
+        async with session_factory() as session:
+            session.info["request_state"] = request.state
+            await session.execute(text("SELECT 1"))
+            await session.commit()
+        return PlainTextResponse("ok")
+
+    async def read(request: Request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/write", write, methods=["POST"]), Route("/read", read)])
+    app.add_middleware(PrimaryStickinessMiddleware)
+    with TestClient(app) as client:
+        assert PRIMARY_STICKY_COOKIE not in client.get("/read").cookies
+        response = client.post("/write")
+        assert PRIMARY_STICKY_COOKIE in response.cookies
+        assert "HttpOnly" in response.headers["set-cookie"]
+        client.portal.call(engine.dispose)
+
+
+def test_anonymous_and_unauthorized_requests_do_not_check_out_connections(test_client: TestClient, tmp_path,
+                                                                          monkeypatch):
+    """Test: redirects and 401 answers never take a connection from the pool."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'lazy.db'}")
+    monkeypatch.setattr(database, "async_session_factory",
+                        async_sessionmaker(engine, expire_on_commit=False, sync_session_class=PrimarySession))
+    requests = [
+        ("GET", "/pages/cabinet", {}),
+        ("GET", "/pages/qr-code/AA1234BB", {}),
+        ("GET", "/pages/qr-codes/export", {}),
+        ("POST", "/pages/cabinet/add-car", {"data": {"license_plate": "AA1", "brand": "B", "model": "M"}}),
+        ("GET", "/cars/", {}),
+        ("GET", "/cars/", {"headers": {"Authorization": "Bearer not-a-jwt"}}),
+        ("GET", "/pages/cabinet", {"cookies": {"access_token": "Bearer not-a-jwt"}}),
+    ]
+    try:
+        for method, url, options in requests:
+            response = test_client.request(method, url, follow_redirects=False, **options)
+            assert response.status_code in (302, 401), (url, response.status_code)
+        assert pool_stats(engine)["checkouts"] == 0
+    finally:
+        test_client.portal.call(engine.dispose)
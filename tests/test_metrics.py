@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+
+from src.car_qr_service.config import settings
+from src.car_qr_service.metrics.core import Histogram, REGISTRY
+from src.car_qr_service.metrics.middleware import request_db_queries, requests_total
+from tests.helpers import create_car_for_user, get_auth_token
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test: observations land in pre-allocated buckets and are exported cumulatively with sum and count."""
+    histogram = Histogram("test_latency_seconds", "Test histogram.", ["route"], buckets=(0.1, 1.0))
+    REGISTRY.remove(histogram)  # keep the test metric out of /metrics
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/x")
+
+    lines = histogram.render().splitlines()
+    assert lines[:2] == ["# HELP test_latency_seconds Test histogram.", "# TYPE test_latency_seconds histogram"]
+    assert 'test_latency_seconds_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/x",le="1.0"} 3' in lines
+    assert 'test_latency_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_sum{route="/x"} 3.65' in lines
+    assert 'test_latency_seconds_count{route="/x"} 4' in lines
+
+
+def test_requests_are_recorded_per_route_with_db_queries(client: TestClient):
+    """Test: a request is counted under its route template together with the SQL statements it ran."""
+    token = get_auth_token(client, user_suffix="met01")
+    car = create_car_for_user(client, token, car_suffix="MET01")
+    before = requests_total.value("PATCH", "/cars/{car_id}", "200")
+    queries_before = request_db_queries.count("PATCH", "/cars/{car_id}")
+
+    response = client.patch(f"/cars/{car['id']}", json={"brand": "Other"},
+                            headers={"Authorization": f"Bearer {token}"})
+    metrics = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert requests_total.value("PATCH", "/cars/{car_id}", "200") == before + 1
+    assert request_db_queries.count("PATCH", "/cars/{car_id}") == queries_before + 1
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="PATCH",route="/cars/{car_id}",status="200"}' in metrics.text
+    assert 'http_request_phase_seconds_count{method="PATCH",route="/cars/{car_id}",phase="db"}' in metrics.text
+    assert 'app_phase_duration_seconds_count{phase="hash"}' in metrics.text
+    assert 'app_stat{subsystem="plate_cache",name="hits"}' in metrics.text
+
+
+def test_server_timing_header_breaks_down_phases(client: TestClient, monkeypatch):
+    """Test: with METRICS_SERVER_TIMING the response tells how long SQL and templates took."""
+    monkeypatch.setattr(settings, "METRICS_SERVER_TIMING", True)
+    token = get_auth_token(client, user_suffix="met02")
+
+    response = client.get("/cars/", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert "db;dur=" in timing
+    assert "app;dur=" in timing
@@ -0,0 +1,112 @@
+import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.car_qr_service.database.database import Base, build_engine
+from src.car_qr_service.database.models import Car, Notification, User
+from src.car_qr_service.notifications.outbox import enqueue_notification
+from src.car_qr_service.notifications.providers import FakeProvider, PermanentProviderError, ProviderError
+from src.car_qr_service.notifications.worker import NotificationWorker
+from tests.helpers import create_car_for_user, get_auth_token
+
+
+def test_send_sms_is_queued_once(client: TestClient, db_session: AsyncSession):
+    """Test: the SMS endpoint only enqueues the message, and a double-click does not queue it twice."""
+    token = get_auth_token(client, user_suffix="sms01")
+    car = create_car_for_user(client, token, car_suffix="SMS01")
+    client.portal.call(db_session.commit)
+
+    for _ in range(2):
+        response = client.post(f"/public/send-sms/{car['license_plate']}", data={"message": "Ваше авто заважає"})
+        assert response.status_code == 200
+        assert "Повідомлення надіслано" in response.text
+    response = client.post("/public/initiate-call", data={"license_plate": car["license_plate"]})
+    assert response.status_code == 200
+
+    async def queued():
+        return (await db_session.execute(select(Notification.kind, Notification.status))).all()
+
+    assert sorted(client.portal.call(queued)) == [("call", "pending"), ("sms", "pending")]
+    stats = client.get("/stats").json()["notifications"]
+    assert stats["deduplicated"] >= 1
+
+
+def test_send_sms_to_unknown_plate(client: TestClient):
+    """Test: nothing is queued for a plate that is not registered."""
+    response = client.post("/public/send-sms/NOPE0000", data={"message": "Hi"})
+    assert response.status_code == 404
+
+
+async def _outbox_db(tmp_path, cars: int = 1):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'outbox.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as db:
+        owner = User(email="owner@example.com", phone_number="+380990000001", hashed_password="x")
+        db.add(owner)
+        db.add_all(Car(license_plate=f"OUT{i}", brand="B", model="M", owner=owner) for i in range(cars))
+        await db.commit()
+    return engine, session_factory
+
+
+async def _statuses(session_factory) -> list[tuple]:
+    async with session_factory() as db:
+        return (await db.execute(
+            select(Notification.status, Notification.attempts).order_by(Notification.id)
+        )).all()
+
+
+async def _make_due(session_factory) -> None:
+    async with session_factory() as db:
+        past = datetime.datetime(2000, 1, 1)
+        await db.execute(update(Notification).values(next_attempt_at=past))
+        await db.commit()
+
+
+async def test_worker_retries_with_backoff_then_delivers(tmp_path):
+    """Test: a temporary provider failure is retried later, a permanent one fails the message at once."""
+    engine, session_factory = await _outbox_db(tmp_path, cars=2)
+    try:
+        async with session_factory() as db:
+            await enqueue_notification(db, "sms", "OUT0", "first")
+            await enqueue_notification(db, "sms", "out 1", "second")
+        provider = FakeProvider(failures=[ProviderError("timeout"), PermanentProviderError("bad number")])
+        worker = NotificationWorker(session_factory, {"sms": provider})
+
+        assert await worker.run_once() == 2
+        assert await _statuses(session_factory) == [("pending", 1), ("failed", 1)]
+        assert await worker.run_once() == 0  # the retry is not due yet
+
+        await _make_due(session_factory)
+        assert await worker.run_once() == 1
+        assert await _statuses(session_factory) == [("sent", 2), ("failed", 1)]
+        assert [message.text for message in provider.sent] == ["first"]
+        assert provider.sent[0].phone_number == "+380990000001"
+        assert (worker.metrics.sent, worker.metrics.retried, worker.metrics.failed) == (1, 1, 1)
+    finally:
+        await engine.dispose()
+
+
+async def test_worker_drains_in_batches_within_provider_concurrency(tmp_path, monkeypatch):
+    """Test: the worker claims limited batches and never exceeds the provider's concurrency limit."""
+    from src.car_qr_service.config import settings
+    monkeypatch.setattr(settings, "NOTIFY_BATCH_SIZE", 4)
+    engine, session_factory = await _outbox_db(tmp_path, cars=6)
+    try:
+        async with session_factory() as db:
+            for i in range(6):
+                await enqueue_notification(db, "call", f"OUT{i}")
+        provider = FakeProvider(max_concurrency=2)
+        worker = NotificationWorker(session_factory, {"call": provider})
+
+        assert await worker.run_once() == 4
+        assert await worker.run_once() == 2
+        assert len(provider.sent) == 6
+        assert provider.max_active == 2
+        await worker.refresh_queue_depth()
+        assert worker.metrics.queue_depth == 0
+    finally:
+        await engine.dispose()
@@ -0,0 +1,203 @@
+import io
+import zipfile
+
+from fastapi.testclient import TestClient
+
+from src.car_qr_service import templating
+from src.car_qr_service.cars.short_codes import build_short_url
+from src.car_qr_service.config import settings
+from src.car_qr_service.qr.render import qr_cache_key
+from src.car_qr_service.templating import static_page_cache
+from tests.helpers import create_car_for_user, login_with_cookie
+
+
+def test_qr_code_is_png_with_etag(client: TestClient):
+    """Test: the owner gets the QR image with a strong ETag and caching headers."""
+    token = login_with_cookie(client, user_suffix="qr01")
+    car = create_car_for_user(client, token, car_suffix="QR01")
+
+    response = client.get(f"/pages/qr-code/{car['license_plate']}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content.startswith(b"\x89PNG")
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"] == "private, no-cache"
+
+
+def test_qr_code_conditional_get_returns_304(client: TestClient):
+    """Test: a repeated download with If-None-Match is answered with 304 and no body."""
+    token = login_with_cookie(client, user_suffix="qr02")
+    car = create_car_for_user(client, token, car_suffix="QR02")
+    first = client.get(f"/pages/qr-code/{car['license_plate']}")
+
+    second = client.get(f"/pages/qr-code/{car['license_plate']}",
+                        headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == first.headers["etag"]
+
+
+def test_qr_code_is_rendered_once(client: TestClient):
+    """Test: the second download is served from the image cache."""
+    token = login_with_cookie(client, user_suffix="qr03")
+    car = create_car_for_user(client, token, car_suffix="QR03")
+
+    first = client.get(f"/pages/qr-code/{car['license_plate']}")
+    renders_before = client.get("/stats").json()["qr_cache"]["renders"]
+    second = client.get(f"/pages/qr-code/{car['license_plate']}")
+    renders_after = client.get("/stats").json()["qr_cache"]["renders"]
+
+    assert first.content == second.content
+    assert renders_after == renders_before
+
+
+def test_qr_code_encodes_short_link(client: TestClient, monkeypatch):
+    """Test: the QR code holds the short /s/{code} link on PUBLIC_BASE_URL, not the license plate."""
+    monkeypatch.setattr(settings, "PUBLIC_BASE_URL", "https://qr.example.com")
+    token = login_with_cookie(client, user_suffix="qr06")
+    car = create_car_for_user(client, token, car_suffix="QR06")
+
+    response = client.get(f"/pages/qr-code/{car['license_plate']}")
+
+    assert build_short_url(car["short_code"]) == f"https://qr.example.com/s/{car['short_code']}"
+    assert response.headers["etag"] == f'"{qr_cache_key(build_short_url(car["short_code"]))}"'
+
+
+def test_qr_code_changes_after_short_code_rotation(client: TestClient):
+    """Test: after the code is rotated the same QR URL serves the new short link and is never served from cache."""
+    token = login_with_cookie(client, user_suffix="qr07")
+    car = create_car_for_user(client, token, car_suffix="QR07")
+    before = client.get(f"/pages/qr-code/{car['license_plate']}")
+
+    rotated = client.post(f"/cars/{car['id']}/short-code", headers={"Authorization": f"Bearer {token}"}).json()
+    after = client.get(f"/pages/qr-code/{car['license_plate']}", headers={"If-None-Match": before.headers["etag"]})
+
+    assert rotated["short_code"] != car["short_code"]
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.headers["etag"] == f'"{qr_cache_key(build_short_url(rotated["short_code"]))}"'
+    assert after.content != before.content
+    assert "no-cache" in after.headers["cache-control"]
+    assert "max-age" not in after.headers["cache-control"]
+
+
+def test_qr_code_of_other_user_car_forbidden(client: TestClient):
+    """Test: a user cannot get the QR code of someone else's car."""
+    owner_token = login_with_cookie(client, user_suffix="qr04")
+    car = create_car_for_user(client, owner_token, car_suffix="QR04")
+    login_with_cookie(client, user_suffix="qr05")
+
+    response = client.get(f"/pages/qr-code/{car['license_plate']}")
+
+    assert response.status_code == 403
+
+
+def test_export_qr_codes_as_zip(client: TestClient):
+    """Test: bulk export returns a ZIP with one PNG per car of the user."""
+    token = login_with_cookie(client, user_suffix="exp01")
+    car1 = create_car_for_user(client, token, car_suffix="EXP01A")
+    car2 = create_car_for_user(client, token, car_suffix="EXP01B")
+
+    response = client.get("/pages/qr-codes/export?format=zip")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        assert sorted(archive.namelist()) == sorted(
+            [f"{car1['license_plate']}.png", f"{car2['license_plate']}.png"]
+        )
+        assert archive.read(f"{car1['license_plate']}.png").startswith(b"\x89PNG")
+
+
+def test_export_selected_qr_codes_as_pdf(client: TestClient):
+    """Test: bulk export of a selected subset returns a one-page PDF."""
+    token = login_with_cookie(client, user_suffix="exp02")
+    car = create_car_for_user(client, token, car_suffix="EXP02A")
+    create_car_for_user(client, token, car_suffix="EXP02B")
+
+    response = client.get("/pages/qr-codes/export",
+                          params={"format": "pdf", "license_plate": car["license_plate"]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF-")
+    assert response.content.rstrip().endswith(b"%%EOF")
+    assert response.content.count(b"/Subtype /Image") == 1
+    assert b"/Count 1" in response.content
+
+
+def test_export_qr_codes_requires_login(client: TestClient):
+    """Test: anonymous users cannot export QR codes."""
+    response = client.get("/pages/qr-codes/export")
+    assert response.status_code == 401
+
+
+def test_cabinet_silently_refreshes_expired_session(client: TestClient):
+    """Test: without a valid access cookie the refresh cookie renews the session and rotates both cookies."""
+    login_with_cookie(client, user_suffix="ref01")
+    refresh_token = client.cookies.get("refresh_token")
+    assert refresh_token
+    client.cookies.delete("access_token")
+
+    response = client.get("/pages/cabinet", follow_redirects=False)
+    assert response.status_code == 200
+    assert "car_testref01@example.com" in response.text
+    assert len(response.headers.get_list("set-cookie")) == 2
+    assert client.cookies.get("access_token")
+    assert client.cookies.get("refresh_token") not in (None, refresh_token)
+
+    # An unknown refresh token does not open the cabinet and its cookies are cleared
+    client.cookies.clear()
+    client.cookies.set("refresh_token", "forged")
+    response = client.get("/pages/cabinet", follow_redirects=False)
+    assert response.status_code == 302
+    assert 'refresh_token=""' in response.headers["set-cookie"]
+
+
+def test_static_pages_are_rendered_once_and_revalidated(client: TestClient):
+    """Test: the login page is served from the page cache and a revalidation gets 304."""
+    static_page_cache.clear()
+    first = client.get("/pages/login")
+    hits = static_page_cache.hits
+
+    second = client.get("/pages/login")
+    revalidated = client.get("/pages/login", headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == first.content
+    assert "/static/images/logo." in second.text
+    assert static_page_cache.hits == hits + 2
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+
+def test_precompile_templates_writes_bytecode_cache(tmp_path, monkeypatch):
+    """Test: precompilation fills the bytecode cache directory for every template."""
+    monkeypatch.setattr(settings, "TEMPLATE_BYTECODE_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(templating.templates, "env", templating._create_environment())
+
+    compiled = templating.precompile_templates()
+
+    assert compiled == len(list(templating.TEMPLATES_DIR.rglob("*.html")))
+    assert len(list(tmp_path.iterdir())) == compiled
+
+
+def test_cabinet_loads_cars_page_by_page(client: TestClient, monkeypatch):
+    """Test: the cabinet renders the newest cars first and loads older ones through the scroll sentinel."""
+    monkeypatch.setattr(settings, "CABINET_PAGE_SIZE", 2)
+    token = login_with_cookie(client, user_suffix="cab01")
+    cars = [create_car_for_user(client, token, car_suffix=f"CAB{number}") for number in range(3)]
+
+    page = client.get("/pages/cabinet")
+    next_page = client.get("/pages/cabinet/cars", params={"after": cars[1]["id"]})
+
+    assert page.status_code == 200
+    assert f'id="car-row-{cars[2]["id"]}"' in page.text
+    assert f'id="car-row-{cars[1]["id"]}"' in page.text
+    assert f'id="car-row-{cars[0]["id"]}"' not in page.text
+    assert f'hx-get="/pages/cabinet/cars?after={cars[1]["id"]}"' in page.text
+    assert f'id="car-row-{cars[0]["id"]}"' in next_page.text
+    assert "car-list-more" not in next_page.text
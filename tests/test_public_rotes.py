@@ -1,8 +1,9 @@
-import asyncio
 
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.car_qr_service.users import crud as users_crud
+
 # Імпортуємо допоміжні функції з централізованого файлу
 from tests.helpers import create_car_for_user, get_auth_token
 
@@ -23,7 +24,7 @@ def test_find_car_by_plate_success(client: TestClient, db_session: AsyncSession)
     assert data["license_plate"] == car_data["license_plate"]
     license_plate = data["license_plate"]
     # force to store new car in the database
-    asyncio.run(db_session.commit())
+    client.portal.call(db_session.commit)
 
     # Act: Робимо публічний запит до нового endpoint-у
     response = client.get(f"/public/cars/{license_plate}")
@@ -55,7 +56,7 @@ def test_find_car_by_plate_not_found(client: TestClient, db_session: AsyncSessio
     assert data["license_plate"] == car_data["license_plate"]
     license_plate = data["license_plate"]
     # force to store new car in the database
-    asyncio.run(db_session.commit())
+    client.portal.call(db_session.commit)
 
     # Act: Робимо публічний запит до нового endpoint-у
     response = client.get(f"/public/cars/AO1234BО")  # change one letter in the license plate
@@ -76,7 +77,7 @@ def test_find_car_by_plate_hides_phone_by_default(
     license_plate = car_data["license_plate"]
 
     # Потрібно закомітити транзакцію, щоб зробити дані видимими для наступного запиту
-    asyncio.run(db_session.commit())
+    client.portal.call(db_session.commit)
 
     # Act: Робимо запит до HTMX-ендпоінту, передаючи дані як форма
     response = client.post("/public/search", data={"license_plate": license_plate})
@@ -101,7 +102,7 @@ def test_find_car_by_plate_shows_phone_when_allowed(
     license_plate = car_data["license_plate"]
 
     # Потрібно закомітити транзакцію, щоб зробити дані видимими для наступного запиту
-    asyncio.run(db_session.commit())
+    client.portal.call(db_session.commit)
 
     # Act: Робимо запит до HTMX-ендпоінту, передаючи дані як форма
     response = client.post("/public/search", data={"license_plate": license_plate})
@@ -117,3 +118,145 @@ def test_find_car_by_plate_not_found_htmx(client: TestClient):
     response = client.post("/public/search", data={"license_plate": "NONEXISTENT"})
     assert response.status_code == 200  # HTMX endpoint always returns 200 OK
     assert "Автомобіль з таким номером не знайдено" in response.text
+
+
+def test_find_car_by_plate_is_served_from_cache(client: TestClient, db_session: AsyncSession):
+    """Test: repeated lookup of the same plate is a cache hit."""
+    token = get_auth_token(client, user_suffix="cache01")
+    car_data = create_car_for_user(client, token, car_suffix="C01")
+    client.portal.call(db_session.commit)
+
+    stats_before = client.get("/stats").json()["plate_cache"]
+    first = client.get(f"/public/cars/{car_data['license_plate']}")
+    second = client.get(f"/public/cars/{car_data['license_plate']}")
+    stats_after = client.get("/stats").json()["plate_cache"]
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert stats_after["misses"] - stats_before["misses"] == 1
+    assert stats_after["hits"] - stats_before["hits"] == 1
+
+
+def test_find_car_by_plate_in_any_spelling(client: TestClient, db_session: AsyncSession):
+    """Test: spaces, case and Cyrillic look-alike letters all find the same car with one cached entry."""
+    token = get_auth_token(client, user_suffix="norm01")
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.post("/cars/", json={"license_plate": "AA 1234 BB", "brand": "Skoda", "model": "Fabia"},
+                           headers=headers)
+    assert response.status_code == 201
+    client.portal.call(db_session.commit)
+
+    stats_before = client.get("/stats").json()["plate_cache"]
+    for spelling in ("AA1234BB", "aa-1234-bb", "АА 1234 ВВ", "аа1234вв"):
+        response = client.get(f"/public/cars/{spelling}")
+        assert response.status_code == 200, spelling
+        assert response.json()["brand"] == "Skoda"
+    stats_after = client.get("/stats").json()["plate_cache"]
+    assert stats_after["misses"] - stats_before["misses"] == 1
+    assert stats_after["hits"] - stats_before["hits"] == 3
+
+
+def test_cached_plate_is_invalidated_on_car_update(client: TestClient, db_session: AsyncSession):
+    """Test: updating a car drops its cached public info."""
+    token = get_auth_token(client, user_suffix="cache02")
+    headers = {"Authorization": f"Bearer {token}"}
+    car_data = create_car_for_user(client, token, car_suffix="C02")
+    client.portal.call(db_session.commit)
+    assert client.get(f"/public/cars/{car_data['license_plate']}").json()["brand"] == car_data["brand"]
+
+    client.patch(f"/cars/{car_data['id']}", json={"brand": "Updated"}, headers=headers)
+
+    response = client.get(f"/public/cars/{car_data['license_plate']}")
+    assert response.status_code == 200
+    assert response.json()["brand"] == "Updated"
+
+
+def test_cached_plate_is_invalidated_on_owner_change(client: TestClient, db_session: AsyncSession):
+    """Test: changing owner's phone visibility drops cached info of their cars."""
+    user_suffix = "cache03"
+    token = get_auth_token(client, user_suffix=user_suffix, show_phone=False)
+    car_data = create_car_for_user(client, token, car_suffix="C03")
+    client.portal.call(db_session.commit)
+    response = client.post("/public/search", data={"license_plate": car_data["license_plate"]})
+    assert "Власник приховав номер" in response.text
+
+    async def allow_phone():
+        user = await users_crud.get_user_by_email(f"car_test{user_suffix}@example.com", db_session)
+        user.show_phone_number = True
+        await db_session.commit()
+
+    client.portal.call(allow_phone)
+
+    response = client.post("/public/search", data={"license_plate": car_data["license_plate"]})
+    assert f"+380991234567{user_suffix}" in response.text
+
+
+def test_suggest_cars_by_prefix_and_typo(client: TestClient, db_session: AsyncSession):
+    """Test: as-you-type search finds plates by prefix and with one typo, returning only public fields."""
+    token = get_auth_token(client, user_suffix="suggest01")
+    headers = {"Authorization": f"Bearer {token}"}
+    for plate, brand in (("KA 0001 XX", "Skoda"), ("KA 0002 XX", "Audi"), ("BC 7777 AA", "Fiat")):
+        response = client.post("/cars/", json={"license_plate": plate, "brand": brand, "model": "M"}, headers=headers)
+        assert response.status_code == 201
+    client.portal.call(db_session.commit)
+
+    by_prefix = client.get("/public/suggest", params={"q": "ка 000"}).json()
+    assert sorted(car["brand"] for car in by_prefix) == ["Audi", "Skoda"]
+    assert set(by_prefix[0]) == {"brand", "model"}
+    assert [car["brand"] for car in client.get("/public/suggest", params={"q": "BC7778AA"}).json()] == ["Fiat"]
+    assert client.get("/public/suggest", params={"q": "KA"}).json() == []  # too short
+    assert len(client.get("/public/suggest", params={"q": "KA000", "limit": 1}).json()) == 1
+
+    html = client.post("/public/search/suggestions", data={"license_plate": "BC 777"})
+    assert html.status_code == 200
+    assert "Fiat M" in html.text
+    assert "BC" not in html.text
+
+
+def test_suggest_index_follows_car_changes(client: TestClient, db_session: AsyncSession):
+    """Test: the search index is updated on create, update and delete without a rebuild."""
+    token = get_auth_token(client, user_suffix="suggest02")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/public/suggest", params={"q": "ZZ1"}).json() == []  # builds the index
+    builds = client.get("/stats").json()["plate_search"]["builds"]
+
+    car = client.post("/cars/", json={"license_plate": "ZZ1111ZZ", "brand": "Kia", "model": "Rio"},
+                      headers=headers).json()
+    assert [c["brand"] for c in client.get("/public/suggest", params={"q": "ZZ1"}).json()] == ["Kia"]
+
+    client.patch(f"/cars/{car['id']}", json={"license_plate": "YY2222YY", "brand": "Kia2"}, headers=headers)
+    assert client.get("/public/suggest", params={"q": "ZZ1"}).json() == []
+    assert [c["brand"] for c in client.get("/public/suggest", params={"q": "YY2"}).json()] == ["Kia2"]
+
+    client.delete(f"/cars/{car['id']}", headers=headers)
+    assert client.get("/public/suggest", params={"q": "YY2"}).json() == []
+    assert client.get("/stats").json()["plate_search"]["builds"] == builds
+
+
+def test_short_link_opens_car_page(client: TestClient):
+    """Test: /s/{code} from the QR sticker opens the contact page; an unknown code is 404."""
+    token = get_auth_token(client, user_suffix="s01")
+    car = create_car_for_user(client, token, car_suffix="S01")
+
+    response = client.get(f"/s/{car['short_code']}")
+    missing = client.get("/s/unknown0")
+
+    assert response.status_code == 200
+    assert car["brand"] in response.text
+    assert missing.status_code == 404
+
+
+def test_rotated_short_code_retires_only_old_link(client: TestClient):
+    """Test: after rotation the old code is 404, the new one works and other cars keep their codes."""
+    token = get_auth_token(client, user_suffix="s02")
+    car = create_car_for_user(client, token, car_suffix="S02")
+    other_car = create_car_for_user(client, token, car_suffix="S03")
+
+    response = client.post(f"/cars/{car['id']}/short-code", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    new_code = response.json()["short_code"]
+    assert new_code != car["short_code"]
+    assert client.get(f"/s/{car['short_code']}").status_code == 404
+    assert client.get(f"/s/{new_code}").status_code == 200
+    assert client.get(f"/s/{other_car['short_code']}").status_code == 200
@@ -0,0 +1,120 @@
+from typing import AsyncGenerator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.database import get_db_session
+from src.car_qr_service.main import app
+from src.car_qr_service.ratelimit.middleware import parse_limit
+from src.car_qr_service.ratelimit.store import MemoryTokenBucketStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_limit():
+    """Test: limits are written as "<count>/<period>" and an empty string disables them."""
+    assert parse_limit("60/minute") == (1.0, 60.0)
+    assert parse_limit("5/10m") == (5 / 600, 5.0)
+    assert parse_limit("1000/days") == (1000 / 86400, 1000.0)
+    assert parse_limit("") is None
+    with pytest.raises(ValueError):
+        parse_limit("fast")
+
+
+async def test_token_bucket_refills_and_expires_keys():
+    """Test: a bucket allows its capacity, refills at its rate, and its key is dropped once it is full again."""
+    clock = FakeClock()
+    store = MemoryTokenBucketStore(slot_seconds=1, slots=60, clock=clock)
+
+    assert [await store.take("ip:1", rate=1, capacity=2) for _ in range(2)] == [0, 0]
+    assert await store.take("ip:1", rate=1, capacity=2) == pytest.approx(1.0)
+    clock.now += 1
+    assert await store.take("ip:1", rate=1, capacity=2) == 0
+    assert len(store) == 1
+
+    clock.now += 3  # the bucket is full again - the key is gone
+    await store.take("ip:2", rate=1, capacity=2)
+    assert len(store) == 1
+    assert store.expired == 1
+
+
+async def test_token_bucket_beyond_wheel_horizon_is_kept():
+    """Test: a key that refills later than the wheel horizon is not expired early."""
+    clock = FakeClock()
+    store = MemoryTokenBucketStore(slot_seconds=1, slots=10, clock=clock)
+    await store.take("slow", rate=1 / 100, capacity=1)  # refills in 100 seconds
+
+    clock.now += 50
+    await store.take("other", rate=1, capacity=1)
+    assert await store.take("slow", rate=1 / 100, capacity=1) > 0
+    clock.now += 200
+    await store.take("other", rate=1, capacity=1)
+    assert await store.take("slow", rate=1 / 100, capacity=1) == 0
+
+
+def test_lookup_is_limited_per_plate_before_db(client: TestClient, db_session: AsyncSession, monkeypatch):
+    """Test: every spelling of a plate shares one bucket, and a rejected request opens no DB session."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOOKUP_PER_IP", "")
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOOKUP_PER_PLATE", "2/minute")
+    sessions_opened = 0
+
+    async def counting_db_session() -> AsyncGenerator[AsyncSession, None]:
+        nonlocal sessions_opened
+        sessions_opened += 1
+        yield db_session
+
+    app.dependency_overrides[get_db_session] = counting_db_session
+
+    assert client.get("/public/cars/LIM1234IT").status_code == 404
+    assert client.get("/public/cars/lim 1234 it").status_code == 404
+    response = client.get("/public/cars/LIM-1234-IT")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert sessions_opened == 2
+    assert client.get("/public/cars/OTHER0001").status_code == 404  # another plate has its own bucket
+
+
+def test_sms_is_limited_per_ip(client: TestClient, monkeypatch):
+    """Test: the SMS endpoint stops accepting requests from one client after its limit."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_SMS_PER_IP", "2/hour")
+    statuses = [client.post(f"/public/send-sms/IPTEST{i}", data={"message": "Hi"}).status_code for i in range(3)]
+    assert statuses == [404, 404, 429]
+    assert client.get("/stats").json()["rate_limit"]["rejected"]["SMS"] >= 1
+
+
+def test_search_form_is_limited_per_plate(client: TestClient, monkeypatch):
+    """Test: the plate is read from the form body, and the body still reaches the endpoint."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_SEARCH_PER_PLATE", "1/minute")
+    first = client.post("/public/search", data={"license_plate": "FORM0001"})
+    assert first.status_code == 200
+    assert "не знайдено" in first.text
+    assert client.post("/public/search", data={"license_plate": "form 0001"}).status_code == 429
+
+
+def test_search_multipart_form_is_limited_per_plate(client: TestClient, monkeypatch):
+    """Test: a multipart form shares the plate bucket, other bodies are rejected instead of skipping the limit."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_SEARCH_PER_PLATE", "1/minute")
+    multipart = {"license_plate": (None, "MULTI0001")}
+    assert client.post("/public/search", files=multipart).status_code == 200
+    assert client.post("/public/search", data={"license_plate": "multi 0001"}).status_code == 429
+    assert client.post("/public/search", json={"license_plate": "MULTI0002"}).status_code == 415
+    too_large = {"license_plate": "MULTI0003", "padding": "x" * 20_000}
+    assert client.post("/public/search", data=too_large).status_code == 413
+
+
+def test_plate_rejection_does_not_spend_ip_budget(client: TestClient, monkeypatch):
+    """Test: a request rejected by the plate bucket takes no token from the client's IP bucket."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_SEARCH_PER_IP", "2/minute")
+    monkeypatch.setattr(settings, "RATE_LIMIT_SEARCH_PER_PLATE", "1/minute")
+    assert client.post("/public/search", data={"license_plate": "BUDGET01"}).status_code == 200
+    for _ in range(3):
+        assert client.post("/public/search", data={"license_plate": "BUDGET01"}).status_code == 429
+    assert client.post("/public/search", data={"license_plate": "BUDGET02"}).status_code == 200
@@ -0,0 +1,103 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.car_qr_service.config import settings
+from src.car_qr_service.database.database import Base, build_engine
+from src.car_qr_service.database.models import ScanEvent, utc_now
+from src.car_qr_service.scans.buffer import ScanBuffer, ScanRecord, classify_user_agent, ip_prefix, scan_buffer
+from src.car_qr_service.scans.flusher import ScanFlusher
+from tests.helpers import create_car_for_user, get_auth_token
+
+
+def _event(car_id: int) -> ScanRecord:
+    return ScanRecord(car_id=car_id, scanned_at=utc_now(), source="plate", client_kind="mobile", ip_prefix="10.0.0.0/24")
+
+
+def test_lookups_and_short_links_are_buffered(client: TestClient):
+    """Test: a found car is recorded in the buffer (no database write in the request), a miss is not."""
+    token = get_auth_token(client, user_suffix="scan01")
+    car = create_car_for_user(client, token, car_suffix="SCAN01")
+
+    assert client.get(f"/public/cars/{car['license_plate']}").status_code == 200
+    assert client.get(f"/s/{car['short_code']}", headers={"User-Agent": "Mozilla/5.0 (iPhone)"}).status_code == 200
+    assert client.get("/public/cars/NOPE0000").status_code == 404
+
+    events = scan_buffer.drain(10)
+    assert [(event.car_id, event.source) for event in events] == [(car["id"], "plate"), (car["id"], "short")]
+    assert events[1].client_kind == "mobile"
+    assert events[0].ip_prefix == "unknown"  # the test client has no real address
+
+
+def test_buffer_is_bounded_and_counts_dropped_events():
+    """Test: a full ring buffer pushes out the oldest events and counts them."""
+    buffer = ScanBuffer(max_events=3)
+    for car_id in range(5):
+        buffer.append(_event(car_id))
+
+    assert len(buffer) == 3
+    assert buffer.dropped == 2
+    assert [event.car_id for event in buffer.drain(10)] == [2, 3, 4]
+    buffer.append(_event(5))
+    buffer.append(_event(6))
+    buffer.requeue([_event(3), _event(4)])  # room for one: the older event of the batch is dropped
+    assert buffer.dropped == 3
+    assert [event.car_id for event in buffer.drain(10)] == [4, 5, 6]
+    assert classify_user_agent("Googlebot/2.1") == "bot"
+    assert classify_user_agent("curl/8.0") == "other"
+    assert ip_prefix("192.168.7.42") == "192.168.7.0/24"
+    assert ip_prefix("2001:db8:1:2::1") == "2001:db8:1::/48"
+
+
+async def test_flusher_writes_batches_and_drains_on_stop(tmp_path, monkeypatch):
+    """Test: events are written in multi-row batches, and stopping the flusher writes what is left."""
+    monkeypatch.setattr(settings, "SCAN_FLUSH_BATCH_SIZE", 10)
+    monkeypatch.setattr(settings, "SCAN_FLUSH_INTERVAL_SECONDS", 60)
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'scans.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def stored() -> int:
+        async with session_factory() as db:
+            return (await db.execute(select(func.count()).select_from(ScanEvent))).scalar_one()
+
+    try:
+        buffer = ScanBuffer(max_events=100)
+        flusher = ScanFlusher(session_factory, buffer)
+        for car_id in range(25):
+            buffer.append(_event(car_id))
+        assert await flusher.flush() == 25
+        assert flusher.flushes == 3  # 10 + 10 + 5 rows
+        assert await stored() == 25
+
+        flusher.start()
+        for car_id in range(7):
+            buffer.append(_event(car_id))
+        await flusher.stop()  # the interval has not passed, the events are written on stop
+        assert len(buffer) == 0
+        assert await stored() == 32
+    finally:
+        await engine.dispose()
+
+
+async def test_failed_batch_is_put_back_for_the_next_round(tmp_path):
+    """Test: a batch the database rejects is not lost - it stays buffered and is written once the table exists."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'scans.db'}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        buffer = ScanBuffer(max_events=100)
+        flusher = ScanFlusher(session_factory, buffer)
+        for car_id in range(3):
+            buffer.append(_event(car_id))
+
+        assert await flusher.flush() == 0  # no scan_events table yet
+        assert flusher.failed == 1
+        assert len(buffer) == 3
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        assert await flusher.flush() == 3
+        assert len(buffer) == 0
+    finally:
+        await engine.dispose()
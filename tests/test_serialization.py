@@ -0,0 +1,61 @@
+import datetime
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.car_qr_service import serialization
+from src.car_qr_service.auth.token_cache import UserSnapshot
+from src.car_qr_service.cars.records import CarRecord
+from src.car_qr_service.config import settings
+from src.car_qr_service.serialization import dump_json
+from tests.helpers import get_auth_token
+
+
+@pytest.mark.parametrize("encoder", ["auto", "orjson", "pydantic", "stdlib"])
+def test_encoders_produce_the_same_json(encoder, monkeypatch):
+    """
+    Test: every JSON_ENCODER option encodes the JSON-able output of FastAPI identically,
+    and dataclass records and user snapshots (with datetimes) byte for byte the same.
+    """
+    if encoder == "orjson" and serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    content = {"detail": "Автомобіль не знайдено", "items": [1, 2.5, None, True], "nested": {"a": "b"}}
+    records = {
+        "cars": [CarRecord(license_plate="АА1234ВВ", brand="Skoda", model="Octavia", id=1, owner_id=2,
+                           short_code="aB3dE5fG")],
+        "user": UserSnapshot(id=2, email="owner@example.com", phone_number="+380991234567", first_name="Тарас",
+                             last_name="", show_phone_number=True,
+                             created_at=datetime.datetime(2026, 10, 17, 12, 30, 5, 123456)),
+    }
+    monkeypatch.setattr(settings, "JSON_ENCODER", "pydantic")
+    expected = dump_json(records)
+    monkeypatch.setattr(settings, "JSON_ENCODER", encoder)
+
+    assert json.loads(dump_json(content)) == content
+    assert dump_json(records) == expected
+    assert json.loads(expected)["user"]["created_at"] == "2026-10-17T12:30:05.123456"
+
+
+def test_orjson_encoder_requires_orjson(monkeypatch):
+    """Test: explicitly choosing orjson without the package installed fails loudly."""
+    monkeypatch.setattr(settings, "JSON_ENCODER", "orjson")
+    monkeypatch.setattr(serialization, "orjson", None)
+
+    with pytest.raises(RuntimeError):
+        dump_json({})
+
+
+def test_users_me_returns_user_read_fields(client: TestClient):
+    """Test: /users/me serializes the user snapshot straight to the UserRead shape."""
+    token = get_auth_token(client, user_suffix="json01")
+
+    response = client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    data = response.json()
+    assert set(data) == {"id", "email", "phone_number", "first_name", "last_name", "show_phone_number", "created_at"}
+    assert data["email"] == "car_testjson01@example.com"
+    assert "hashed_password" not in data
+    datetime.datetime.fromisoformat(data["created_at"])
@@ -1,7 +1,11 @@
+
 import pytest
 
 from fastapi.testclient import TestClient
 
+from src.car_qr_service.config import settings
+from src.car_qr_service.users import crud as users_crud
+
 
 # pytest will automatically find our fixture client from conftest.py
 # There is no needs to import something
@@ -122,3 +126,89 @@ def test_login_for_access_token_failure_wrong_password(client: TestClient):
     assert response.status_code == 401
     error_data = response.json()
     assert error_data["detail"] == "Incorrect username or password"
+
+
+def test_login_returns_503_when_hashing_pool_is_saturated(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """
+    Test: when the bcrypt pool queue is full, login is rejected with 503 instead of waiting.
+    """
+    user_data = {
+        "email": "busy_pool@example.com",
+        "phone_number": "+380990001122",
+        "password": "correct_password",
+    }
+    response = client.post("/users/", json=user_data)
+    assert response.status_code == 201
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+    response = client.post("/auth/token", data={"username": user_data["email"],
+                                                "password": user_data["password"]})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_verified_token_is_cached_and_invalidated_on_user_change(client: TestClient, db_session):
+    """
+    Test: repeated authenticated requests reuse the verified token,
+    and a change of the user drops it so fresh data is returned.
+    """
+    user_data = {
+        "email": "token_cache@example.com",
+        "phone_number": "+380990002233",
+        "password": "correct_password",
+        "first_name": "Before",
+    }
+    assert client.post("/users/", json=user_data).status_code == 201
+    token = client.post("/auth/token", data={"username": user_data["email"],
+                                             "password": user_data["password"]}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    stats_before = client.get("/stats").json()["token_cache"]
+    assert client.get("/users/me", headers=headers).json()["first_name"] == "Before"
+    assert client.get("/users/me", headers=headers).json()["first_name"] == "Before"
+    stats_after = client.get("/stats").json()["token_cache"]
+    assert stats_after["misses"] - stats_before["misses"] == 1
+    assert stats_after["hits"] - stats_before["hits"] == 1
+
+    async def rename_user():
+        user = await users_crud.get_user_by_email(user_data["email"], db_session)
+        user.first_name = "After"
+        await db_session.commit()
+
+    client.portal.call(rename_user)
+
+    assert client.get("/users/me", headers=headers).json()["first_name"] == "After"
+
+
+def test_invalid_token_is_rejected(client: TestClient):
+    """Test: a forged token is not accepted (and not cached)."""
+    response = client.get("/users/me", headers={"Authorization": "Bearer not-a-jwt"})
+    assert response.status_code == 401
+
+
+def test_refresh_token_rotates_and_reuse_revokes_session(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Test: a refresh token is exchanged once; presenting a replaced token later revokes the whole session."""
+    user_data = {"email": "refresh_test@example.com", "phone_number": "+380990003344",
+                 "password": "correct_password"}
+    assert client.post("/users/", json=user_data).status_code == 201
+    first = client.post("/auth/token", data={"username": user_data["email"],
+                                             "password": user_data["password"]}).json()["refresh_token"]
+
+    response = client.post("/auth/refresh", data={"refresh_token": first})
+    assert response.status_code == 200, response.text
+    second = response.json()["refresh_token"]
+    assert second != first
+    me = client.get("/users/me", headers={"Authorization": f"Bearer {response.json()['access_token']}"})
+    assert me.json()["email"] == user_data["email"]
+
+    # A parallel request within the grace window gets an access token but no new refresh token
+    response = client.post("/auth/refresh", data={"refresh_token": first})
+    assert response.status_code == 200
+    assert "refresh_token" not in response.json()
+
+    # Outside the grace window the replaced token is treated as stolen: the whole session is revoked
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", -1)
+    assert client.post("/auth/refresh", data={"refresh_token": first}).status_code == 401
+    assert client.post("/auth/refresh", data={"refresh_token": second}).status_code == 401
+    assert client.post("/auth/refresh", data={"refresh_token": "unknown"}).status_code == 401